@@ -1,16 +1,30 @@
 import argparse
-import importlib.metadata
+import contextlib
 import importlib.resources
 import io
 import logging
+import signal
 import sys
 import typing
 
-import omegaconf
-
+from stellarspider.core import instrumentation
+from stellarspider.core.config_snapshot import ConfigSnapshotCache
+from stellarspider.core.filters.rule_based import (
+    RuleBasedFilter,
+    RuleBasedFilterBuilder,
+)
+from stellarspider.core.multi_category import MultiCategoryPipeline
+from stellarspider.core.parallel_pipeline import ParallelFilterPipeline
 from stellarspider.core.pipeline import FilterPipeline
-from stellarspider.io.data_loader import DataLoader
-from stellarspider.io.output_handler import OutputHandler
+from stellarspider.core.records import EXPLAIN_LEVELS
+from stellarspider.io.codec import JSON_BACKENDS, PRODUCT_FIELDS, JsonCodec
+from stellarspider.io.data_loader import INPUT_FORMATS, DataLoader
+from stellarspider.io.output_handler import OUTPUT_FORMATS, OutputHandler
+
+if typing.TYPE_CHECKING:
+    import omegaconf
+
+CATEGORIES = ["salmon", "peanuts"]
 
 
 def setup_logging(verbose_count: int) -> None:
@@ -27,8 +41,10 @@ def setup_logging(verbose_count: int) -> None:
 
 def load_config_file(
     package_path: str, filename: str
-) -> typing.Optional[omegaconf.DictConfig]:
+) -> typing.Optional["omegaconf.DictConfig"]:
     """Load a single config file from package resources."""
+    import omegaconf
+
     try:
         with importlib.resources.open_text(package_path, filename) as f:
             content = f.read()
@@ -43,9 +59,11 @@ def load_config_file(
 
 
 def load_configurations() -> (
-    typing.Tuple[omegaconf.DictConfig, typing.Dict[str, omegaconf.DictConfig]]
+    typing.Tuple["omegaconf.DictConfig", typing.Dict[str, "omegaconf.DictConfig"]]
 ):
     """Load all configuration files from package resources."""
+    import omegaconf
+
     # Load main config
     main_config = load_config_file("stellarspider.conf", "config.yaml")
     if main_config is None:
@@ -53,7 +71,34 @@ def load_configurations() -> (
         main_config = omegaconf.OmegaConf.create(
             {
                 "input": None,
-                "output": {"format": "json", "indent": 2},
+                "input_format": "json",
+                "input_workers": 8,
+                "input_fields": None,
+                "output": {
+                    "format": "json",
+                    "indent": 2,
+                    "compact": False,
+                    "batch_size": 10000,
+                    "explain": "full",
+                },
+                "stream": False,
+                "chunk_size": 1000,
+                "workers": 1,
+                "incremental": False,
+                "dedup": None,
+                "dedup_threshold": 0.8,
+                "cascade": {
+                    "enabled": False,
+                    "min_rule_score": None,
+                    "rejected": "minimal",
+                },
+                "rerank": {"candidates": None, "margin": None, "time_budget": None},
+                "top": None,
+                "min_score": None,
+                "rule_engine": "default",
+                "categories": None,
+                "category_output": "rankings",
+                "json_backend": "auto",
                 "verbose": 0,
                 "version": False,
                 "scoring": {"rule_weight": 0.7, "semantic_weight": 0.3},
@@ -62,7 +107,7 @@ def load_configurations() -> (
 
     # Load category configs
     category_configs = {}
-    for category in ["salmon", "peanuts"]:
+    for category in CATEGORIES:
         config = load_config_file("stellarspider.conf.category", f"{category}.yaml")
         if config:
             category_configs[category] = config
@@ -72,8 +117,10 @@ def load_configurations() -> (
     return main_config, category_configs
 
 
-def create_fallback_salmon_config() -> omegaconf.DictConfig:
+def create_fallback_salmon_config() -> "omegaconf.DictConfig":
     """Create fallback salmon configuration."""
+    import omegaconf
+
     return omegaconf.OmegaConf.create(
         {
             "category_name": "salmon",
@@ -168,6 +215,20 @@ def create_fallback_salmon_config() -> omegaconf.DictConfig:
                     "never frozen",
                 ],
             },
+            "cascade": {
+                "reject_keywords": [
+                    "caviar",
+                    "cottage cheese",
+                    "guacamole",
+                    "mocktail",
+                    "onion rings",
+                    "plant based",
+                    "seasoning",
+                    "sweet potatoes",
+                    "tortillas",
+                    "vegan",
+                ]
+            },
             "ocean_origins": {
                 "atlantic": ["atlantic"],
                 "pacific": ["pacific", "alaska", "alaskan"],
@@ -183,6 +244,15 @@ def create_fallback_salmon_config() -> omegaconf.DictConfig:
                 "name_salmon_bonus": 4,
                 "name_fillet_bonus": 3,
             },
+            "semantic": {
+                "model_path": None,
+                "device": "cpu",
+                "num_threads": None,
+                "batch_size": 64,
+                "similarity_threshold": 0.5,
+                "cache_dir": None,
+                "cache_max_entries": 200000,
+            },
             # Consumption preferences embedded in category config
             "consumption": {
                 "frozen_storage": {
@@ -200,8 +270,10 @@ def create_fallback_salmon_config() -> omegaconf.DictConfig:
     )
 
 
-def create_fallback_peanuts_config() -> omegaconf.DictConfig:
+def create_fallback_peanuts_config() -> "omegaconf.DictConfig":
     """Create fallback peanuts configuration."""
+    import omegaconf
+
     return omegaconf.OmegaConf.create(
         {
             "category_name": "peanuts",
@@ -243,6 +315,17 @@ def create_fallback_peanuts_config() -> omegaconf.DictConfig:
                     "natural",
                 ],
             },
+            "cascade": {
+                "reject_keywords": [
+                    "peanut butter",
+                    "candy",
+                    "bird feed",
+                    "bird food",
+                    "wildlife food",
+                    "pet food",
+                    "cocktail mix",
+                ]
+            },
             "scoring": {
                 "positive_multiplier": 3,
                 "negative_multiplier": -8,
@@ -251,6 +334,15 @@ def create_fallback_peanuts_config() -> omegaconf.DictConfig:
                 "name_peanut_bonus": 4,
                 "raw_bonus": 5,
             },
+            "semantic": {
+                "model_path": None,
+                "device": "cpu",
+                "num_threads": None,
+                "batch_size": 64,
+                "similarity_threshold": 0.5,
+                "cache_dir": None,
+                "cache_max_entries": 200000,
+            },
             # Peanuts don't typically have consumption scenarios
             "consumption": {},
         }
@@ -258,11 +350,13 @@ def create_fallback_peanuts_config() -> omegaconf.DictConfig:
 
 
 def create_final_config(
-    main_config: omegaconf.DictConfig,
-    category_configs: typing.Dict[str, omegaconf.DictConfig],
+    main_config: "omegaconf.DictConfig",
+    category_configs: typing.Dict[str, "omegaconf.DictConfig"],
     args: argparse.Namespace,
-) -> omegaconf.DictConfig:
+) -> "omegaconf.DictConfig":
     """Create final configuration by merging all sources."""
+    import omegaconf
+
     # Start with main config
     final_config = omegaconf.OmegaConf.create(main_config)
 
@@ -282,14 +376,344 @@ def create_final_config(
     # Merge category config
     final_config = omegaconf.OmegaConf.merge(final_config, category_config)
 
-    # Apply command line overrides
-    final_config.verbose = args.verbose
-    if args.input:
-        final_config.input = args.input
+    # Apply command line overrides that shape the merge and the filters
+    if args.rule_engine:
+        final_config.rule_engine = args.rule_engine
+    if args.semantic_model:
+        omegaconf.OmegaConf.update(
+            final_config, "semantic.model_path", args.semantic_model
+        )
+    if args.embedding_cache:
+        omegaconf.OmegaConf.update(
+            final_config, "semantic.cache_dir", args.embedding_cache
+        )
+    if args.categories:
+        final_config.categories = args.categories
+    if args.cascade:
+        final_config.cascade.enabled = True
+        final_config.cascade.rejected = args.cascade
+    if args.min_rule_score is not None:
+        final_config.cascade.min_rule_score = args.min_rule_score
 
+    apply_run_options(final_config, args)
     return final_config
 
 
+# Options that shape the merged configs and the rule filters built from them;
+# config snapshots are keyed on these alone
+SNAPSHOT_OPTIONS = (
+    "category",
+    "categories",
+    "rule_engine",
+    "semantic_model",
+    "embedding_cache",
+    "cascade",
+    "min_rule_score",
+)
+
+
+def apply_run_options(
+    config: typing.MutableMapping[str, typing.Any], args: argparse.Namespace
+) -> None:
+    """Apply the command line options that only steer a run.
+
+    Works on merged configs and on the plain dicts of config snapshots
+    alike, so snapshots need not be keyed on these options.
+    """
+    config["verbose"] = args.verbose
+    if args.input:
+        config["input"] = args.input
+    if args.input_format:
+        config["input_format"] = args.input_format
+    if args.input_workers:
+        config["input_workers"] = args.input_workers
+    if args.input_fields:
+        config["input_fields"] = args.input_fields
+    if args.output_format:
+        config["output"]["format"] = args.output_format
+    if args.compact:
+        config["output"]["compact"] = True
+    if args.explain:
+        config["output"]["explain"] = args.explain
+    if args.stream:
+        config["stream"] = True
+    if args.chunk_size:
+        config["chunk_size"] = args.chunk_size
+    if args.workers is not None:
+        config["workers"] = args.workers
+    if args.incremental:
+        config["incremental"] = True
+    if args.dedup:
+        config["dedup"] = args.dedup
+    if args.dedup_threshold is not None:
+        config["dedup_threshold"] = args.dedup_threshold
+    if args.category_output:
+        config["category_output"] = args.category_output
+    if args.rerank is not None:
+        config["rerank"]["candidates"] = args.rerank
+    if args.rerank_margin is not None:
+        config["rerank"]["margin"] = args.rerank_margin
+    if args.time_budget is not None:
+        config["rerank"]["time_budget"] = args.time_budget
+    if args.top is not None:
+        config["top"] = args.top
+    if args.min_score is not None:
+        config["min_score"] = args.min_score
+    if args.json_backend:
+        config["json_backend"] = args.json_backend
+
+
+def create_category_configs(
+    main_config: "omegaconf.DictConfig",
+    category_configs: typing.Dict[str, "omegaconf.DictConfig"],
+    args: argparse.Namespace,
+    categories: typing.Iterable[str],
+) -> typing.Dict[str, "omegaconf.DictConfig"]:
+    """Create the final configuration of each of several categories."""
+    return {
+        category: create_final_config(
+            main_config,
+            category_configs,
+            argparse.Namespace(**{**vars(args), "category": category}),
+        )
+        for category in categories
+    }
+
+
+def read_config_sources() -> typing.Dict[str, bytes]:
+    """Return the raw bytes of every config file ``load_configurations`` reads."""
+    files = [("stellarspider.conf", "config.yaml")] + [
+        ("stellarspider.conf.category", f"{category}.yaml") for category in CATEGORIES
+    ]
+
+    sources = {}
+    for package_path, filename in files:
+        try:
+            resource = importlib.resources.files(package_path).joinpath(filename)
+            sources[f"{package_path}/{filename}"] = resource.read_bytes()
+        except (FileNotFoundError, ModuleNotFoundError, ImportError):
+            continue
+    return sources
+
+
+def load_final_configs(
+    args: argparse.Namespace,
+) -> typing.Tuple[
+    "omegaconf.DictConfig",
+    typing.Dict[str, "omegaconf.DictConfig"],
+    typing.Dict[str, RuleBasedFilter],
+]:
+    """Return the final config, each category's config and its rule filter.
+
+    Merged configs and the rule filters built from them are kept in a
+    snapshot cache, keyed by the config sources and every option that
+    shapes them, so repeated runs skip YAML parsing, merging and building,
+    and never import OmegaConf: configs are returned as plain dicts.
+    """
+    snapshot_cache = None if args.no_config_cache else ConfigSnapshotCache()
+
+    options = {name: getattr(args, name) for name in SNAPSHOT_OPTIONS}
+    snapshot = None
+    if snapshot_cache is not None:
+        key = snapshot_cache.key(read_config_sources(), options)
+        snapshot = snapshot_cache.load(key)
+
+    if snapshot is None:
+        import omegaconf
+
+        main_config, category_configs = load_configurations()
+        # Run options are applied below, to fresh and loaded snapshots alike
+        merge_args = create_parser().parse_args([])
+        for name in SNAPSHOT_OPTIONS:
+            setattr(merge_args, name, getattr(args, name))
+        final_config = create_final_config(main_config, category_configs, merge_args)
+        categories = final_config.get("categories") or [args.category]
+        configs = create_category_configs(
+            main_config, category_configs, merge_args, categories
+        )
+        snapshot = {
+            "config": omegaconf.OmegaConf.to_container(final_config, resolve=True),
+            "category_configs": {
+                category: omegaconf.OmegaConf.to_container(config, resolve=True)
+                for category, config in configs.items()
+            },
+            "rule_filters": {
+                category: RuleBasedFilterBuilder(config).build()
+                for category, config in configs.items()
+            },
+        }
+        if snapshot_cache is not None:
+            snapshot_cache.store(key, snapshot)
+
+    final_config = snapshot["config"]
+    apply_run_options(final_config, args)
+    for config in snapshot["category_configs"].values():
+        apply_run_options(config, args)
+
+    return final_config, snapshot["category_configs"], snapshot["rule_filters"]
+
+
+def process_category(
+    final_config: "omegaconf.DictConfig",
+    data_loader: DataLoader,
+    output_handler: OutputHandler,
+    rule_filter: typing.Optional[RuleBasedFilter] = None,
+) -> int:
+    """Score the input against a single category.
+
+    Returns the number of products written.
+    """
+    logger = logging.getLogger(__name__)
+
+    workers = final_config.get("workers", 1)
+    if workers == 1:
+        pipeline = FilterPipeline.from_config(final_config, rule_filter=rule_filter)
+    else:
+        pipeline = ParallelFilterPipeline.from_config(final_config, workers)
+    pipeline = with_dedup(final_config, with_score_store(final_config, pipeline))
+
+    with pipeline:
+        input_format = final_config.get("input_format", "json")
+
+        top = final_config.get("top")
+        min_score = final_config.get("min_score")
+
+        chunked = top is not None or min_score is not None or final_config.get("stream")
+        if chunked and any((final_config.get("rerank") or {}).values()):
+            logger.warning(
+                "--rerank, --rerank-margin and --time-budget pick candidates "
+                "across the whole input, so every product is held in memory "
+                "even with --stream, --top or --min-score"
+            )
+
+        if top is not None or min_score is not None:
+            # Rank while streaming so only the winners are kept and written
+            products = data_loader.stream(final_config.get("input"), input_format)
+            ranked_products = pipeline.process_top(
+                products, top, min_score, final_config.get("chunk_size", 1000)
+            )
+            output_handler.write(ranked_products)
+            return len(ranked_products)
+
+        if final_config.get("stream", False):
+            # Stream products through the pipeline and out in chunks
+            products = data_loader.stream(final_config.get("input"), input_format)
+            scored_products = pipeline.process_stream(
+                products, final_config.get("chunk_size", 1000)
+            )
+            return output_handler.write_stream(scored_products)
+
+        # Load input data
+        products = data_loader.load(final_config.get("input"), input_format)
+        logger.info(f"Loaded {len(products)} products")
+
+        # Run pipeline
+        filtered_products = pipeline.process(products)
+
+        # Output results
+        output_handler.write(filtered_products)
+        return len(filtered_products)
+
+
+@contextlib.contextmanager
+def instrumented(args: argparse.Namespace) -> typing.Iterator[None]:
+    """Profile and record the stages of a run as the options ask."""
+    recorder = None
+    with contextlib.ExitStack() as stack:
+        if args.profile:
+            stack.enter_context(instrumentation.profiling(args.profile, args.profiler))
+        if args.metrics:
+            recorder = instrumentation.Recorder(args.trace_allocations)
+            stack.enter_context(instrumentation.recording(recorder))
+        yield
+
+    if recorder is not None:
+        instrumentation.write_metrics(
+            recorder.summary(), args.metrics, args.metrics_file
+        )
+
+
+def process_categories(
+    final_config: "omegaconf.DictConfig",
+    configs: typing.Dict[str, "omegaconf.DictConfig"],
+    data_loader: DataLoader,
+    output_handler: OutputHandler,
+    rule_filters: typing.Optional[typing.Dict[str, RuleBasedFilter]] = None,
+) -> int:
+    """Score the input against several categories in one pass.
+
+    Returns the number of products written.
+    """
+    pipeline = MultiCategoryPipeline.from_configs(configs, rule_filters)
+    products = data_loader.stream(
+        final_config.get("input"), final_config.get("input_format", "json")
+    )
+    chunk_size = final_config.get("chunk_size", 1000)
+    top = final_config.get("top")
+    min_score = final_config.get("min_score")
+    best_only = final_config.get("category_output", "rankings") == "best"
+
+    if final_config.get("stream", False):
+        # Products are written in input order as each chunk is scored
+        if best_only:
+            scored = pipeline.best_stream(products, chunk_size)
+        else:
+            scored = (
+                product
+                for by_category in pipeline.process_stream(products, chunk_size)
+                for product in by_category.values()
+            )
+        return output_handler.write_stream(scored)
+
+    if best_only:
+        ranked_products = pipeline.best(products, top, min_score, chunk_size)
+        output_handler.write(ranked_products)
+        return len(ranked_products)
+
+    rankings = pipeline.rank(products, top, min_score, chunk_size)
+    output_handler.write_groups(rankings)
+    return sum(len(ranked) for ranked in rankings.values())
+
+
+def with_score_store(
+    config: "omegaconf.DictConfig", pipeline: FilterPipeline
+) -> FilterPipeline:
+    """Wrap a pipeline to reuse stored scores if the config asks for it."""
+    if not config.get("incremental", False):
+        return pipeline
+
+    from stellarspider.core.incremental_pipeline import IncrementalFilterPipeline
+
+    return IncrementalFilterPipeline.from_config(config, pipeline)
+
+
+def with_dedup(
+    config: "omegaconf.DictConfig", pipeline: FilterPipeline
+) -> FilterPipeline:
+    """Wrap a pipeline to collapse near-duplicates if the config asks for it."""
+    if not config.get("dedup"):
+        return pipeline
+
+    from stellarspider.core.dedup_pipeline import DedupFilterPipeline
+
+    return DedupFilterPipeline.from_config(config, pipeline)
+
+
+class VersionAction(argparse.Action):
+    """Print the installed version, looked up only when asked for."""
+
+    def __init__(self, option_strings, dest=argparse.SUPPRESS, **kwargs):
+        super().__init__(
+            option_strings, dest, nargs=0, default=argparse.SUPPRESS, **kwargs
+        )
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        import importlib.metadata
+
+        version = importlib.metadata.version("stellarspider")
+        parser.exit(message=f"{parser.prog} {version}\n")
+
+
 def check_stdin_available() -> bool:
     """Check if stdin has data available without blocking."""
     import select
@@ -305,8 +729,18 @@ def check_stdin_available() -> bool:
     return not sys.stdin.isatty()
 
 
-def main() -> None:
-    """Main entry point with argument parsing."""
+def parse_categories(value: str) -> typing.List[str]:
+    """Parse a comma separated list of categories."""
+    return [c.strip() for c in value.split(",") if c.strip()]
+
+
+def parse_fields(value: str) -> typing.List[str]:
+    """Parse a comma separated list of product fields."""
+    return [f.strip() for f in value.split(",") if f.strip()]
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """Create the argument parser of the main command."""
     parser = argparse.ArgumentParser(
         description="NLP product filtering system",
         epilog="""
@@ -314,14 +748,25 @@ Examples:
   stellarspider --category salmon -i testdata/salmon_data.json
   stellarspider --category peanuts -i testdata/peanuts_data.json
   echo '[]' | stellarspider --category salmon
+  stellarspider --stream --input-format ndjson --output-format ndjson -i crawl.ndjson
+  stellarspider --category salmon -i 'crawl/*/salmon-*.json' extra.json
+  stellarspider --category salmon --top 50 --min-score 0.3 -i crawl.json
+  stellarspider --category salmon --output-format parquet -i crawl.json > ranked.parquet
+  stellarspider --category salmon --explain none -i crawl.json
+  stellarspider --category peanuts --cascade drop --min-rule-score 0 -i crawl.json
+  stellarspider --category salmon --rerank 200 --time-budget 0.5 -i crawl.json
+  stellarspider --category salmon --input-fields --compact -i crawl.json
+  stellarspider --categories salmon,peanuts --category-output best -i crawl.json
+  stellarspider serve --port 8765
+  stellarspider index query catalog.idx --like https://example.com/salmon-fillet
         """,
         formatter_class=argparse.RawDescriptionHelpFormatter,
     )
 
     parser.add_argument(
         "--version",
-        action="version",
-        version=f"%(prog)s {importlib.metadata.version('stellarspider')}",
+        action=VersionAction,
+        help="show program's version number and exit",
     )
 
     parser.add_argument(
@@ -332,7 +777,530 @@ Examples:
     )
 
     parser.add_argument(
-        "--input", "-i", help="Input JSON file (use - or omit for stdin)"
+        "--categories",
+        type=parse_categories,
+        metavar="A,B,...",
+        help="Score against several categories in one pass (overrides --category)",
+    )
+
+    parser.add_argument(
+        "--category-output",
+        choices=["rankings", "best"],
+        help="With --categories: one ranking per category, or each product "
+        "once under its best category (default: rankings)",
+    )
+
+    parser.add_argument(
+        "--input",
+        "-i",
+        nargs="+",
+        metavar="PATH",
+        help="Input JSON or NDJSON files or globs (use - or omit for stdin); "
+        "products of several files are tagged with their Source",
+    )
+
+    parser.add_argument(
+        "--input-format",
+        choices=INPUT_FORMATS,
+        help="Input format: one JSON array or NDJSON (default: json)",
+    )
+
+    parser.add_argument(
+        "--input-workers",
+        type=int,
+        metavar="N",
+        help="Threads reading and decoding several input files (default: 8)",
+    )
+
+    parser.add_argument(
+        "--input-fields",
+        nargs="?",
+        const=list(PRODUCT_FIELDS),
+        type=parse_fields,
+        metavar="A,B,...",
+        help="Only keep these fields of each product, skipping the others "
+        f"while decoding (without a list: {','.join(PRODUCT_FIELDS)})",
+    )
+
+    parser.add_argument(
+        "--output-format",
+        choices=OUTPUT_FORMATS,
+        help="Output format: one JSON array, NDJSON, or columns of the main "
+        "scores as CSV, TSV, an Arrow IPC stream or Parquet (default: json)",
+    )
+
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Write JSON without indentation or spaces after separators",
+    )
+
+    parser.add_argument(
+        "--json-backend",
+        choices=JSON_BACKENDS,
+        help="JSON library to decode and encode with; auto decodes with "
+        "msgspec when installed and encodes ASCII-escaped output with the "
+        "standard library (default: auto)",
+    )
+
+    parser.add_argument(
+        "--explain",
+        choices=tuple(EXPLAIN_LEVELS),
+        help="Explanations written with each product's scores: none (scores "
+        "and prices only), summary (plus the rule reasoning) or full "
+        "(plus every breakdown; default)",
+    )
+
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Score products in chunks and write them as they are produced, "
+        "in input order instead of ranked",
+    )
+
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        help="Products per chunk in streaming and parallel runs (default: 1000)",
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        metavar="N",
+        help="Score chunks in N worker processes; 0 uses every CPU core (default: 1)",
+    )
+
+    parser.add_argument(
+        "--rule-engine",
+        choices=["default", "sparse"],
+        help="Keyword scoring engine; sparse scores whole chunks as one "
+        "keyword matrix (default: default)",
+    )
+
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Reuse the stored scores of products seen before with the same "
+        "config and only score new or changed ones",
+    )
+
+    parser.add_argument(
+        "--dedup",
+        choices=["copy", "group"],
+        help="Score one product per group of near-duplicates and copy its "
+        "scores to the others, or list them under it",
+    )
+
+    parser.add_argument(
+        "--dedup-threshold",
+        type=float,
+        metavar="S",
+        help="Similarity from 0 to 1 at which products are near-duplicates "
+        "(default: 0.8)",
+    )
+
+    parser.add_argument(
+        "--cascade",
+        nargs="?",
+        const="minimal",
+        choices=["minimal", "drop"],
+        help="Reject products that hit a category's reject keywords, or score "
+        "below --min-rule-score, before price and semantic scoring; keep them "
+        "with a final score of 0 (minimal, default) or drop them",
+    )
+
+    parser.add_argument(
+        "--min-rule-score",
+        type=float,
+        metavar="S",
+        help="With --cascade, also reject products whose rule score is below S",
+    )
+
+    parser.add_argument(
+        "--rerank",
+        type=int,
+        metavar="N",
+        help="Only give the N best products by rule score a semantic score",
+    )
+
+    parser.add_argument(
+        "--rerank-margin",
+        type=float,
+        metavar="S",
+        help="Only give a semantic score to products within S rule points of the best",
+    )
+
+    parser.add_argument(
+        "--time-budget",
+        type=float,
+        metavar="SECONDS",
+        help="Stop semantic scoring after SECONDS, working through products "
+        "in rule-score order; the rest are ranked by rule score alone",
+    )
+
+    parser.add_argument(
+        "--semantic-model",
+        metavar="PATH",
+        help="Local sentence-transformers model directory for semantic scoring",
+    )
+
+    parser.add_argument(
+        "--embedding-cache",
+        metavar="DIR",
+        help="Directory of the persistent embedding cache for --semantic-model",
+    )
+
+    parser.add_argument(
+        "--top",
+        type=int,
+        metavar="N",
+        help="Only output the N best-scoring products",
+    )
+
+    parser.add_argument(
+        "--min-score",
+        type=float,
+        help="Only output products with at least this final score",
+    )
+
+    parser.add_argument(
+        "--metrics",
+        choices=instrumentation.METRICS_FORMATS,
+        help="Record time, CPU and products of each stage and write them as "
+        "a JSON summary or a Prometheus textfile",
+    )
+
+    parser.add_argument(
+        "--metrics-file",
+        metavar="PATH",
+        help="Write --metrics to this file instead of stderr",
+    )
+
+    parser.add_argument(
+        "--trace-allocations",
+        action="store_true",
+        help="Also record the peak memory allocated in each stage (slower)",
+    )
+
+    parser.add_argument(
+        "--profile",
+        metavar="PATH",
+        help="Profile the run and write the dump to PATH",
+    )
+
+    parser.add_argument(
+        "--profiler",
+        choices=instrumentation.PROFILERS,
+        default="cprofile",
+        help="Profiler of --profile: cprofile (pstats dump) or tracemalloc "
+        "(snapshot at peak memory) (default: cprofile)",
+    )
+
+    parser.add_argument(
+        "--no-config-cache",
+        action="store_true",
+        help="Rebuild the configuration instead of using the cached snapshot",
+    )
+
+    parser.add_argument(
+        "--verbose",
+        "-v",
+        action="count",
+        default=0,
+        help="Increase verbosity (use -v, -vv, -vvv)",
+    )
+
+    return parser
+
+
+def create_serve_parser() -> argparse.ArgumentParser:
+    """Create the argument parser of the serve command."""
+    parser = argparse.ArgumentParser(
+        prog="stellarspider serve",
+        description="Keep warm pipelines in memory and score products sent "
+        "over HTTP, on localhost or a Unix socket",
+        epilog="""
+Endpoints:
+  GET  /health
+  POST /score/<category>[?top=N&min_score=S&format=ndjson]
+       body: JSON array, or NDJSON with Content-Type: application/x-ndjson
+
+Examples:
+  stellarspider serve --port 8765
+  stellarspider serve --socket /run/stellarspider.sock --categories salmon
+  curl -s --data-binary @testdata/salmon_data.json localhost:8765/score/salmon
+        """,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+
+    parser.add_argument(
+        "--host", default="127.0.0.1", help="Address to listen on (default: 127.0.0.1)"
+    )
+
+    parser.add_argument(
+        "--port", type=int, default=8765, help="Port to listen on (default: 8765)"
+    )
+
+    parser.add_argument(
+        "--socket",
+        metavar="PATH",
+        help="Listen on this Unix socket instead of --host and --port",
+    )
+
+    parser.add_argument(
+        "--categories",
+        type=parse_categories,
+        default=CATEGORIES,
+        metavar="A,B,...",
+        help="Categories to serve (default: all)",
+    )
+
+    parser.add_argument(
+        "--max-batch",
+        type=int,
+        default=1000,
+        metavar="N",
+        help="Score requests arriving together in batches of up to N products "
+        "(default: 1000)",
+    )
+
+    parser.add_argument(
+        "--batch-wait-ms",
+        type=float,
+        default=0.0,
+        metavar="MS",
+        help="How long a batch waits for more requests; requests that arrive "
+        "while a batch is scored are always batched (default: 0)",
+    )
+
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        help="Products per chunk scored at once (default: 1000)",
+    )
+
+    parser.add_argument(
+        "--rule-engine",
+        choices=["default", "sparse"],
+        help="Keyword scoring engine (default: default)",
+    )
+
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Reuse the stored scores of products seen before",
+    )
+
+    parser.add_argument(
+        "--json-backend",
+        choices=JSON_BACKENDS,
+        help="JSON library to decode and encode with (default: auto)",
+    )
+
+    parser.add_argument(
+        "--semantic-model",
+        metavar="PATH",
+        help="Local sentence-transformers model directory for semantic scoring",
+    )
+
+    parser.add_argument(
+        "--embedding-cache",
+        metavar="DIR",
+        help="Directory of the persistent embedding cache for --semantic-model",
+    )
+
+    parser.add_argument(
+        "--no-config-cache",
+        action="store_true",
+        help="Rebuild the configuration instead of using the cached snapshot",
+    )
+
+    parser.add_argument(
+        "--verbose",
+        "-v",
+        action="count",
+        default=0,
+        help="Increase verbosity (use -v, -vv, -vvv)",
+    )
+
+    return parser
+
+
+# Options of the serve command that are merged into the configs like those
+# of the main command
+SERVE_CONFIG_OPTIONS = (
+    "categories",
+    "chunk_size",
+    "rule_engine",
+    "incremental",
+    "json_backend",
+    "semantic_model",
+    "embedding_cache",
+    "no_config_cache",
+    "verbose",
+)
+
+
+def serve(argv: typing.Sequence[str]) -> None:
+    """Run the scoring daemon until it is interrupted."""
+    from stellarspider.io.server import BatchScorer, make_server
+
+    serve_args = create_serve_parser().parse_args(argv)
+    setup_logging(serve_args.verbose)
+
+    # Configs are merged exactly as for a --categories run
+    args = create_parser().parse_args([])
+    for name in SERVE_CONFIG_OPTIONS:
+        setattr(args, name, getattr(serve_args, name))
+    args.category = serve_args.categories[0]
+    final_config, configs, rule_filters = load_final_configs(args)
+
+    # Categories with the same model share one loaded backend
+    backends: typing.Dict = {}
+    pipelines = {
+        category: with_score_store(
+            config,
+            FilterPipeline.from_config(
+                config, backends, rule_filter=rule_filters.get(category)
+            ),
+        )
+        for category, config in configs.items()
+    }
+    scorer = BatchScorer(
+        pipelines,
+        max_batch=serve_args.max_batch,
+        max_wait=serve_args.batch_wait_ms / 1000,
+        chunk_size=final_config.get("chunk_size", 1000),
+    )
+    server = make_server(
+        scorer,
+        serve_args.host,
+        serve_args.port,
+        serve_args.socket,
+        JsonCodec.from_config(final_config),
+    )
+    address = serve_args.socket or f"http://{serve_args.host}:{serve_args.port}"
+    print(f"Serving {', '.join(pipelines)} on {address}", file=sys.stderr)
+
+    # Stop like on Ctrl-C, so queued requests are answered and the socket removed
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        scorer.close()
+
+
+def parse_size(value: str) -> int:
+    """Parse a product count such as ``5000``, ``10k`` or ``1M``."""
+    multipliers = {"k": 1_000, "m": 1_000_000}
+    suffix = value[-1:].lower()
+    try:
+        if suffix in multipliers:
+            size = int(float(value[:-1]) * multipliers[suffix])
+        else:
+            size = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size: {value!r}")
+    if size < 1:
+        raise argparse.ArgumentTypeError(f"size must be positive: {value!r}")
+    return size
+
+
+def create_bench_parser() -> argparse.ArgumentParser:
+    """Create the argument parser of the bench command."""
+    from stellarspider.bench.runner import STAGES
+
+    parser = argparse.ArgumentParser(
+        prog="stellarspider bench",
+        description="Time each scoring stage on seeded synthetic listings and "
+        "compare throughput against a stored baseline",
+        epilog="""
+Examples:
+  stellarspider bench --sizes 1k,10k,100k
+  stellarspider bench --sizes 10k --save-baseline bench.json
+  stellarspider bench --sizes 10k --baseline bench.json --threshold 0.2
+        """,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+
+    parser.add_argument(
+        "--sizes",
+        type=lambda value: [parse_size(size) for size in value.split(",")],
+        default=[1000, 10000],
+        metavar="N,N,...",
+        help="Numbers of products to generate, e.g. 1k,100k,1M (default: 1k,10k)",
+    )
+
+    parser.add_argument(
+        "--stages",
+        type=lambda value: [stage.strip() for stage in value.split(",")],
+        default=list(STAGES),
+        metavar="A,B,...",
+        help=f"Stages to time (default: {','.join(STAGES)})",
+    )
+
+    parser.add_argument(
+        "--category",
+        choices=CATEGORIES,
+        default="salmon",
+        help="Category whose config scores the products (default: salmon)",
+    )
+
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Seed of the generator (default: 0)"
+    )
+
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Run each stage N times and keep the fastest (default: 1)",
+    )
+
+    parser.add_argument(
+        "--rule-engine",
+        choices=["default", "sparse"],
+        help="Keyword scoring engine (default: default)",
+    )
+
+    parser.add_argument(
+        "--semantic-model",
+        metavar="PATH",
+        help="Local sentence-transformers model directory for semantic scoring",
+    )
+
+    parser.add_argument(
+        "--baseline",
+        metavar="PATH",
+        help="Fail if a stage is slower than in this baseline by --threshold",
+    )
+
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Largest allowed drop in throughput, as a fraction (default: 0.2)",
+    )
+
+    parser.add_argument(
+        "--save-baseline",
+        metavar="PATH",
+        help="Store the results as a baseline for later runs",
+    )
+
+    parser.add_argument(
+        "--no-isolate",
+        action="store_true",
+        help="Run every size in this process; peak RSS then accumulates",
+    )
+
+    parser.add_argument(
+        "--json", action="store_true", help="Print results as JSON instead of a table"
     )
 
     parser.add_argument(
@@ -343,6 +1311,258 @@ Examples:
         help="Increase verbosity (use -v, -vv, -vvv)",
     )
 
+    return parser
+
+
+def bench(argv: typing.Sequence[str]) -> None:
+    """Run the benchmarks, exiting with 1 if throughput regressed."""
+    import json
+
+    from stellarspider.bench.baseline import compare, load_baseline, save_baseline
+    from stellarspider.bench.generator import ProductGenerator
+    from stellarspider.bench.runner import BenchmarkRunner, format_table
+
+    parser = create_bench_parser()
+    bench_args = parser.parse_args(argv)
+    setup_logging(bench_args.verbose)
+
+    # Stages are scored with the category config of a regular run
+    args = create_parser().parse_args(["--category", bench_args.category])
+    args.rule_engine = bench_args.rule_engine
+    args.semantic_model = bench_args.semantic_model
+    final_config, _, _ = load_final_configs(args)
+
+    try:
+        runner = BenchmarkRunner(
+            final_config,
+            ProductGenerator(bench_args.seed),
+            stages=bench_args.stages,
+            repeat=bench_args.repeat,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    run = runner.run if bench_args.no_isolate else runner.run_isolated
+    results = [result for size in bench_args.sizes for result in run(size)]
+
+    if bench_args.json:
+        json.dump(
+            [
+                {**result._asdict(), "products_per_second": result.products_per_second}
+                for result in results
+            ],
+            sys.stdout,
+            indent=2,
+        )
+        print()
+    else:
+        print(format_table(results))
+
+    if bench_args.save_baseline:
+        save_baseline(bench_args.save_baseline, results)
+
+    if bench_args.baseline:
+        regressions = compare(
+            results, load_baseline(bench_args.baseline), bench_args.threshold
+        )
+        for regression in regressions:
+            print(
+                f"Regression: {regression.stage} at {regression.size} products "
+                f"{regression.current:,.0f}/s, baseline {regression.baseline:,.0f}/s "
+                f"({regression.drop:.0%} slower)",
+                file=sys.stderr,
+            )
+        if regressions:
+            sys.exit(1)
+
+
+def create_index_parser() -> argparse.ArgumentParser:
+    """Create the argument parser of the index command."""
+    parser = argparse.ArgumentParser(
+        prog="stellarspider index",
+        description="Build a persistent vector index of a catalog and find "
+        "products like a text or another product without re-embedding it",
+        epilog="""
+Examples:
+  stellarspider index build catalog.idx -i crawl.ndjson --input-format ndjson \\
+      --semantic-model models/all-MiniLM-L6-v2
+  stellarspider index query catalog.idx --like https://example.com/salmon-fillet
+  stellarspider index query catalog.idx --text "smoked sockeye" --top 20
+        """,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = commands.add_parser(
+        "build", help="Embed a catalog and write an index of it"
+    )
+    build_parser.add_argument("path", help="Index directory to write")
+    build_parser.add_argument(
+        "--input",
+        "-i",
+        nargs="+",
+        metavar="PATH",
+        help="Input JSON or NDJSON files or globs (use - or omit for stdin)",
+    )
+    build_parser.add_argument(
+        "--input-format",
+        choices=INPUT_FORMATS,
+        help="Input format: one JSON array or NDJSON (default: json)",
+    )
+    build_parser.add_argument(
+        "--category",
+        choices=CATEGORIES,
+        default="salmon",
+        help="Category whose semantic settings embed the products (default: salmon)",
+    )
+    build_parser.add_argument(
+        "--semantic-model",
+        metavar="PATH",
+        help="Local sentence-transformers model directory embedding the products",
+    )
+    build_parser.add_argument(
+        "--embedding-cache",
+        metavar="DIR",
+        help="Directory of the persistent embedding cache for --semantic-model",
+    )
+    build_parser.add_argument(
+        "--lists",
+        type=int,
+        metavar="N",
+        help="Number of inverted lists; 0 searches exhaustively "
+        "(default: about 4*sqrt(products) from 10k products)",
+    )
+    build_parser.add_argument(
+        "--chunk-size",
+        type=int,
+        metavar="N",
+        help="Products embedded and written at a time (default: 1000)",
+    )
+
+    query_parser = commands.add_parser(
+        "query", help="Print the products most similar to a text or a product"
+    )
+    query_parser.add_argument("path", help="Index directory to query")
+    target = query_parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--text", help="Find products similar to this text")
+    target.add_argument(
+        "--like", metavar="URL", help="Find products similar to the one at URL"
+    )
+    query_parser.add_argument(
+        "--top",
+        type=int,
+        default=10,
+        metavar="K",
+        help="Number of products to print (default: 10)",
+    )
+    query_parser.add_argument(
+        "--nprobe",
+        type=int,
+        default=32,
+        metavar="N",
+        help="Inverted lists searched per query; more is slower and more exact "
+        "(default: 32)",
+    )
+    query_parser.add_argument(
+        "--semantic-model",
+        metavar="PATH",
+        help="Model embedding --text (default: the model that built the index)",
+    )
+
+    for command_parser in (build_parser, query_parser):
+        command_parser.add_argument(
+            "--verbose",
+            "-v",
+            action="count",
+            default=0,
+            help="Increase verbosity (use -v, -vv, -vvv)",
+        )
+
+    return parser
+
+
+def index(argv: typing.Sequence[str]) -> None:
+    """Build a vector index of a catalog or query one."""
+    import json
+
+    # Imported here so the main command never loads numpy
+    from stellarspider.core.filters.semantic import SemanticFilterBuilder
+    from stellarspider.core.vector_index import VectorIndex
+
+    parser = create_index_parser()
+    index_args = parser.parse_args(argv)
+    setup_logging(index_args.verbose)
+
+    if index_args.command == "build":
+        # Products are embedded with the semantic settings of a regular run
+        args = create_parser().parse_args(["--category", index_args.category])
+        for name in ("input", "input_format", "semantic_model", "embedding_cache"):
+            setattr(args, name, getattr(index_args, name))
+        final_config, _, _ = load_final_configs(args)
+        semantic_config = final_config.get("semantic") or {}
+        if not semantic_config.get("model_path"):
+            parser.error("index build needs --semantic-model or semantic.model_path")
+
+        backend = SemanticFilterBuilder(final_config)._build_backend(semantic_config)
+        products = DataLoader.from_config(final_config).stream(
+            final_config.get("input"), final_config.get("input_format", "json")
+        )
+        VectorIndex.build(
+            index_args.path,
+            backend,
+            products,
+            lists=index_args.lists,
+            chunk_size=index_args.chunk_size or final_config.get("chunk_size", 1000),
+            batch_size=semantic_config.get("batch_size", 32),
+        ).close()
+        return
+
+    try:
+        vector_index = VectorIndex(index_args.path)
+    except ValueError as e:
+        parser.error(str(e))
+
+    with vector_index:
+        if index_args.like:
+            try:
+                results = vector_index.search_like(
+                    index_args.like, index_args.top, index_args.nprobe
+                )
+            except KeyError:
+                parser.error(f"No product with URL {index_args.like} in the index")
+        else:
+            backend = SemanticFilterBuilder({})._build_backend(
+                {"model_path": index_args.semantic_model or vector_index.model_id}
+            )
+            results = vector_index.search_text(
+                backend, index_args.text, index_args.top, index_args.nprobe
+            )
+
+    json.dump(
+        [
+            {**result.product, "similarity": round(result.similarity, 6)}
+            for result in results
+        ],
+        sys.stdout,
+        indent=2,
+        ensure_ascii=False,
+    )
+    print()
+
+
+def main() -> None:
+    """Main entry point with argument parsing."""
+    if sys.argv[1:2] == ["serve"]:
+        serve(sys.argv[2:])
+        return
+    if sys.argv[1:2] == ["bench"]:
+        bench(sys.argv[2:])
+        return
+    if sys.argv[1:2] == ["index"]:
+        index(sys.argv[2:])
+        return
+
+    parser = create_parser()
+
     try:
         args = parser.parse_args()
 
@@ -369,28 +1589,44 @@ Examples:
             print("\nFor help: stellarspider --help", file=sys.stderr)
             sys.exit(1)
 
-        # Load configurations
-        main_config, category_configs = load_configurations()
-
-        # Create final config
-        final_config = create_final_config(main_config, category_configs, args)
+        # Load configurations, from the snapshot cache when possible
+        final_config, configs, rule_filters = load_final_configs(args)
 
         logger.info(f"Starting stellarspider with category: {args.category}")
 
-        # Load input data
-        data_loader = DataLoader()
-        products = data_loader.load(final_config.get("input"))
-        logger.info(f"Loaded {len(products)} products")
+        data_loader = DataLoader.from_config(final_config)
+        output_handler = OutputHandler(final_config["output"], data_loader.codec)
 
-        # Create and run pipeline
-        pipeline = FilterPipeline.from_config(final_config)
-        filtered_products = pipeline.process(products)
+        categories = final_config.get("categories")
+        if categories:
+            if final_config.get("workers", 1) != 1:
+                logger.warning("--workers is not supported with --categories")
+            if final_config.get("incremental", False):
+                logger.warning("--incremental is not supported with --categories")
+            if final_config.get("dedup"):
+                logger.warning("--dedup is not supported with --categories")
+            if (final_config.get("cascade") or {}).get("enabled"):
+                logger.warning("--cascade is not supported with --categories")
+            if any((final_config.get("rerank") or {}).values()):
+                logger.warning(
+                    "--rerank, --rerank-margin and --time-budget are not "
+                    "supported with --categories"
+                )
 
-        # Output results
-        output_handler = OutputHandler(final_config.output)
-        output_handler.write(filtered_products)
+        with instrumented(args):
+            if categories:
+                processed_count = process_categories(
+                    final_config, configs, data_loader, output_handler, rule_filters
+                )
+            else:
+                processed_count = process_category(
+                    final_config,
+                    data_loader,
+                    output_handler,
+                    rule_filters.get(args.category),
+                )
 
-        logger.info(f"Processed {len(filtered_products)} products")
+        logger.info(f"Processed {processed_count} products")
 
     except KeyboardInterrupt:
         print("\nInterrupted by user", file=sys.stderr)
@@ -0,0 +1,80 @@
+import json
+import platform
+import typing
+
+from stellarspider.bench.runner import StageResult
+
+BASELINE_VERSION = 1
+
+
+class Regression(typing.NamedTuple):
+    """A stage whose throughput dropped below its baseline."""
+
+    size: int
+    stage: str
+    baseline: float
+    current: float
+
+    @property
+    def drop(self) -> float:
+        """Share of the baseline throughput that was lost."""
+        return 1 - self.current / self.baseline
+
+
+def save_baseline(path: str, results: typing.Iterable[StageResult]) -> None:
+    """Store the throughput of every stage and size as a JSON baseline."""
+
+    def rss(result: StageResult) -> typing.Optional[float]:
+        return None if result.peak_rss_mb is None else round(result.peak_rss_mb, 1)
+
+    baseline = {
+        "version": BASELINE_VERSION,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": [
+            {
+                "size": result.size,
+                "stage": result.stage,
+                "products_per_second": round(result.products_per_second, 1),
+                "peak_rss_mb": rss(result),
+            }
+            for result in results
+        ],
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2)
+        f.write("\n")
+
+
+def load_baseline(path: str) -> typing.Dict[typing.Tuple[int, str], float]:
+    """Return the baseline throughput by size and stage."""
+    with open(path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("version") != BASELINE_VERSION:
+        raise ValueError(f"Unsupported baseline version in {path}")
+    return {
+        (entry["size"], entry["stage"]): entry["products_per_second"]
+        for entry in baseline["results"]
+    }
+
+
+def compare(
+    results: typing.Iterable[StageResult],
+    baseline: typing.Mapping[typing.Tuple[int, str], float],
+    threshold: float = 0.2,
+) -> typing.List[Regression]:
+    """Return the stages that lost more than ``threshold`` of their throughput.
+
+    Stages and sizes missing from the baseline are not compared.
+    """
+    regressions = []
+    for result in results:
+        expected = baseline.get((result.size, result.stage))
+        if not expected:
+            continue
+        regression = Regression(
+            result.size, result.stage, expected, result.products_per_second
+        )
+        if regression.drop > threshold:
+            regressions.append(regression)
+    return regressions
@@ -0,0 +1,184 @@
+import json
+import random
+import typing
+
+# Building blocks of listings in the style of testdata/*.json: retailer URLs,
+# names assembled from brand, modifiers, product and size, and the price,
+# stock and cart text that scraped pages wrap around the name
+_RETAILERS = (
+    ("https://www.walmart.com/ip/{slug}/{id}", ""),
+    ("https://www.amazon.com/{slug}/dp/B0{id}", ""),
+    ("https://www.fredmeyer.com/p/{slug}/000{id}", "?fulfillment=PICKUP"),
+    (
+        "https://delivery.pccmarkets.com/store/pcc-community-markets/products/"
+        "{id}-{slug}",
+        "",
+    ),
+    ("https://www.wholefoodsmarket.com/product/{slug}-b0{id}", ""),
+)
+
+_PRODUCTS = {
+    "salmon": (
+        ("Sockeye Salmon", ("Wild", "Wild Alaska", "Pacific", "Wild Caught")),
+        ("Salmon Fillet", ("Atlantic", "Farm-Raised", "Wild", "Coho")),
+        ("Salmon Portions", ("Skinless", "Boneless", "Keta", "Chinook")),
+        ("Smoked Salmon", ("Norwegian", "Scottish", "Cold")),
+        ("Salmon Burgers", ("Seasoned", "Atlantic", "Wild")),
+        ("Canned Pink Salmon", ("Alaska", "Wild")),
+    ),
+    "peanuts": (
+        ("Raw Peanuts", ("Organic", "Spanish", "Jumbo", "Virginia")),
+        ("In-Shell Peanuts", ("Unsalted", "Roasted", "Salted", "Jumbo")),
+        ("Peanuts", ("Honey Roasted", "Dry Roasted", "Blanched", "Valencia")),
+        ("Peanut Butter", ("Creamy", "Crunchy", "Natural")),
+        ("Peanuts Bird and Wildlife Food", ("Raw", "Shelled")),
+    ),
+    "other": (
+        ("Tuna Steaks", ("Yellowfin", "Frozen", "Ahi")),
+        ("Cod Fillets", ("Pacific", "Wild", "Breaded")),
+        ("Almonds", ("Raw", "Roasted", "Organic")),
+        ("Chicken Breast", ("Boneless", "Skinless", "Organic")),
+        ("Cashews", ("Salted", "Whole", "Roasted")),
+    ),
+}
+
+_BRANDS = (
+    "Wild Planet",
+    "Kroger®",
+    "Great Value",
+    "365 by Whole Foods Market",
+    "Hampton Farms",
+    "Kirkland Signature",
+    "Trident Seafoods",
+    "Rani",
+    "Member's Mark",
+    "Simple Truth Organic",
+)
+
+_SIZES = (
+    ("6 oz", 6),
+    ("10 oz", 10),
+    ("12 oz", 12),
+    ("16 oz", 16),
+    ("24 oz. Bag", 24),
+    ("1 lb", 16),
+    ("2 lb bag", 32),
+    ("3 lb", 48),
+    ("4 LBS", 64),
+    ("10 Pounds", 160),
+)
+
+_PRICE_FORMATS = (
+    "Current price: ${price} $ {dollars} {cents}",
+    "Add $ {dollars} {cents} current price ${price}",
+    "Now $ {dollars} {cents} current price Now ${price}",
+    "$ {dollars} . {cents} discounted from ${was} ${per_oz}/oz",
+    "Your Price ${price} each ${price} / ea price per Lb ${per_lb} (${per_lb} / Lb)",
+    "Price: ${price} (${per_lb}/lb)",
+    "${price} ({per_oz_cents}¢/oz)",
+)
+
+_TAILS = (
+    "Many in stock Add",
+    "Add to Cart in Cart",
+    "Free shipping, arrives in 3+ days",
+    "Save with Shipping, arrives in 3+ days Only {stock} left",
+    "SNAP EBT Rated {rating} out of 5, {reviews} reviews",
+    "{rating} {rating} out of 5 stars {reviews}",
+    "Subscribe & Save Sponsored",
+    "Pickup today Delivery in 2 hours",
+)
+
+_DESCRIPTIONS = (
+    "Sustainably sourced.",
+    "No antibiotics, no added hormones.",
+    "Perfect for roasting or eating raw.",
+    "Frozen at peak freshness, previously frozen.",
+    "Great for grilling, baking or pan searing.",
+    "Non-GMO, gluten free, kosher.",
+    "Product of USA.",
+    "Individually vacuum sealed portions.",
+    "",
+)
+
+
+class ProductGenerator:
+    """Seeded generator of synthetic retailer listings.
+
+    Listings mix salmon, peanut and unrelated products with the URL, name
+    and noisy scraped text of ``testdata/*.json``. The same seed always
+    yields the same products, so benchmark runs are comparable.
+    """
+
+    def __init__(self, seed: int = 0, mix: typing.Optional[typing.Dict] = None):
+        self.seed = seed
+        # Share of listings drawn from each product family
+        self.mix = mix or {"salmon": 0.4, "peanuts": 0.4, "other": 0.2}
+
+    def _slug(self, name: str) -> str:
+        words = ("".join(c for c in word if c.isalnum()) for word in name.split())
+        return "-".join(word for word in words if word)
+
+    def _product(self, rng: random.Random, families: typing.List[str]) -> typing.Dict:
+        """Return one listing drawn from ``rng``."""
+        family = rng.choices(families, weights=[self.mix[f] for f in families])[0]
+        noun, modifiers = rng.choice(_PRODUCTS[family])
+        brand = rng.choice(_BRANDS)
+        size, ounces = rng.choice(_SIZES)
+        name = f"{brand} {rng.choice(modifiers)} {noun}"
+        if rng.random() < 0.5:
+            name = f"{name} - {size}"
+
+        price = round(rng.uniform(0.25, 1.5) * ounces + rng.uniform(0, 5), 2)
+        dollars, cents = f"{price:.2f}".split(".")
+        price_text = rng.choice(_PRICE_FORMATS).format(
+            price=f"{price:.2f}",
+            dollars=dollars,
+            cents=cents,
+            was=f"{price * 1.25:.2f}",
+            per_oz=f"{price / ounces:.2f}",
+            per_oz_cents=f"{price / ounces * 100:.1f}",
+            per_lb=f"{price / ounces * 16:.2f}",
+        )
+        tail = rng.choice(_TAILS).format(
+            stock=rng.randint(1, 9),
+            rating=round(rng.uniform(3, 5), 1),
+            reviews=rng.randint(1, 5000),
+        )
+        parts = [price_text, name, size, rng.choice(_DESCRIPTIONS), tail]
+        if rng.random() < 0.5:
+            parts[0], parts[1] = parts[1], parts[0]
+
+        template, query = rng.choice(_RETAILERS)
+        url = template.format(slug=self._slug(name), id=rng.randint(10**7, 10**9))
+        return {
+            "Name": name,
+            "Category": family,
+            "URL": url + query,
+            "CleanedText": " ".join(part for part in parts if part),
+        }
+
+    def products(self, count: int) -> typing.Iterator[typing.Dict]:
+        """Yield ``count`` listings, the same ones for the same seed."""
+        rng = random.Random(self.seed)
+        families = list(self.mix)
+        for _ in range(count):
+            yield self._product(rng, families)
+
+    def write(self, path: str, count: int, output_format: str = "json") -> None:
+        """Write ``count`` listings to ``path`` as a JSON array or NDJSON.
+
+        Listings are written one at a time, so a million of them never have
+        to be held in memory.
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            if output_format == "ndjson":
+                for product in self.products(count):
+                    f.write(json.dumps(product) + "\n")
+            elif output_format == "json":
+                f.write("[")
+                for i, product in enumerate(self.products(count)):
+                    f.write(("," if i else "") + "\n  " + json.dumps(product))
+                f.write("\n]\n")
+            else:
+                raise ValueError(f"Unsupported output format: {output_format}")
@@ -0,0 +1,168 @@
+import contextlib
+import copy
+import logging
+import os
+import sys
+import tempfile
+import time
+import typing
+
+from stellarspider.bench.generator import ProductGenerator
+from stellarspider.core.filters.rule_based import RuleBasedFilterBuilder
+from stellarspider.core.filters.semantic import SemanticFilterBuilder
+from stellarspider.core.scoring.combined_scorer import CombinedScoreCalculator
+from stellarspider.core.scoring.price_extractor import PriceExtractor
+from stellarspider.io.data_loader import DataLoader
+from stellarspider.io.output_handler import OutputHandler
+
+# Stages in the order a run goes through them; each one is timed on its own
+# and works on the products the stage before it produced
+STAGES = ("load", "rule", "price", "semantic", "combine", "output")
+
+
+class StageResult(typing.NamedTuple):
+    """Timing of one stage over one input size."""
+
+    size: int
+    stage: str
+    seconds: float
+    peak_rss_mb: typing.Optional[float]
+
+    @property
+    def products_per_second(self) -> float:
+        return self.size / self.seconds if self.seconds > 0 else float("inf")
+
+
+def peak_rss_mb() -> typing.Optional[float]:
+    """Return the peak resident set size of this process in MiB, if known."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kibibytes, macOS bytes
+    return peak / 1024 / (1024 if sys.platform == "darwin" else 1)
+
+
+class BenchmarkRunner:
+    """Times each scoring stage on synthetic inputs of several sizes.
+
+    Every stage runs ``repeat`` times on a fresh copy of its input and the
+    fastest run is kept, which is the least disturbed by other load. Peak
+    RSS is the high-water mark of the process after the stage, so a size is
+    best run in a process of its own (see ``run_isolated``).
+    """
+
+    def __init__(
+        self,
+        config: typing.Mapping,
+        generator: typing.Optional[ProductGenerator] = None,
+        stages: typing.Sequence[str] = STAGES,
+        repeat: int = 1,
+        work_dir: typing.Optional[str] = None,
+    ):
+        unknown = set(stages) - set(STAGES)
+        if unknown:
+            raise ValueError(f"Unknown stages: {', '.join(sorted(unknown))}")
+        if repeat < 1:
+            raise ValueError(f"repeat must be positive, got {repeat}")
+
+        self.config = config
+        self.generator = generator or ProductGenerator()
+        self.stages = [stage for stage in STAGES if stage in stages]
+        self.repeat = repeat
+        self.work_dir = work_dir
+        self.logger = logging.getLogger(__name__)
+
+    def _build(self) -> typing.Dict[str, typing.Callable]:
+        """Build the component of every stage, outside of the timed code."""
+        rule_filter = RuleBasedFilterBuilder(self.config).build()
+        semantic_filter = SemanticFilterBuilder(self.config).build()
+        price_extractor = PriceExtractor()
+        scoring_config = self.config.get("scoring", {})
+        score_calculator = CombinedScoreCalculator(
+            rule_weight=scoring_config.get("rule_weight", 0.7),
+            semantic_weight=scoring_config.get("semantic_weight", 0.3),
+        )
+        output_handler = OutputHandler(self.config.get("output") or {})
+
+        def extract_prices(products):
+            for product in products:
+                price_extractor.extract(product)
+            return products
+
+        def write(products):
+            with open(os.devnull, "w") as devnull:
+                with contextlib.redirect_stdout(devnull):
+                    output_handler.write(products)
+            return products
+
+        return {
+            "rule": rule_filter.filter_products,
+            "price": extract_prices,
+            "semantic": semantic_filter.filter_products,
+            "combine": score_calculator.calculate_final_score,
+            "output": write,
+        }
+
+    def _time(
+        self, stage: typing.Callable, products: typing.List[typing.Dict]
+    ) -> typing.Tuple[float, typing.List[typing.Dict]]:
+        """Return the fastest of ``repeat`` runs of a stage and its output."""
+        best = float("inf")
+        for _ in range(self.repeat):
+            # Stages add scores in place; every run starts from the same input
+            batch = copy.deepcopy(products) if self.repeat > 1 else products
+            start = time.perf_counter()
+            result = stage(batch)
+            best = min(best, time.perf_counter() - start)
+        return best, result
+
+    def run(self, size: int) -> typing.List[StageResult]:
+        """Time every selected stage on ``size`` generated products."""
+        stages = self._build()
+        results = []
+        with tempfile.TemporaryDirectory(dir=self.work_dir) as tmp:
+            path = os.path.join(tmp, "products.json")
+            self.generator.write(path, size)
+
+            loader = DataLoader()
+            seconds, products = self._time(lambda _: loader.load(path), None)
+            if "load" in self.stages:
+                results.append(StageResult(size, "load", seconds, peak_rss_mb()))
+
+        for name in self.stages:
+            if name == "load":
+                continue
+            seconds, products = self._time(stages[name], products)
+            result = StageResult(size, name, seconds, peak_rss_mb())
+            results.append(result)
+            self.logger.info(
+                f"{name}: {size} products in {seconds:.3f}s "
+                f"({result.products_per_second:,.0f}/s)"
+            )
+        return results
+
+    def run_isolated(self, size: int) -> typing.List[StageResult]:
+        """Run one size in a fresh process, so its peak RSS is its own."""
+        import concurrent.futures
+        import multiprocessing
+
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            return pool.submit(self.run, size).result()
+
+
+def format_table(results: typing.Iterable[StageResult]) -> str:
+    """Return results as a plain text table, one row per size and stage."""
+    lines = [
+        f"{'size':>9}  {'stage':<9} {'seconds':>9} {'products/s':>12} {'RSS MiB':>8}"
+    ]
+    for result in results:
+        rss = "-" if result.peak_rss_mb is None else f"{result.peak_rss_mb:.0f}"
+        lines.append(
+            f"{result.size:>9}  {result.stage:<9} {result.seconds:>9.3f} "
+            f"{result.products_per_second:>12,.0f} {rss:>8}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,117 @@
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import pickle
+import typing
+
+CACHE_DIR_ENV = "STELLARSPIDER_CACHE_DIR"
+
+
+def default_cache_dir() -> str:
+    """Return the per-user cache directory of stellarspider."""
+    cache_dir = os.environ.get(CACHE_DIR_ENV)
+    if cache_dir:
+        return cache_dir
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(cache_home, "stellarspider")
+
+
+def _package_fingerprint() -> typing.List[typing.Tuple[str, int, int]]:
+    """Return path, size and mtime of every module of the package.
+
+    Snapshots hold pickled filters, so any other version of the code, be it
+    an upgrade or an edit in an editable install, must invalidate them. This
+    is also cheaper than looking the version up with importlib.metadata.
+    """
+    package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    fingerprint = []
+    for root, dirs, files in os.walk(package_dir):
+        dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+        for filename in sorted(files):
+            if filename.endswith(".py"):
+                stat = os.stat(os.path.join(root, filename))
+                relative = os.path.relpath(os.path.join(root, filename), package_dir)
+                fingerprint.append((relative, stat.st_size, stat.st_mtime_ns))
+    return fingerprint
+
+
+class ConfigSnapshotCache:
+    """On-disk cache of merged configs and the filters prebuilt from them.
+
+    A snapshot is keyed by the installed package code, the raw bytes of
+    every source YAML file and the options that shaped the merge, so any
+    change to them simply produces a new key. Snapshots are written
+    atomically; unreadable or stale ones are treated as misses. Only the
+    ``max_snapshots`` most recently used are kept, so keys left behind by
+    older code or config files do not pile up.
+    """
+
+    def __init__(self, cache_dir: typing.Optional[str] = None, max_snapshots: int = 16):
+        self.path = os.path.join(cache_dir or default_cache_dir(), "config")
+        self.max_snapshots = max_snapshots
+        self.logger = logging.getLogger(__name__)
+
+    def key(self, sources: typing.Mapping[str, bytes], options: typing.Mapping) -> str:
+        """Return the snapshot key of config sources and merge options."""
+        digest = hashlib.sha256()
+        header = {"code": _package_fingerprint(), "options": options}
+        digest.update(json.dumps(header, sort_keys=True, default=str).encode())
+        for name in sorted(sources):
+            digest.update(f"\0{name}\0{len(sources[name])}\0".encode())
+            digest.update(sources[name])
+        return digest.hexdigest()
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.pickle")
+
+    def load(self, key: str) -> typing.Optional[typing.Dict]:
+        """Return the snapshot stored under key, or None if there is none."""
+        try:
+            with open(self._file(key), "rb") as f:
+                snapshot = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.debug(f"Ignoring unreadable config snapshot {key}: {e}")
+            return None
+
+        # Mark it as recently used, so pruning keeps it
+        with contextlib.suppress(OSError):
+            os.utime(self._file(key))
+        self.logger.debug(f"Loaded config snapshot {key}")
+        return snapshot
+
+    def store(self, key: str, snapshot: typing.Dict) -> None:
+        """Store a snapshot; failures only cost the next startup a rebuild."""
+        tmp_path = f"{self._file(key)}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.path, mode=0o700, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._file(key))
+        except Exception as e:
+            self.logger.debug(f"Could not store config snapshot {key}: {e}")
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+            return
+
+        self.logger.debug(f"Stored config snapshot {key}")
+        self._prune()
+
+    def _prune(self) -> None:
+        """Remove all but the ``max_snapshots`` most recently used snapshots."""
+        snapshots = []
+        with contextlib.suppress(OSError), os.scandir(self.path) as entries:
+            for entry in entries:
+                if entry.name.endswith(".pickle"):
+                    with contextlib.suppress(OSError):
+                        snapshots.append((entry.stat().st_mtime_ns, entry.path))
+
+        snapshots.sort(reverse=True)
+        for _, path in snapshots[self.max_snapshots :]:
+            with contextlib.suppress(OSError):
+                os.remove(path)
@@ -0,0 +1,146 @@
+import collections
+import logging
+import typing
+
+from stellarspider.core import instrumentation
+from stellarspider.core.near_duplicates import MinHashIndex
+from stellarspider.core.pipeline import FilterPipeline
+from stellarspider.core.scoring.price_extractor import PriceExtractor
+
+if typing.TYPE_CHECKING:
+    import omegaconf
+
+DEDUP_MODES = ("copy", "group")
+
+
+def _label(product: typing.Dict) -> str:
+    """Return what identifies a product to a reader of the output."""
+    return product.get("URL") or product.get("Name", "")
+
+
+class DedupFilterPipeline(FilterPipeline):
+    """Pipeline that scores one representative per group of near-duplicates.
+
+    Products are grouped with a ``MinHashIndex`` over their name and text;
+    the first product of a group is its representative and the only one
+    sent through the wrapped pipeline. In ``copy`` mode every other member
+    gets a copy of the representative's scores, with its own price fields,
+    and ``Scoring.duplicate_of``. In ``group`` mode members are left out of
+    the results and listed in the representative's ``Scoring.duplicates``,
+    as long as they come in the same chunk as it. A representative from an
+    earlier chunk may already be written, so such late members are kept
+    with copied scores like in ``copy`` mode.
+
+    Groups span one run (one ``process``, ``process_top`` or
+    ``process_stream`` call) and are formed in input order.
+    """
+
+    def __init__(
+        self, pipeline: FilterPipeline, mode: str = "copy", threshold: float = 0.8
+    ):
+        if mode not in DEDUP_MODES:
+            raise ValueError(f"Unknown dedup mode: {mode}")
+
+        self.pipeline = pipeline
+        self.mode = mode
+        self.threshold = threshold
+        self.filters = pipeline.filters
+        self.score_calculator = pipeline.score_calculator
+        self.drop_rejected = pipeline.drop_rejected
+        self.price_extractor = PriceExtractor()
+        self.logger = logging.getLogger(__name__)
+
+    def _score(self, products: typing.List[typing.Dict]) -> typing.List[typing.Dict]:
+        """Score one representative per group of near-duplicates."""
+        return [
+            product for scored in self._score_chunks([products]) for product in scored
+        ]
+
+    def _score_chunks(
+        self, chunks: typing.Iterable[typing.List[typing.Dict]]
+    ) -> typing.Iterator[typing.List[typing.Dict]]:
+        """Score the representatives of chunks, yielding chunks in input order."""
+        index = MinHashIndex(self.threshold)
+        # Scores and label of every representative so far, by group number
+        representatives: typing.List[typing.Tuple[typing.Dict, str]] = []
+        pending: typing.Deque = collections.deque()
+        duplicates = 0
+
+        def unique() -> typing.Iterator[typing.List[typing.Dict]]:
+            nonlocal duplicates
+            for chunk in chunks:
+                with instrumentation.stage("dedup.group", len(chunk)):
+                    texts = [
+                        f"{p.get('Name', '')} {p.get('CleanedText', '')}" for p in chunk
+                    ]
+                    groups = index.group(texts)
+                new = [i for i, (_, is_new) in enumerate(groups) if is_new]
+                duplicates += len(chunk) - len(new)
+                pending.append((chunk, [group for group, _ in groups], new))
+                yield [chunk[i] for i in new]
+
+        for scored in self.pipeline._score_chunks(unique()):
+            chunk, groups, new = pending.popleft()
+            # Parallel pipelines return copies rather than scoring in place
+            for i, product in zip(new, scored):
+                chunk[i] = product
+                representatives.append((product["Scoring"], _label(product)))
+            with instrumentation.stage("dedup.resolve", len(chunk) - len(new)):
+                resolved = self._resolve(chunk, groups, set(new), representatives)
+            yield resolved
+
+        self.logger.info(
+            f"Scored {len(representatives)} representatives for {duplicates} duplicates"
+        )
+
+    def _resolve(
+        self,
+        chunk: typing.List[typing.Dict],
+        groups: typing.List[int],
+        new: typing.Set[int],
+        representatives: typing.List[typing.Tuple[typing.Dict, str]],
+    ) -> typing.List[typing.Dict]:
+        """Give the duplicates of a chunk the scores of their representative."""
+        # Groups whose representative is in this chunk, so not yet yielded
+        chunk_groups = {groups[i] for i in new}
+        result = []
+        for i, (product, group) in enumerate(zip(chunk, groups)):
+            if i in new:
+                result.append(product)
+                continue
+            scoring, label = representatives[group]
+            if self.mode == "group" and group in chunk_groups:
+                scoring.setdefault("duplicates", []).append(_label(product))
+            else:
+                self._copy_scores(product, scoring, label)
+                result.append(product)
+        return result
+
+    def _copy_scores(
+        self, product: typing.Dict, scoring: typing.Dict, label: str
+    ) -> None:
+        """Copy the scores of a representative, keeping the product's prices."""
+        # Nested breakdowns are never changed after scoring, so they are shared
+        scoring = scoring.copy()
+        scoring.pop("duplicates", None)
+        price_details = self.price_extractor.extract(product)
+        scoring["extracted_price"] = price_details.price
+        scoring["price_per_oz"] = price_details.price_per_oz
+        scoring["duplicate_of"] = label
+
+        if "Scoring" in product:
+            product["Scoring"].update(scoring)
+        else:
+            product["Scoring"] = scoring
+        product["PricePerOZ"] = price_details.price_per_oz
+
+    @classmethod
+    def from_config(
+        cls, config: "omegaconf.DictConfig", pipeline: FilterPipeline
+    ) -> "DedupFilterPipeline":
+        """Wrap a pipeline with the dedup mode and threshold of ``config``."""
+        return cls(pipeline, config.get("dedup"), config.get("dedup_threshold", 0.8))
+
+    def close(self) -> None:
+        """Close the wrapped pipeline."""
+        self.pipeline.close()
@@ -0,0 +1,227 @@
+import contextlib
+import hashlib
+import itertools
+import json
+import logging
+import os
+import time
+import typing
+import unicodedata
+
+import numpy as np
+
+from stellarspider.core.embeddings import EmbeddingBackend
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+KEY_SIZE = 16
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text so trivially different copies share one cache entry."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class EmbeddingCache:
+    """Content-addressed on-disk store of embeddings for one model.
+
+    Entries live in fixed-size memory-mapped arrays under a directory named
+    after the model: ``keys.npy`` (digest of the normalized text per slot),
+    ``stamps.npy`` (last use, 0 for free slots) and ``vectors.npy``. When
+    every slot is taken, the least recently used entries are overwritten.
+    ``max_entries`` sets the number of slots of a new cache; an existing
+    one keeps the number it was created with.
+
+    Writers serialize on a lock file. Readers take no lock: a slot's key is
+    cleared before its vector is replaced and set again afterwards, so a
+    reader that still sees the expected key after copying the vector has a
+    consistent copy.
+    """
+
+    def __init__(self, cache_dir: str, model_id: str, max_entries: int = 200_000):
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be positive, got {max_entries}")
+
+        model_digest = hashlib.sha256(model_id.encode("utf-8")).hexdigest()[:16]
+        self.path = os.path.join(cache_dir, model_digest)
+        self.model_id = model_id
+        self.max_entries = max_entries
+        self.logger = logging.getLogger(__name__)
+
+        self._keys: typing.Optional[np.ndarray] = None
+        self._stamps: typing.Optional[np.ndarray] = None
+        self._vectors: typing.Optional[np.ndarray] = None
+        self._slots: typing.Dict[bytes, int] = {}
+        self._last_stamp = 0
+
+        os.makedirs(self.path, exist_ok=True)
+        if os.path.exists(self._file("meta.json")):
+            self._open()
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def key(self, text: str) -> bytes:
+        """Return the cache key of already normalized text."""
+        digest = hashlib.sha256(f"{self.model_id}\0{text}".encode("utf-8"))
+        return digest.digest()[:KEY_SIZE]
+
+    def _stamp(self) -> int:
+        """Return a last-use stamp that increases even on coarse clocks."""
+        self._last_stamp = max(time.time_ns(), self._last_stamp + 1)
+        return self._last_stamp
+
+    @contextlib.contextmanager
+    def _write_lock(self) -> typing.Iterator[None]:
+        with open(self._file("lock"), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _open(self) -> None:
+        """Map the arrays of an existing cache and index its keys."""
+        with open(self._file("meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta["model_id"] != self.model_id:
+            raise ValueError(
+                f"Embedding cache at {self.path} belongs to {meta['model_id']}"
+            )
+
+        self._keys = np.load(self._file("keys.npy"), mmap_mode="r+")
+        self._stamps = np.load(self._file("stamps.npy"), mmap_mode="r+")
+        self._vectors = np.load(self._file("vectors.npy"), mmap_mode="r+")
+
+        used = np.flatnonzero(self._stamps)
+        self._slots = {self._keys[slot].tobytes(): int(slot) for slot in used}
+        self.logger.debug(f"Opened embedding cache {self.path}: {len(used)} entries")
+
+    def _create(self, dim: int) -> None:
+        """Allocate the arrays of a new cache once the vector size is known."""
+        capacity = self.max_entries
+        np.lib.format.open_memmap(
+            self._file("keys.npy"), "w+", np.uint8, (capacity, KEY_SIZE)
+        ).flush()
+        np.lib.format.open_memmap(
+            self._file("stamps.npy"), "w+", np.int64, (capacity,)
+        ).flush()
+        np.lib.format.open_memmap(
+            self._file("vectors.npy"), "w+", np.float32, (capacity, dim)
+        ).flush()
+
+        # meta.json is written last: its presence marks a complete cache
+        meta = {"model_id": self.model_id, "dim": dim, "capacity": capacity}
+        tmp_path = self._file("meta.json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self._file("meta.json"))
+
+    def get_many(self, keys: typing.Iterable[bytes]) -> typing.Dict[bytes, np.ndarray]:
+        """Return the cached vectors of the keys that are present."""
+        if self._vectors is None:
+            return {}
+
+        found = {}
+        now = self._stamp()
+        for key in keys:
+            slot = self._slots.get(key)
+            if slot is None:
+                continue
+            vector = np.array(self._vectors[slot])
+            # Another process may have evicted the slot meanwhile
+            if self._keys[slot].tobytes() != key:
+                del self._slots[key]
+                continue
+            self._stamps[slot] = now
+            found[key] = vector
+        return found
+
+    def put_many(self, entries: typing.Dict[bytes, np.ndarray]) -> None:
+        """Store vectors, evicting the least recently used entries if full."""
+        if not entries:
+            return
+
+        with self._write_lock():
+            if self._vectors is None:
+                if not os.path.exists(self._file("meta.json")):
+                    dim = len(next(iter(entries.values())))
+                    self._create(dim)
+                self._open()
+
+            # The capacity on disk is the one the cache was created with
+            capacity = len(self._stamps)
+            new_entries = ((k, v) for k, v in entries.items() if k not in self._slots)
+            entries = dict(itertools.islice(new_entries, capacity))
+            if not entries:
+                return
+
+            # Free slots have stamp 0 and therefore go first
+            victims = np.argpartition(self._stamps, len(entries) - 1)[: len(entries)]
+            now = self._stamp()
+            for slot, (key, vector) in zip(victims, entries.items()):
+                old_key = self._keys[slot].tobytes()
+                if self._slots.get(old_key) == slot:
+                    del self._slots[old_key]
+
+                self._keys[slot] = 0
+                self._vectors[slot] = vector
+                self._keys[slot] = np.frombuffer(key, dtype=np.uint8)
+                self._stamps[slot] = now
+                self._slots[key] = int(slot)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def close(self) -> None:
+        """Flush pending writes to disk."""
+        for array in (self._keys, self._stamps, self._vectors):
+            if array is not None:
+                array.flush()
+
+
+class CachedEmbeddingBackend(EmbeddingBackend):
+    """Embedding backend that only sends cache misses to the wrapped model."""
+
+    def __init__(self, backend: EmbeddingBackend, cache: EmbeddingCache):
+        self.backend = backend
+        self.cache = cache
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def model_id(self) -> str:
+        return self.backend.model_id
+
+    def encode(self, texts: typing.List[str], batch_size: int = 32) -> np.ndarray:
+        """Encode texts, reusing cached embeddings of identical texts.
+
+        Normalized texts only key the cache: misses send the original text
+        to the model, so scores match a run without the cache.
+        """
+        keys = [self.cache.key(normalize_text(text)) for text in texts]
+        vectors = self.cache.get_many(keys)
+
+        # Each distinct missing text is encoded once
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors and key not in missing:
+                missing[key] = text
+
+        self.logger.debug(
+            f"Embedding cache: {len(texts) - len(missing)} hits, {len(missing)} misses"
+        )
+
+        if missing:
+            encoded = self.backend.encode(list(missing.values()), batch_size)
+            new_vectors = dict(zip(missing, encoded))
+            self.cache.put_many(new_vectors)
+            vectors.update(new_vectors)
+
+        if not keys:
+            return self.backend.encode([], batch_size)
+        return np.stack([vectors[key] for key in keys]).astype(np.float32, copy=False)
@@ -0,0 +1,68 @@
+import abc
+import logging
+import os
+import typing
+
+import numpy as np
+
+
+class EmbeddingBackend(abc.ABC):
+    """Abstract text encoder producing L2-normalized embedding rows."""
+
+    @property
+    @abc.abstractmethod
+    def model_id(self) -> str:
+        """Identifier of the model that produced the embeddings."""
+        pass
+
+    @abc.abstractmethod
+    def encode(self, texts: typing.List[str], batch_size: int = 32) -> np.ndarray:
+        """Encode texts into a (len(texts), dim) float32 array of unit rows."""
+        pass
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    """Embedding backend backed by a local sentence-transformers model."""
+
+    def __init__(
+        self,
+        model_path: str,
+        device: str = "cpu",
+        num_threads: typing.Optional[int] = None,
+    ):
+        # Imported here so rule-only runs never pay for torch
+        import sentence_transformers
+        import torch
+
+        self.logger = logging.getLogger(__name__)
+        self._torch = torch
+        self._model_path = os.path.abspath(model_path)
+
+        if num_threads:
+            torch.set_num_threads(num_threads)
+
+        self.logger.debug(f"Loading embedding model from {model_path} on {device}")
+        self.model = sentence_transformers.SentenceTransformer(
+            model_path, device=device
+        )
+        self.model.eval()
+
+    @property
+    def model_id(self) -> str:
+        return self._model_path
+
+    def encode(self, texts: typing.List[str], batch_size: int = 32) -> np.ndarray:
+        """Encode texts in batches without tracking gradients."""
+        if not texts:
+            dim = self.model.get_sentence_embedding_dimension()
+            return np.zeros((0, dim), dtype=np.float32)
+
+        with self._torch.inference_mode():
+            embeddings = self.model.encode(
+                texts,
+                batch_size=batch_size,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False,
+            )
+        return embeddings.astype(np.float32, copy=False)
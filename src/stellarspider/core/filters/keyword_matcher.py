@@ -0,0 +1,109 @@
+import re
+import typing
+
+
+def _trie_pattern(keywords: typing.Iterable[str]) -> str:
+    """Build a regex that matches the longest keyword starting at a position.
+
+    Keywords are merged into a trie so the regex engine follows one branch
+    per character, however many keywords there are. At every node the
+    longer continuations are tried before stopping at a shorter keyword.
+    """
+    trie: typing.Dict[str, typing.Any] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: typing.Dict[str, typing.Any]) -> str:
+        branches = [
+            re.escape(char) + build(child) for char, child in node.items() if char
+        ]
+        is_keyword = "" in node
+        if not branches:
+            return ""
+        if len(branches) == 1 and not is_keyword:
+            return branches[0]
+        return "(?:" + "|".join(branches) + ("|" if is_keyword else "") + ")"
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """Compiled matcher that finds every configured keyword in one scan.
+
+    Keywords are registered in named groups (for example the ``positive``
+    keyword category or an ocean origin) and compiled once into a single
+    trie-shaped regular expression, so scanning cost stays flat as keyword
+    lists grow. Matching reports the hits of each group as indices into that
+    group's keyword list, in list order. Semantics are identical to
+    ``keyword in text`` for every keyword.
+    """
+
+    def __init__(self, groups: typing.Mapping[typing.Hashable, typing.List[str]]):
+        self.groups = {key: list(keywords) for key, keywords in groups.items()}
+
+        # Every (group, index) pair is a slot, numbered in group and list
+        # order; distinct keywords map to every slot that uses them
+        self.slots: typing.List[typing.Tuple[typing.Hashable, int]] = []
+        self._keyword_slots: typing.Dict[str, typing.List[int]] = {}
+        for key, keywords in self.groups.items():
+            for index, keyword in enumerate(keywords):
+                self._keyword_slots.setdefault(keyword, []).append(len(self.slots))
+                self.slots.append((key, index))
+
+        # Any two keywords found at the same position are both prefixes of the
+        # text there, so the shorter one is a prefix of the longer one. The
+        # regex reports the longest, and this table adds the others.
+        keywords = [keyword for keyword in self._keyword_slots if keyword]
+        self._found_with = {
+            longest: [kw for kw in keywords if longest.startswith(kw)]
+            for longest in keywords
+        }
+        self._always = [""] if "" in self._keyword_slots else []
+        self._regex = re.compile(_trie_pattern(keywords)) if keywords else None
+
+    def _find_keywords(self, text: str) -> typing.Set[str]:
+        """Return every distinct keyword that occurs in text."""
+        found = set(self._always)
+        if self._regex is None:
+            return found
+
+        search = self._regex.search
+        match = search(text)
+        while match is not None:
+            found.update(self._found_with[match.group()])
+            match = search(text, match.start() + 1)
+        return found
+
+    def match_slots(self, text: str) -> typing.List[int]:
+        """Return the sorted slot numbers of every matched keyword."""
+        keyword_slots = self._keyword_slots
+        return sorted(
+            slot
+            for keyword in self._find_keywords(text)
+            for slot in keyword_slots[keyword]
+        )
+
+    def match(self, text: str) -> typing.Dict[typing.Hashable, typing.List[int]]:
+        """Return the matched keyword indices of each group that had hits."""
+        matches: typing.Dict[typing.Hashable, typing.List[int]] = {}
+        for slot in self.match_slots(text):
+            key, index = self.slots[slot]
+            matches.setdefault(key, []).append(index)
+        return matches
+
+    def found(
+        self, slots: typing.Iterable[int]
+    ) -> typing.Dict[typing.Hashable, typing.List[str]]:
+        """Return the keywords of sorted slot numbers, by group like ``find``."""
+        found: typing.Dict[typing.Hashable, typing.List[str]] = {}
+        for slot in slots:
+            key, index = self.slots[slot]
+            found.setdefault(key, []).append(self.groups[key][index])
+        return found
+
+    def find(self, text: str) -> typing.Dict[typing.Hashable, typing.List[str]]:
+        """Return the matched keywords of each group that had hits."""
+        return self.found(self.match_slots(text))
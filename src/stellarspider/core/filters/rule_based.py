@@ -1,10 +1,14 @@
+import array
 import logging
 import typing
 
-import omegaconf
-
+from stellarspider.core import instrumentation, records
 from stellarspider.core.filters.base import FilterBuilder, ProductFilter
-from stellarspider.core.scoring.price_extractor import PriceExtractor
+from stellarspider.core.filters.keyword_matcher import KeywordMatcher
+from stellarspider.core.scoring.price_extractor import PriceDetails, PriceExtractor
+
+if typing.TYPE_CHECKING:
+    import omegaconf
 
 
 class RuleBasedFilter(ProductFilter):
@@ -16,51 +20,172 @@ class RuleBasedFilter(ProductFilter):
         scoring_config: typing.Dict[str, typing.Any],
         consumption_config: typing.Optional[typing.Dict] = None,
         ocean_origins: typing.Optional[typing.Dict] = None,
+        engine: str = "default",
+        reject_keywords: typing.Optional[typing.List[str]] = None,
+        min_rule_score: typing.Optional[float] = None,
     ):
         self.keywords = keywords
         self.scoring_config = scoring_config
         self.consumption_config = consumption_config or {}
         self.ocean_origins = ocean_origins or {}
+        self.reject_keywords = reject_keywords or []
+        self.min_rule_score = min_rule_score
         self.price_extractor = PriceExtractor()
         self.logger = logging.getLogger(__name__)
 
+        # Compiled once so each product's text is scanned a single time
+        self.matcher = KeywordMatcher(
+            {
+                **{("keywords", c): kws for c, kws in self.keywords.items()},
+                **{("ocean_origins", o): kws for o, kws in self.ocean_origins.items()},
+                **({("reject",): self.reject_keywords} if self.reject_keywords else {}),
+            }
+        )
+
+        # The sparse engine scores whole batches with one keyword matrix
+        if engine == "sparse":
+            # Imported here so the default engine never pays for scikit-learn
+            from stellarspider.core.filters.sparse_scorer import SparseKeywordScorer
+
+            self.sparse_scorer = SparseKeywordScorer(
+                self.matcher,
+                {
+                    ("keywords", c): self.scoring_config.get(f"{c}_multiplier", 1)
+                    for c in self.keywords
+                },
+            )
+        elif engine == "default":
+            self.sparse_scorer = None
+        else:
+            raise ValueError(f"Unknown rule engine: {engine}")
+
+        # Keyword category of each matcher slot (None for ocean origins) and
+        # multiplier of each category, so scores are summed from slots alone
+        category_index = {("keywords", c): i for i, c in enumerate(self.keywords)}
+        self._slot_categories = [
+            category_index.get(key) for key, _ in self.matcher.slots
+        ]
+        self._multipliers = [
+            self.scoring_config.get(f"{c}_multiplier", 1) for c in self.keywords
+        ]
+        self._slot_typecode = "H" if len(self.matcher.slots) <= 0xFFFF else "I"
+
+        # Slots of the hard-reject keywords, found in the same scan
+        self._reject_slots = frozenset(
+            slot
+            for slot, (key, _) in enumerate(self.matcher.slots)
+            if key == ("reject",)
+        )
+
     def _extract_ocean_origin(
-        self, product: typing.Dict
+        self,
+        product: typing.Dict,
+        matches: typing.Optional[typing.Dict[typing.Hashable, typing.List[str]]] = None,
     ) -> typing.Tuple[typing.Optional[str], typing.List[str]]:
         """Extract ocean/region origin information."""
-        name = product.get("Name", "").lower()
-        text = product.get("CleanedText", "").lower()
-        combined_text = f"{name} {text}"
+        if matches is None:
+            matches = self.matcher.find(self._normalize_text(product)[1])
 
         found_origins = []
         primary_origin = None
 
-        for ocean_type, keywords in self.ocean_origins.items():
-            for keyword in keywords:
-                if keyword in combined_text:
-                    found_origins.append(keyword)
-                    if primary_origin is None:
-                        primary_origin = ocean_type
+        for ocean_type in self.ocean_origins:
+            found = matches.get(("ocean_origins", ocean_type))
+            if found:
+                found_origins.extend(found)
+                if primary_origin is None:
+                    primary_origin = ocean_type
 
         return primary_origin, found_origins
 
-    def _calculate_relevance_score(
-        self, product: typing.Dict
-    ) -> typing.Tuple[float, str, typing.Dict]:
-        """Calculate relevance score for a product."""
+    def _normalize_text(self, product: typing.Dict) -> typing.Tuple[str, str]:
+        """Return the lowercased name and combined ``"{name} {text}"``."""
         name = product.get("Name", "").lower()
         text = product.get("CleanedText", "").lower()
-        combined_text = f"{name} {text}"
+        return name, f"{name} {text}"
+
+    def _consumption_adjustments(
+        self, combined_text: str
+    ) -> typing.List[typing.Tuple[float, str]]:
+        """Return the frozen bonuses and fresh penalties met, with their reasons."""
+        frozen_req = self.consumption_config.get("frozen_requirements", {})
+        scoring_adj = self.consumption_config.get("scoring_adjustments", {})
+
+        adjustments = []
+        for req_kw in frozen_req.get("required_keywords", []):
+            if req_kw in combined_text:
+                bonus = scoring_adj.get("frozen_bonus", 0)
+                adjustments.append((bonus, f"Frozen requirement met: +{bonus}"))
+
+        for neg_kw in frozen_req.get("negative_keywords", []):
+            if neg_kw in combined_text:
+                penalty = scoring_adj.get("fresh_penalty", 0)
+                adjustments.append((penalty, f"Fresh penalty: {penalty}"))
+
+        return adjustments
+
+    def _keyword_score(
+        self,
+        combined_text: str,
+        slots: typing.Sequence[int],
+        category_scores: typing.Optional[typing.Sequence] = None,
+    ) -> float:
+        """Return the score ``_calculate_relevance_score`` gives, without reasons.
+
+        Keyword hits are only counted per category from their slot numbers;
+        reasons and breakdown are built from the same slots when read.
+        """
+        if category_scores is None:
+            counts = [0] * len(self._multipliers)
+            slot_categories = self._slot_categories
+            for slot in slots:
+                category = slot_categories[slot]
+                if category is not None:
+                    counts[category] += 1
+            category_scores = [
+                count * multiplier
+                for count, multiplier in zip(counts, self._multipliers)
+            ]
+
+        score = 0
+        for category_score in category_scores:
+            score += category_score
+        for amount, _ in self._consumption_adjustments(combined_text):
+            score += amount
+        return score
+
+    def _calculate_relevance_score(
+        self,
+        product: typing.Dict,
+        normalized: typing.Optional[typing.Tuple[str, str]] = None,
+        keyword_scores: typing.Optional[
+            typing.Tuple[typing.Sequence[int], typing.Optional[typing.Sequence]]
+        ] = None,
+    ) -> typing.Tuple[float, str, typing.Dict]:
+        """Calculate relevance score for a product.
+
+        ``keyword_scores`` holds the matcher slots already found for this
+        product and, from the sparse engine, its per-category scores (None
+        to compute them from the multipliers).
+        """
+        name, combined_text = normalized or self._normalize_text(product)
 
         score = 0
         reasons = []
         score_breakdown = {}
+        if keyword_scores is None:
+            slots, category_scores = self.matcher.match_slots(combined_text), None
+        else:
+            slots, category_scores = keyword_scores
+        matches = self.matcher.found(slots)
 
         # Process keyword categories
-        for category, keywords in self.keywords.items():
-            found = [kw for kw in keywords if kw in combined_text]
-            multiplier = self.scoring_config.get(f"{category}_multiplier", 1)
-            category_score = len(found) * multiplier
+        for i, category in enumerate(self.keywords):
+            found = matches.get(("keywords", category), [])
+            if category_scores is None:
+                category_score = len(found) * self._multipliers[i]
+            else:
+                category_score = category_scores[i]
             score += category_score
 
             score_breakdown[f"{category}_keywords"] = {
@@ -72,27 +197,16 @@ class RuleBasedFilter(ProductFilter):
                 reasons.append(f"{category} ({len(found)}): {found}")
 
         # Apply consumption-specific adjustments
-        frozen_req = self.consumption_config.get("frozen_requirements", {})
-        scoring_adj = self.consumption_config.get("scoring_adjustments", {})
-
-        for req_kw in frozen_req.get("required_keywords", []):
-            if req_kw in combined_text:
-                bonus = scoring_adj.get("frozen_bonus", 0)
-                score += bonus
-                reasons.append(f"Frozen requirement met: +{bonus}")
-
-        for neg_kw in frozen_req.get("negative_keywords", []):
-            if neg_kw in combined_text:
-                penalty = scoring_adj.get("fresh_penalty", 0)
-                score += penalty
-                reasons.append(f"Fresh penalty: {penalty}")
+        for amount, reason in self._consumption_adjustments(combined_text):
+            score += amount
+            reasons.append(reason)
 
         # Category-specific bonuses
         self._apply_category_bonuses(product, name, score, reasons, score_breakdown)
 
         # Extract ocean origin if applicable
         if self.ocean_origins:
-            ocean_origin, origin_keywords = self._extract_ocean_origin(product)
+            ocean_origin, origin_keywords = self._extract_ocean_origin(product, matches)
             score_breakdown["ocean_origin"] = {
                 "primary_origin": ocean_origin,
                 "found_keywords": origin_keywords,
@@ -114,31 +228,155 @@ class RuleBasedFilter(ProductFilter):
         # This can be overridden by subclasses for category-specific logic
         pass
 
+    def _rejection(
+        self, slots: typing.Sequence[int], rule_score: float
+    ) -> typing.Optional[str]:
+        """Return why a product is rejected by its keywords alone, if it is."""
+        for slot in slots:
+            if slot in self._reject_slots:
+                key, index = self.matcher.slots[slot]
+                return f"Reject keyword: {self.matcher.groups[key][index]}"
+        if self.min_rule_score is not None and rule_score < self.min_rule_score:
+            return f"Rule score {rule_score} below {self.min_rule_score}"
+        return None
+
+    def _score_keywords_sparse(
+        self, normalized: typing.List[typing.Tuple[str, str]]
+    ) -> typing.Optional[typing.List[typing.Tuple[typing.List[int], typing.List]]]:
+        """Score keyword categories for a whole batch with the sparse engine."""
+        if self.sparse_scorer is None:
+            return None
+
+        return self.sparse_scorer.score_batch(
+            [combined_text for _, combined_text in normalized]
+        )
+
+    def _score_product(
+        self,
+        product: typing.Dict,
+        normalized: typing.Tuple[str, str],
+        keyword_scores: typing.Optional[
+            typing.Tuple[typing.Sequence[int], typing.Optional[typing.Sequence]]
+        ],
+        price_details: PriceDetails,
+        rule_score: typing.Optional[float] = None,
+    ) -> None:
+        """Store the rule-based score and price details of one product."""
+        combined_text = normalized[1]
+        if keyword_scores is None:
+            slots, category_scores = self.matcher.match_slots(combined_text), None
+        else:
+            slots, category_scores = keyword_scores
+        price = price_details.price
+        price_per_oz = price_details.price_per_oz
+
+        scoring = records.scoring_of(product)
+        if rule_score is None:
+            rule_score = self._keyword_score(combined_text, slots, category_scores)
+        scoring["rule_score"] = rule_score
+        records.store(scoring, RuleExplanation(self, product, slots, category_scores))
+        scoring["extracted_price"] = price
+        scoring["price_per_oz"] = price_per_oz
+
+        # Update top-level fields
+        product["PricePerOZ"] = price_per_oz
+
     def filter_products(
         self, products: typing.List[typing.Dict]
     ) -> typing.List[typing.Dict]:
-        """Filter and rank products by relevance."""
+        """Filter and rank products by relevance.
+
+        With reject keywords or a minimum rule score, products rejected by
+        their keywords get only their ``rule_score`` and the reason in
+        ``Scoring.rejected``; their prices are never extracted.
+        """
         self.logger.debug(f"Processing {len(products)} products with rule-based filter")
 
-        for product in products:
-            score, reasoning, score_breakdown = self._calculate_relevance_score(product)
-            price = self.price_extractor.extract_price(product.get("CleanedText", ""))
-            price_per_oz = self.price_extractor.calculate_price_per_oz(product, price)
+        with instrumentation.stage("rule.normalize", len(products)):
+            normalized = [self._normalize_text(product) for product in products]
+
+        with instrumentation.stage("rule.keywords", len(products)):
+            keyword_scores = self._score_keywords_sparse(normalized) or [
+                (self.matcher.match_slots(combined_text), None)
+                for _, combined_text in normalized
+            ]
+            rule_scores = [
+                self._keyword_score(combined_text, slots, category_scores)
+                for (_, combined_text), (slots, category_scores) in zip(
+                    normalized, keyword_scores
+                )
+            ]
+
+        rejections: typing.List[typing.Optional[str]] = [None] * len(products)
+        if self._reject_slots or self.min_rule_score is not None:
+            with instrumentation.stage("rule.reject", len(products)):
+                rejections = [
+                    self._rejection(slots, rule_score)
+                    for (slots, _), rule_score in zip(keyword_scores, rule_scores)
+                ]
+
+        with instrumentation.stage("rule.price", len(products)):
+            prices = [
+                None
+                if rejection
+                else self.price_extractor.extract_from_text(
+                    combined_text, len(name) + 1
+                )
+                for (name, combined_text), rejection in zip(normalized, rejections)
+            ]
+
+        for i, product in enumerate(products):
+            if rejections[i]:
+                scoring = records.scoring_of(product)
+                scoring["rule_score"] = rule_scores[i]
+                scoring["rejected"] = rejections[i]
+            else:
+                self._score_product(
+                    product, normalized[i], keyword_scores[i], prices[i], rule_scores[i]
+                )
 
-            # Initialize scoring object
-            if "Scoring" not in product:
-                product["Scoring"] = {}
+        return products
 
-            product["Scoring"]["rule_score"] = score
-            product["Scoring"]["rule_reasoning"] = reasoning
-            product["Scoring"]["rule_breakdown"] = score_breakdown
-            product["Scoring"]["extracted_price"] = price
-            product["Scoring"]["price_per_oz"] = price_per_oz
 
-            # Update top-level fields
-            product["PricePerOZ"] = price_per_oz
+class RuleExplanation(records.Deferred):
+    """Reasoning and breakdown of a rule score, built from its keyword slots.
 
-        return products
+    Holds the matcher slots that were hit as a small integer array, plus the
+    product's name and text, and rebuilds the reasons with the filter that
+    scored it when they are read; category bonuses then see a product with
+    only its ``Name`` and ``CleanedText``.
+    """
+
+    __slots__ = ("rule_filter", "name", "text", "slots", "category_scores")
+
+    KEYS = ("rule_reasoning", "rule_breakdown")
+
+    def __init__(
+        self,
+        rule_filter: RuleBasedFilter,
+        product: typing.Dict,
+        slots: typing.Sequence[int],
+        category_scores: typing.Optional[typing.Sequence] = None,
+    ):
+        self.rule_filter = rule_filter
+        self.name = product.get("Name", "")
+        self.text = product.get("CleanedText", "")
+        self.slots = array.array(rule_filter._slot_typecode, slots)
+        self.category_scores = (
+            tuple(category_scores) if category_scores is not None else None
+        )
+
+    def fields(self) -> typing.Dict[str, typing.Any]:
+        product = {"Name": self.name, "CleanedText": self.text}
+        _, reasoning, breakdown = self.rule_filter._calculate_relevance_score(
+            product, keyword_scores=(self.slots, self.category_scores)
+        )
+        return {"rule_reasoning": reasoning, "rule_breakdown": breakdown}
+
+    def primary_origin(self) -> typing.Optional[str]:
+        """Return the primary ocean origin without building the breakdown."""
+        matches = self.rule_filter.matcher.found(self.slots)
+        return self.rule_filter._extract_ocean_origin({}, matches)[0]
 
 
 class SalmonRuleBasedFilter(RuleBasedFilter):
@@ -198,11 +436,13 @@ class PeanutsRuleBasedFilter(RuleBasedFilter):
 class RuleBasedFilterBuilder(FilterBuilder):
     """Builder for rule-based filters following Builder pattern."""
 
-    def __init__(self, config: omegaconf.DictConfig):
+    def __init__(self, config: "omegaconf.DictConfig"):
         self.config = config
 
     def build(self) -> ProductFilter:
         """Build the appropriate rule-based filter."""
+        import omegaconf
+
         filter_type = self.config.get("filter_type", "generic")
 
         # Convert to regular Python objects
@@ -240,15 +480,40 @@ class RuleBasedFilterBuilder(FilterBuilder):
         if hasattr(self.config, "ocean_origins"):
             ocean_origins = omegaconf.OmegaConf.to_object(self.config.ocean_origins)
 
+        engine = self.config.get("rule_engine", "default")
+
+        # Cheap-reject cascade, only applied when enabled
+        cascade = self.config.get("cascade") or {}
+        reject_options = {}
+        if cascade.get("enabled", False):
+            reject_options = {
+                "reject_keywords": list(cascade.get("reject_keywords") or []),
+                "min_rule_score": cascade.get("min_rule_score"),
+            }
+
         if filter_type == "salmon":
             return SalmonRuleBasedFilter(
-                keywords, scoring_config, full_consumption_config, ocean_origins
+                keywords,
+                scoring_config,
+                full_consumption_config,
+                ocean_origins,
+                engine=engine,
+                **reject_options,
             )
         elif filter_type == "peanuts":
             return PeanutsRuleBasedFilter(
-                keywords, scoring_config, full_consumption_config
+                keywords,
+                scoring_config,
+                full_consumption_config,
+                engine=engine,
+                **reject_options,
             )
         else:
             return RuleBasedFilter(
-                keywords, scoring_config, full_consumption_config, ocean_origins
+                keywords,
+                scoring_config,
+                full_consumption_config,
+                ocean_origins,
+                engine=engine,
+                **reject_options,
             )
@@ -1,73 +1,210 @@
+import array
 import logging
+import os
 import typing
 
-import omegaconf
-
+from stellarspider.core import instrumentation, records
 from stellarspider.core.filters.base import FilterBuilder, ProductFilter
 
+if typing.TYPE_CHECKING:
+    import numpy as np
+    import omegaconf
+
+    from stellarspider.core.embeddings import EmbeddingBackend
+
 
 class SemanticFilter(ProductFilter):
     """Semantic filtering using embeddings/similarity."""
 
-    def __init__(self, target_concepts: typing.List[str]):
+    def __init__(
+        self,
+        target_concepts: typing.List[str],
+        backend: typing.Optional["EmbeddingBackend"] = None,
+        batch_size: int = 32,
+        similarity_threshold: float = 0.5,
+    ):
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be positive, got {batch_size}")
+
         self.target_concepts = target_concepts
+        self.backend = backend
+        self.batch_size = batch_size
+        self.similarity_threshold = similarity_threshold
         self.logger = logging.getLogger(__name__)
-        # In real implementation, you'd load a model like sentence-transformers
-        # self.model = SentenceTransformer('all-MiniLM-L6-v2')
+
+        # Target concepts are encoded once and reused for every batch
+        self.concept_embeddings = None
+        if self.backend is not None and self.target_concepts:
+            self.concept_embeddings = self.backend.encode(
+                self.target_concepts, self.batch_size
+            )
+
+    def _matched_concepts(self, product_text: str) -> typing.List[str]:
+        """Return the target concepts that occur in a product's text."""
+        product_lower = product_text.lower()
+        return [concept for concept in self.target_concepts if concept in product_lower]
+
+    def _overlap_score(self, matches: typing.List[str]) -> float:
+        return len(matches) / len(self.target_concepts) if self.target_concepts else 0
 
     def _calculate_semantic_similarity(
         self, product_text: str
     ) -> typing.Tuple[float, typing.Dict]:
-        """Calculate semantic similarity score (placeholder implementation)."""
-        # Placeholder: In real implementation, you'd:
-        # 1. Generate embedding for product text
-        # 2. Calculate cosine similarity with target embedding
-        # 3. Return similarity score
+        """Calculate keyword-overlap similarity, used when no model is configured."""
+        matches = self._matched_concepts(product_text)
+        score = self._overlap_score(matches)
 
-        product_lower = product_text.lower()
+        semantic_breakdown = {
+            "target_concepts": self.target_concepts,
+            "matched_concepts": matches,
+            "similarity_score": score,
+        }
+
+        return score, semantic_breakdown
+
+    def _embedding_breakdown(
+        self, similarities: typing.Sequence[float]
+    ) -> typing.Tuple[float, typing.Dict]:
+        """Score one product from its cosine similarity to each target concept."""
+        concept_similarities = {
+            concept: round(float(similarity), 4)
+            for concept, similarity in zip(self.target_concepts, similarities)
+        }
         matches = [
-            concept for concept in self.target_concepts if concept in product_lower
+            concept
+            for concept, similarity in concept_similarities.items()
+            if similarity >= self.similarity_threshold
         ]
-        score = len(matches) / len(self.target_concepts) if self.target_concepts else 0
+        score = self._embedding_score(similarities)
 
         semantic_breakdown = {
             "target_concepts": self.target_concepts,
             "matched_concepts": matches,
+            "concept_similarities": concept_similarities,
             "similarity_score": score,
         }
 
         return score, semantic_breakdown
 
+    @staticmethod
+    def _embedding_score(similarities: typing.Sequence[float]) -> float:
+        # Cosine similarity lies in [-1, 1]; the combined score expects [0, 1]
+        best = float(max(similarities)) if len(similarities) else 0.0
+        return min(max(best, 0.0), 1.0)
+
+    @staticmethod
+    def product_text(product: typing.Dict) -> str:
+        """Return the text of a product that is compared to the concepts."""
+        return f"{product.get('Name', '')} {product.get('CleanedText', '')}"
+
+    def _score_batch(
+        self,
+        products: typing.List[typing.Dict],
+        embeddings: typing.Optional["np.ndarray"] = None,
+    ) -> typing.List[typing.Tuple[float, "SemanticExplanation"]]:
+        """Score a batch of products with one encode call and one matrix product."""
+        if self.concept_embeddings is None:
+            return [
+                (
+                    self._overlap_score(
+                        self._matched_concepts(self.product_text(product))
+                    ),
+                    SemanticExplanation(self, product),
+                )
+                for product in products
+            ]
+
+        if embeddings is None:
+            texts = [self.product_text(product) for product in products]
+            with instrumentation.stage("semantic.encode", len(texts)):
+                embeddings = self.backend.encode(texts, self.batch_size)
+
+        # Rows are unit vectors, so the dot product is the cosine similarity
+        similarities = embeddings @ self.concept_embeddings.T
+        return [
+            (
+                self._embedding_score(row),
+                SemanticExplanation(
+                    self, similarities=array.array(row.dtype.char, row.tobytes())
+                ),
+            )
+            for row in similarities
+        ]
+
     def filter_products(
-        self, products: typing.List[typing.Dict]
+        self,
+        products: typing.List[typing.Dict],
+        embeddings: typing.Optional["np.ndarray"] = None,
     ) -> typing.List[typing.Dict]:
-        """Add semantic scores to products."""
+        """Add semantic scores to products.
+
+        ``embeddings`` may hold the products' texts already encoded with this
+        filter's backend, e.g. when several categories score the same batch.
+        """
         self.logger.debug(f"Processing {len(products)} products with semantic filter")
 
-        for product in products:
-            name = product.get("Name", "")
-            text = product.get("CleanedText", "")
-            combined_text = f"{name} {text}"
+        for start in range(0, len(products), self.batch_size):
+            batch = products[start : start + self.batch_size]
+            batch_embeddings = None
+            if embeddings is not None:
+                batch_embeddings = embeddings[start : start + self.batch_size]
 
-            semantic_score, semantic_breakdown = self._calculate_semantic_similarity(
-                combined_text
-            )
+            for product, (semantic_score, explanation) in zip(
+                batch, self._score_batch(batch, batch_embeddings)
+            ):
+                scoring = records.scoring_of(product)
+                scoring["semantic_score"] = semantic_score
+                records.store(scoring, explanation)
 
-            # Initialize scoring object
-            if "Scoring" not in product:
-                product["Scoring"] = {}
+        return products
 
-            product["Scoring"]["semantic_score"] = semantic_score
-            product["Scoring"]["semantic_breakdown"] = semantic_breakdown
 
-        return products
+class SemanticExplanation(records.Deferred):
+    """Semantic breakdown of a product, built when read.
+
+    Keyword overlap is found again in the product's name and text; model
+    scores keep the similarity to each target concept in a float array.
+    The target concepts themselves are the filter's, never copied.
+    """
+
+    __slots__ = ("semantic_filter", "name", "text", "similarities")
+
+    KEYS = ("semantic_breakdown",)
+
+    def __init__(
+        self,
+        semantic_filter: SemanticFilter,
+        product: typing.Optional[typing.Dict] = None,
+        similarities: typing.Optional[typing.Sequence[float]] = None,
+    ):
+        self.semantic_filter = semantic_filter
+        self.similarities = similarities
+        self.name = self.text = None
+        if product is not None:
+            self.name = product.get("Name", "")
+            self.text = product.get("CleanedText", "")
+
+    def fields(self) -> typing.Dict[str, typing.Any]:
+        if self.similarities is None:
+            _, breakdown = self.semantic_filter._calculate_semantic_similarity(
+                f"{self.name} {self.text}"
+            )
+        else:
+            _, breakdown = self.semantic_filter._embedding_breakdown(self.similarities)
+        return {"semantic_breakdown": breakdown}
 
 
 class SemanticFilterBuilder(FilterBuilder):
     """Builder for semantic filters."""
 
-    def __init__(self, config: omegaconf.DictConfig):
+    def __init__(
+        self,
+        config: "omegaconf.DictConfig",
+        backends: typing.Optional[typing.Dict[typing.Tuple, "EmbeddingBackend"]] = None,
+    ):
         self.config = config
+        # Backends already loaded by other builders, keyed by their settings
+        self.backends = backends if backends is not None else {}
 
     def build(self) -> ProductFilter:
         """Build semantic filter with target concepts."""
@@ -81,4 +218,50 @@ class SemanticFilterBuilder(FilterBuilder):
         else:
             target_concepts = []
 
-        return SemanticFilter(target_concepts)
+        semantic_config = self.config.get("semantic") or {}
+        batch_size = semantic_config.get("batch_size", 32)
+
+        # Without a local model, fall back to keyword-overlap similarity
+        backend = None
+        if semantic_config.get("model_path"):
+            backend = self._build_backend(semantic_config)
+
+        return SemanticFilter(
+            target_concepts,
+            backend=backend,
+            batch_size=batch_size,
+            similarity_threshold=semantic_config.get("similarity_threshold", 0.5),
+        )
+
+    def _build_backend(self, semantic_config: typing.Mapping) -> "EmbeddingBackend":
+        """Load the configured model, or reuse one another builder loaded."""
+        # Imported here so runs without a model never load numpy or torch
+        from stellarspider.core.embedding_cache import (
+            CachedEmbeddingBackend,
+            EmbeddingCache,
+        )
+        from stellarspider.core.embeddings import SentenceTransformerBackend
+
+        model_path = semantic_config.get("model_path")
+        cache_dir = semantic_config.get("cache_dir")
+        key = (model_path, semantic_config.get("device", "cpu"), cache_dir)
+        if key in self.backends:
+            return self.backends[key]
+
+        backend = SentenceTransformerBackend(
+            model_path,
+            device=semantic_config.get("device", "cpu"),
+            num_threads=semantic_config.get("num_threads"),
+        )
+
+        # Reuse embeddings of texts seen in earlier runs
+        if cache_dir:
+            cache = EmbeddingCache(
+                os.path.expanduser(cache_dir),
+                backend.model_id,
+                max_entries=semantic_config.get("cache_max_entries", 200_000),
+            )
+            backend = CachedEmbeddingBackend(backend, cache)
+
+        self.backends[key] = backend
+        return backend
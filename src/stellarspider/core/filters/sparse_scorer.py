@@ -0,0 +1,70 @@
+import typing
+
+import numpy as np
+import scipy.sparse
+from sklearn.feature_extraction.text import CountVectorizer
+
+from stellarspider.core.filters.keyword_matcher import KeywordMatcher
+
+
+class SparseKeywordScorer:
+    """Batch keyword scoring with one sparse product-by-keyword matrix.
+
+    The vectorizer uses the matcher's keyword slots as a fixed vocabulary
+    and the matcher itself as the analyzer, so a keyword counts exactly when
+    ``keyword in text`` (a word tokenizer would miss "farm" in "farmed").
+    Category scores for a whole batch then come from one sparse matrix
+    product with the multipliers, and per-product keyword slots only from
+    the nonzero entries.
+    """
+
+    def __init__(
+        self,
+        matcher: KeywordMatcher,
+        multipliers: typing.Dict[typing.Hashable, typing.Union[int, float]],
+    ):
+        self.matcher = matcher
+        self.multipliers = list(multipliers.values())
+        self.vectorizer = CountVectorizer(
+            vocabulary=range(len(matcher.slots)),
+            analyzer=matcher.match_slots,
+            binary=True,
+            dtype=np.int32,
+        )
+
+        # Slot-by-category indicator: which category each keyword slot counts for
+        column = {key: i for i, key in enumerate(multipliers)}
+        rows = [slot for slot, (key, _) in enumerate(matcher.slots) if key in column]
+        cols = [column[matcher.slots[slot][0]] for slot in rows]
+        self.category_indicator = scipy.sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, cols)),
+            shape=(len(matcher.slots), len(column)),
+        )
+
+    def score_batch(
+        self, texts: typing.List[str]
+    ) -> typing.List[
+        typing.Tuple[typing.List[int], typing.List[typing.Union[int, float]]]
+    ]:
+        """Return the matched keyword slots and category scores of each text."""
+        if not texts:
+            return []
+
+        hits = self.vectorizer.transform(texts)
+        hits.sort_indices()
+        category_scores = (hits @ self.category_indicator).toarray() * np.array(
+            self.multipliers, dtype=np.float64
+        )
+
+        # Keep each multiplier's Python type so scores serialize exactly like
+        # len(found) * multiplier
+        score_types = [int if isinstance(m, int) else float for m in self.multipliers]
+
+        results = []
+        for row in range(hits.shape[0]):
+            # Column indices are sorted, i.e. in group and keyword list order
+            slots = hits.indices[hits.indptr[row] : hits.indptr[row + 1]].tolist()
+            scores = [t(v) for t, v in zip(score_types, category_scores[row])]
+            results.append((slots, scores))
+
+        return results
@@ -0,0 +1,155 @@
+import collections
+import logging
+import typing
+
+from stellarspider.core import instrumentation, records
+from stellarspider.core.pipeline import FilterPipeline
+from stellarspider.core.score_store import ScoreStore, fingerprint
+
+if typing.TYPE_CHECKING:
+    import omegaconf
+
+
+def _result(product: typing.Dict, explain: str) -> typing.Dict:
+    """Return the fields scoring added to a product, as plain dicts.
+
+    Only the explanations of detail level ``explain`` are built and kept.
+    """
+    return {
+        "Scoring": records.plain(records.explained(product, explain)["Scoring"]),
+        "PricePerOZ": product.get("PricePerOZ"),
+        "explain": explain,
+    }
+
+
+def _covers(result: typing.Dict, explain: str) -> bool:
+    """Return whether a stored result holds the explanations ``explain`` writes."""
+    stored = records.EXPLAIN_LEVELS[result.get("explain", "full")]
+    return stored >= records.EXPLAIN_LEVELS[explain]
+
+
+def _complete(product: typing.Dict) -> bool:
+    """Return whether a product got every filter's score or was rejected."""
+    scoring = product.get("Scoring", {})
+    return "semantic_score" in scoring or bool(scoring.get("rejected"))
+
+
+def _apply(product: typing.Dict, result: typing.Dict) -> None:
+    """Add stored scoring fields to a product, like scoring it would."""
+    product.setdefault("Scoring", {}).update(result["Scoring"])
+    product["PricePerOZ"] = result["PricePerOZ"]
+
+
+class IncrementalFilterPipeline(FilterPipeline):
+    """Pipeline that only scores products it has not seen before.
+
+    Every product is fingerprinted by its scored fields and looked up in a
+    ``ScoreStore``; stored results are reused and only new or changed
+    products go through the wrapped pipeline, serial or parallel. Their
+    results are stored for the next run with only the explanations of the
+    ``explain`` level; a later run that writes more of them scores the
+    product again to rebuild them. Products a rerank budget left without a
+    semantic score are not stored: whether a product is a candidate
+    depends on the rest of the run, so they are scored again next time.
+    """
+
+    def __init__(
+        self, pipeline: FilterPipeline, store: ScoreStore, explain: str = "full"
+    ):
+        if explain not in records.EXPLAIN_LEVELS:
+            raise ValueError(f"Unknown explain level: {explain}")
+
+        self.pipeline = pipeline
+        self.store = store
+        self.explain = explain
+        self.filters = pipeline.filters
+        self.score_calculator = pipeline.score_calculator
+        self.drop_rejected = pipeline.drop_rejected
+        self.logger = logging.getLogger(__name__)
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(
+        self, products: typing.List[typing.Dict]
+    ) -> typing.Tuple[typing.List[int], typing.List[int]]:
+        """Apply stored results; return all fingerprints and unseen indices."""
+        with instrumentation.stage("incremental.lookup", len(products)):
+            keys = [fingerprint(product) for product in products]
+            stored = self.store.get_many(keys)
+            missing = []
+            for i, (product, key) in enumerate(zip(products, keys)):
+                if key in stored and _covers(stored[key], self.explain):
+                    _apply(product, stored[key])
+                else:
+                    missing.append(i)
+
+        self.hits += len(products) - len(missing)
+        self.misses += len(missing)
+        return keys, missing
+
+    def _merge(
+        self,
+        products: typing.List[typing.Dict],
+        keys: typing.List[int],
+        missing: typing.List[int],
+        scored: typing.List[typing.Dict],
+    ) -> typing.List[typing.Dict]:
+        """Put newly scored products in place and store their results."""
+        # Parallel pipelines return copies rather than scoring in place
+        for i, product in zip(missing, scored):
+            products[i] = product
+        if self.pipeline.rerank is not None:
+            missing = [i for i in missing if _complete(products[i])]
+        with instrumentation.stage("incremental.store", len(missing)):
+            self.store.put_many(
+                (keys[i], _result(products[i], self.explain)) for i in missing
+            )
+        return products
+
+    def _score(self, products: typing.List[typing.Dict]) -> typing.List[typing.Dict]:
+        """Score unseen products and reuse the stored results of the others."""
+        keys, missing = self._lookup(products)
+        scored = self.pipeline._score([products[i] for i in missing])
+        self._merge(products, keys, missing, scored)
+        self.store.commit()
+        self.logger.info(f"Reused {self.hits} stored scores, scored {self.misses}")
+        return products
+
+    def _score_chunks(
+        self, chunks: typing.Iterable[typing.List[typing.Dict]]
+    ) -> typing.Iterator[typing.List[typing.Dict]]:
+        """Score the unseen products of chunks, yielding them in input order."""
+        # Chunks whose unseen products are in the wrapped pipeline
+        pending: typing.Deque = collections.deque()
+
+        def unseen() -> typing.Iterator[typing.List[typing.Dict]]:
+            for chunk in chunks:
+                keys, missing = self._lookup(chunk)
+                pending.append((chunk, keys, missing))
+                yield [chunk[i] for i in missing]
+
+        for scored in self.pipeline._score_chunks(unseen()):
+            yield self._merge(*pending.popleft(), scored)
+
+        self.store.commit()
+        self.logger.info(f"Reused {self.hits} stored scores, scored {self.misses}")
+
+    @classmethod
+    def from_config(
+        cls,
+        config: "omegaconf.DictConfig",
+        pipeline: FilterPipeline,
+        cache_dir: typing.Optional[str] = None,
+    ) -> "IncrementalFilterPipeline":
+        """Wrap a pipeline built from ``config`` with the store of the config."""
+        output_config = config.get("output") or {}
+        return cls(
+            pipeline,
+            ScoreStore.for_config(config, cache_dir),
+            output_config.get("explain", "full"),
+        )
+
+    def close(self) -> None:
+        """Close the store and the wrapped pipeline."""
+        self.pipeline.close()
+        self.store.close()
@@ -0,0 +1,321 @@
+import contextlib
+import json
+import os
+import threading
+import time
+import typing
+
+METRICS_FORMATS = ("json", "prometheus")
+PROFILERS = ("cprofile", "tracemalloc")
+
+# Prometheus metric, help text and summary field of every exported series
+_PROMETHEUS_SERIES = (
+    ("calls_total", "Times a stage ran", "calls"),
+    ("items_total", "Products a stage processed", "items"),
+    ("wall_seconds", "Wall time of a stage, nested stages included", "wall"),
+    ("cpu_seconds", "CPU time of a stage, nested stages included", "cpu"),
+    ("self_wall_seconds", "Wall time of a stage itself", "self_wall"),
+    ("self_cpu_seconds", "CPU time of a stage itself", "self_cpu"),
+    ("alloc_peak_bytes", "Peak memory allocated during a stage", "alloc_peak"),
+)
+
+
+class StageStats:
+    """Totals of every run of one stage."""
+
+    __slots__ = ("calls", "items", "wall", "cpu", "self_wall", "self_cpu", "alloc_peak")
+
+    def __init__(self):
+        self.calls = 0
+        self.items = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.self_wall = 0.0
+        self.self_cpu = 0.0
+        self.alloc_peak: typing.Optional[int] = None
+
+    def as_dict(self) -> typing.Dict[str, typing.Any]:
+        stats = {name: getattr(self, name) for name in self.__slots__}
+        for name in ("wall", "cpu", "self_wall", "self_cpu"):
+            stats[name] = round(stats[name], 6)
+        stats["items_per_second"] = (
+            round(self.items / self.wall, 1) if self.items and self.wall else None
+        )
+        return stats
+
+
+class _Frame:
+    """A stage in progress, with the time its nested stages took so far."""
+
+    __slots__ = ("name", "items", "wall", "cpu", "child_wall", "child_cpu", "alloc")
+
+    def __init__(self, name: str, items: int):
+        self.name = name
+        self.items = items
+        self.child_wall = 0.0
+        self.child_cpu = 0.0
+        # Traced memory when the stage started and the highest seen since
+        self.alloc: typing.Optional[typing.List[int]] = None
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+
+
+class Recorder:
+    """Records wall time, CPU time, item counts and allocation peaks by stage.
+
+    Stages nest: the totals of a stage include the stages run inside it,
+    and its ``self_`` times exclude them, so the stage that consumes a lazy
+    stream (e.g. writing the output) is not charged for producing it.
+    Allocation peaks need ``tracemalloc``, which slows a run down, so they
+    are only recorded with ``track_allocations``.
+    """
+
+    def __init__(self, track_allocations: bool = False):
+        self.track_allocations = track_allocations
+        self.stages: typing.Dict[str, StageStats] = {}
+        self._local = threading.local()
+
+    def _stack(self) -> typing.List[_Frame]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextlib.contextmanager
+    def stage(self, name: str, items: int = 0) -> typing.Iterator[None]:
+        """Record the time spent in the body as one run of stage ``name``."""
+        stack = self._stack()
+        frame = _Frame(name, items)
+        if self.track_allocations:
+            import tracemalloc
+
+            current, peak = tracemalloc.get_traced_memory()
+            # The enclosing stage keeps the peak reached before this one
+            if stack and stack[-1].alloc is not None:
+                stack[-1].alloc[1] = max(stack[-1].alloc[1], peak)
+            tracemalloc.reset_peak()
+            frame.alloc = [current, current]
+
+        stack.append(frame)
+        try:
+            yield
+        finally:
+            stack.pop()
+            self._finish(frame, stack[-1] if stack else None)
+
+    def _finish(self, frame: _Frame, parent: typing.Optional[_Frame]) -> None:
+        wall = time.perf_counter() - frame.wall
+        cpu = time.process_time() - frame.cpu
+        stats = self.stages.get(frame.name)
+        if stats is None:
+            stats = self.stages[frame.name] = StageStats()
+        stats.calls += 1
+        stats.items += frame.items
+        stats.wall += wall
+        stats.cpu += cpu
+        stats.self_wall += wall - frame.child_wall
+        stats.self_cpu += cpu - frame.child_cpu
+
+        if frame.alloc is not None:
+            import tracemalloc
+
+            peak = max(frame.alloc[1], tracemalloc.get_traced_memory()[1])
+            stats.alloc_peak = max(stats.alloc_peak or 0, peak - frame.alloc[0])
+            if parent is not None and parent.alloc is not None:
+                parent.alloc[1] = max(parent.alloc[1], peak)
+
+        if parent is not None:
+            parent.child_wall += wall
+            parent.child_cpu += cpu
+
+    def add_items(self, name: str, items: int) -> None:
+        """Count products of a stage whose number was unknown when it started."""
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = StageStats()
+        stats.items += items
+
+    def summary(self) -> typing.Dict[str, typing.Any]:
+        """Return the totals of every stage, in the order they first ran."""
+        return {
+            "stages": {name: stats.as_dict() for name, stats in self.stages.items()}
+        }
+
+
+# Recorder of the current run; None leaves every stage unrecorded
+_active: typing.Optional[Recorder] = None
+_NULL_STAGE = contextlib.nullcontext()
+
+
+def stage(name: str, items: int = 0) -> typing.ContextManager:
+    """Record the body as a run of stage ``name`` if a recorder is active."""
+    if _active is None:
+        return _NULL_STAGE
+    return _active.stage(name, items)
+
+
+def add_items(name: str, items: int) -> None:
+    """Count products of stage ``name`` if a recorder is active."""
+    if _active is not None:
+        _active.add_items(name, items)
+
+
+def timed(
+    name: str, iterable: typing.Iterable[typing.Sized]
+) -> typing.Iterator[typing.Sized]:
+    """Yield from ``iterable``, recording the time to produce each item.
+
+    Items are batches, e.g. chunks of a lazily decoded input, counted by
+    their length.
+    """
+    if _active is None:
+        yield from iterable
+        return
+
+    iterator = iter(iterable)
+    while True:
+        with stage(name):
+            batch = next(iterator, None)
+            if batch is not None:
+                add_items(name, len(batch))
+        if batch is None:
+            return
+        yield batch
+
+
+@contextlib.contextmanager
+def recording(recorder: Recorder) -> typing.Iterator[Recorder]:
+    """Make ``recorder`` record every stage run in the body."""
+    global _active
+
+    previous = _active
+    started = False
+    if recorder.track_allocations:
+        import tracemalloc
+
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+    _active = recorder
+    try:
+        with recorder.stage("run"):
+            yield recorder
+    finally:
+        _active = previous
+        if started:
+            tracemalloc.stop()
+
+
+def format_prometheus(summary: typing.Mapping[str, typing.Any]) -> str:
+    """Return a summary in the Prometheus text exposition format."""
+    lines = []
+    for metric, help_text, field in _PROMETHEUS_SERIES:
+        samples = [
+            (name, stats[field])
+            for name, stats in summary["stages"].items()
+            if stats[field] is not None
+        ]
+        if not samples:
+            continue
+        kind = "counter" if metric.endswith("_total") else "gauge"
+        lines.append(f"# HELP stellarspider_stage_{metric} {help_text}.")
+        lines.append(f"# TYPE stellarspider_stage_{metric} {kind}")
+        for name, value in samples:
+            lines.append(f'stellarspider_stage_{metric}{{stage="{name}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(
+    summary: typing.Mapping[str, typing.Any],
+    metrics_format: str = "json",
+    path: typing.Optional[str] = None,
+) -> None:
+    """Write a summary as JSON or Prometheus text to ``path``, or stderr.
+
+    Files are replaced atomically, so a Prometheus textfile collector never
+    reads a partly written file.
+    """
+    import sys
+
+    if metrics_format == "json":
+        text = json.dumps(summary, indent=2) + "\n"
+    elif metrics_format == "prometheus":
+        text = format_prometheus(summary)
+    else:
+        raise ValueError(f"Unsupported metrics format: {metrics_format}")
+
+    if path is None:
+        sys.stderr.write(text)
+        return
+
+    partial = f"{path}.{os.getpid()}.tmp"
+    with open(partial, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(partial, path)
+
+
+class _PeakSnapshots(threading.Thread):
+    """Thread that keeps a tracemalloc snapshot of the highest memory seen."""
+
+    def __init__(self, interval: float = 0.1, growth: float = 1.25):
+        super().__init__(name="stellarspider-tracemalloc", daemon=True)
+        self.interval = interval
+        self.growth = growth
+        self.snapshot = None
+        self._size = 0
+        self._stopped = threading.Event()
+
+    def take(self) -> None:
+        """Snapshot now if memory grew by ``growth`` since the last snapshot."""
+        import tracemalloc
+
+        current = tracemalloc.get_traced_memory()[0]
+        if self.snapshot is None or current > self._size * self.growth:
+            self.snapshot = tracemalloc.take_snapshot()
+            self._size = current
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.take()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join()
+
+
+@contextlib.contextmanager
+def profiling(path: str, profiler: str = "cprofile") -> typing.Iterator[None]:
+    """Profile the body and write the dump to ``path``.
+
+    ``cprofile`` writes pstats data (``python -m pstats PATH``).
+    ``tracemalloc`` writes a snapshot of the allocations alive when memory
+    use was highest, sampled every 100 ms (``tracemalloc.Snapshot.load``).
+    """
+    if profiler == "cprofile":
+        import cProfile
+
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            profile.dump_stats(path)
+    elif profiler == "tracemalloc":
+        import tracemalloc
+
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        snapshots = _PeakSnapshots()
+        snapshots.start()
+        try:
+            yield
+        finally:
+            snapshots.stop()
+            snapshots.take()
+            snapshots.snapshot.dump(path)
+            if started:
+                tracemalloc.stop()
+    else:
+        raise ValueError(f"Unknown profiler: {profiler}")
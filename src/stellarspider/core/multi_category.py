@@ -0,0 +1,254 @@
+import heapq
+import logging
+import typing
+
+from stellarspider.core import instrumentation, records
+from stellarspider.core.filters.keyword_matcher import KeywordMatcher
+from stellarspider.core.filters.rule_based import RuleBasedFilter
+from stellarspider.core.filters.semantic import SemanticFilter
+from stellarspider.core.pipeline import FilterPipeline, _chunks, _final_score
+
+if typing.TYPE_CHECKING:
+    import numpy as np
+    import omegaconf
+
+    from stellarspider.core.embeddings import EmbeddingBackend
+
+
+def _copy_product(product: typing.Dict, category: str) -> typing.Dict:
+    """Return a shallow copy of a product with its own scoring for a category."""
+    copy = dict(product)
+    scoring = product.get("Scoring")
+    copy["Scoring"] = dict(scoring) if scoring else records.ScoreRecord()
+    copy["Scoring"]["category"] = category
+    return copy
+
+
+class _Ranking:
+    """Best products seen so far, in the order of a stable full sort."""
+
+    def __init__(
+        self, top: typing.Optional[int] = None, min_score: typing.Optional[float] = None
+    ):
+        self.top = top
+        self.min_score = min_score
+        self._entries: typing.List[typing.Tuple[float, int, typing.Dict]] = []
+        self._count = 0
+
+    def add(self, product: typing.Dict) -> None:
+        score = _final_score(product)
+        if self.min_score is not None and score < self.min_score:
+            return
+
+        # Earlier products win ties, like in a stable sort
+        entry = (score, -self._count, product)
+        self._count += 1
+        if self.top is None:
+            self._entries.append(entry)
+        elif len(self._entries) < self.top:
+            heapq.heappush(self._entries, entry)
+        elif self.top and entry[:2] > self._entries[0][:2]:
+            heapq.heapreplace(self._entries, entry)
+
+    def result(self) -> typing.List[typing.Dict]:
+        ranked = sorted(self._entries, key=lambda entry: entry[:2], reverse=True)
+        return [product for _, _, product in ranked]
+
+
+class MultiCategoryPipeline:
+    """Pipeline that scores every product against several categories at once.
+
+    Each product is normalized, keyword-matched and price-parsed only once:
+    the keywords of all categories are compiled into one matcher, and each
+    category assembles its scores from the shared matches. Categories that
+    use the same embedding model share one encode call per chunk.
+    """
+
+    def __init__(self, pipelines: typing.Dict[str, FilterPipeline]):
+        if not pipelines:
+            raise ValueError("At least one category is required")
+        for category, pipeline in pipelines.items():
+            if not pipeline.filters or not isinstance(
+                pipeline.filters[0], RuleBasedFilter
+            ):
+                raise ValueError(
+                    f"Pipeline of category {category} must start with a "
+                    "rule-based filter"
+                )
+
+        self.pipelines = pipelines
+        self.logger = logging.getLogger(__name__)
+
+        self.matcher = KeywordMatcher(
+            {
+                (category, *key): keywords
+                for category, pipeline in pipelines.items()
+                for key, keywords in pipeline.filters[0].matcher.groups.items()
+            }
+        )
+        # Category and slot in its own rule filter's matcher of every slot;
+        # the combined matcher numbers the slots of each category in turn
+        self._slot_owners = [
+            (category, slot)
+            for category, pipeline in pipelines.items()
+            for slot in range(len(pipeline.filters[0].matcher.slots))
+        ]
+        first_filter = next(iter(pipelines.values())).filters[0]
+        self._normalize_text = first_filter._normalize_text
+        self.price_extractor = first_filter.price_extractor
+
+    def _match(self, combined_text: str) -> typing.Dict[str, typing.List[int]]:
+        """Find the keyword slots of every category, split by category."""
+        matches: typing.Dict[str, typing.List[int]] = {c: [] for c in self.pipelines}
+        owners = self._slot_owners
+        for slot in self.matcher.match_slots(combined_text):
+            category, own_slot = owners[slot]
+            matches[category].append(own_slot)
+        return matches
+
+    def _score(
+        self, products: typing.List[typing.Dict]
+    ) -> typing.List[typing.Dict[str, typing.Dict]]:
+        """Score products against every category.
+
+        Returns, for each product, its scored copy per category.
+        """
+        with instrumentation.stage("rule.normalize", len(products)):
+            normalized = [self._normalize_text(product) for product in products]
+        with instrumentation.stage("rule.keywords", len(products)):
+            matches = [self._match(combined_text) for _, combined_text in normalized]
+        with instrumentation.stage("rule.price", len(products)):
+            prices = [
+                self.price_extractor.extract_from_text(combined_text, len(name) + 1)
+                for name, combined_text in normalized
+            ]
+        embeddings: typing.Dict[typing.Any, "np.ndarray"] = {}
+
+        scored: typing.List[typing.Dict[str, typing.Dict]] = [{} for _ in products]
+        for category, pipeline in self.pipelines.items():
+            rule_filter, *other_filters = pipeline.filters
+            copies = [_copy_product(product, category) for product in products]
+
+            with instrumentation.stage("rule.keywords", len(copies)):
+                for copy, product_text, product_matches, price_details in zip(
+                    copies, normalized, matches, prices
+                ):
+                    rule_filter._score_product(
+                        copy,
+                        product_text,
+                        (product_matches[category], None),
+                        price_details,
+                    )
+
+            for filter_instance in other_filters:
+                name = f"filter.{type(filter_instance).__name__}"
+                if (
+                    isinstance(filter_instance, SemanticFilter)
+                    and filter_instance.concept_embeddings is not None
+                ):
+                    backend = filter_instance.backend
+                    if backend not in embeddings:
+                        texts = [SemanticFilter.product_text(p) for p in products]
+                        with instrumentation.stage("semantic.encode", len(texts)):
+                            embeddings[backend] = backend.encode(
+                                texts, filter_instance.batch_size
+                            )
+                    with instrumentation.stage(name, len(copies)):
+                        filter_instance.filter_products(copies, embeddings[backend])
+                else:
+                    with instrumentation.stage(name, len(copies)):
+                        filter_instance.filter_products(copies)
+
+            with instrumentation.stage("combine", len(copies)):
+                pipeline.score_calculator.calculate_final_score(copies)
+            for row, copy in zip(scored, copies):
+                row[category] = copy
+
+        return scored
+
+    def process_stream(
+        self, products: typing.Iterable[typing.Dict], chunk_size: int = 1000
+    ) -> typing.Iterator[typing.Dict[str, typing.Dict]]:
+        """Score products lazily, yielding each one's scored copy per category."""
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+
+        self.logger.info(
+            f"Scoring products against {len(self.pipelines)} categories "
+            f"in chunks of {chunk_size}"
+        )
+
+        total = 0
+        for chunk in instrumentation.timed("input", _chunks(products, chunk_size)):
+            total += len(chunk)
+            self.logger.debug(f"Scoring chunk of {len(chunk)} products ({total} total)")
+            yield from self._score(chunk)
+
+        self.logger.info(f"Multi-category scoring complete: {total} products")
+
+    def rank(
+        self,
+        products: typing.Iterable[typing.Dict],
+        top: typing.Optional[int] = None,
+        min_score: typing.Optional[float] = None,
+        chunk_size: int = 1000,
+    ) -> typing.Dict[str, typing.List[typing.Dict]]:
+        """Return the ranking of every category, like ``process_top``."""
+        rankings = {category: _Ranking(top, min_score) for category in self.pipelines}
+        with instrumentation.stage("rank"):
+            for scored in self.process_stream(products, chunk_size):
+                for category, product in scored.items():
+                    rankings[category].add(product)
+        return {category: ranking.result() for category, ranking in rankings.items()}
+
+    @staticmethod
+    def _best(scored: typing.Dict[str, typing.Dict]) -> typing.Dict:
+        """Return the copy of the best-scoring category, first one on ties."""
+        best = max(scored.values(), key=_final_score)
+        best["Scoring"]["category_scores"] = {
+            category: _final_score(product) for category, product in scored.items()
+        }
+        return best
+
+    def best_stream(
+        self, products: typing.Iterable[typing.Dict], chunk_size: int = 1000
+    ) -> typing.Iterator[typing.Dict]:
+        """Yield every product scored by its best category, in input order."""
+        for scored in self.process_stream(products, chunk_size):
+            yield self._best(scored)
+
+    def best(
+        self,
+        products: typing.Iterable[typing.Dict],
+        top: typing.Optional[int] = None,
+        min_score: typing.Optional[float] = None,
+        chunk_size: int = 1000,
+    ) -> typing.List[typing.Dict]:
+        """Return products scored by their best category, ranked by that score."""
+        ranking = _Ranking(top, min_score)
+        with instrumentation.stage("rank"):
+            for product in self.best_stream(products, chunk_size):
+                ranking.add(product)
+        return ranking.result()
+
+    @classmethod
+    def from_configs(
+        cls,
+        configs: typing.Mapping[str, "omegaconf.DictConfig"],
+        rule_filters: typing.Optional[typing.Mapping[str, RuleBasedFilter]] = None,
+    ) -> "MultiCategoryPipeline":
+        """Create a pipeline from the merged config of each category.
+
+        ``rule_filters`` may hold rule-based filters already built from them.
+        """
+        rule_filters = rule_filters or {}
+        # Categories configured with the same model load it only once
+        backends: typing.Dict[typing.Tuple, "EmbeddingBackend"] = {}
+        return cls(
+            {
+                category: FilterPipeline.from_config(
+                    config, backends, rule_filters.get(category)
+                )
+                for category, config in configs.items()
+            }
+        )
@@ -0,0 +1,166 @@
+import re
+import typing
+import zlib
+
+import numpy as np
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Permutations are multiply-shift hashes of 32-bit shingle hashes: the high
+# 32 bits of (a * x + b) mod 2**64 for random odd a and random b
+_SEED = 1
+
+# Texts whose signatures are computed together
+_GROUP_SIZE = 256
+
+
+class _TokenHashes(dict):
+    """Token to 32-bit hash, computed on first lookup."""
+
+    def __missing__(self, token: str) -> int:
+        value = self[token] = zlib.crc32(token.encode("utf-8"))
+        return value
+
+
+class MinHashIndex:
+    """LSH index that finds near-duplicate texts by MinHash signatures.
+
+    Texts are reduced to shingles of ``shingle_size`` consecutive words, and
+    the Jaccard similarity of two shingle sets is estimated by the share of
+    equal values in their signatures. Signatures are split into ``bands``;
+    texts sharing any band are candidates, and a candidate is a duplicate
+    if its estimated similarity reaches ``threshold``.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 2,
+    ):
+        if not 0 < threshold <= 1:
+            raise ValueError(f"threshold must be in (0, 1], got {threshold}")
+        if num_perm % bands:
+            raise ValueError(f"num_perm {num_perm} is not a multiple of bands {bands}")
+
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+
+        # Fixed permutations, so the same input always groups the same way
+        rng = np.random.default_rng(_SEED)
+        self._a = rng.integers(0, 2**64, num_perm, dtype=np.uint64, endpoint=False)
+        self._a |= np.uint64(1)
+        self._b = rng.integers(0, 2**64, num_perm, dtype=np.uint64, endpoint=False)
+
+        self._buckets: typing.Dict[int, int] = {}
+        self._signatures: typing.Dict[int, np.ndarray] = {}
+        self._groups = 0
+        self._token_hashes = _TokenHashes()
+
+    def _shingles(
+        self, texts: typing.Sequence[str]
+    ) -> typing.Tuple[np.ndarray, np.ndarray]:
+        """Return the shingle hashes of texts, concatenated, and their counts.
+
+        Texts shorter than a shingle are a single shingle of their first word.
+        """
+        lookup = self._token_hashes.__getitem__
+        hashes: typing.List[int] = []
+        lengths = np.empty(len(texts), dtype=np.int64)
+        for i, text in enumerate(texts):
+            tokens = _TOKEN.findall(text.lower())
+            hashes.extend(map(lookup, tokens))
+            lengths[i] = len(tokens)
+
+        size = self.shingle_size
+        tokens = np.array(hashes, dtype=np.uint64)
+        padded = np.concatenate([tokens, np.zeros(size - 1, dtype=np.uint64)])
+        shingles = tokens.copy()
+        for offset in range(1, size):
+            following = padded[offset : offset + len(tokens)]
+            shingles = ((shingles * np.uint64(16777619)) ^ following) & np.uint64(
+                0xFFFFFFFF
+            )
+
+        # Keep the shingles that start and end within one text
+        text_lengths = np.repeat(lengths, lengths)
+        positions = np.arange(len(tokens)) - np.repeat(
+            np.cumsum(lengths) - lengths, lengths
+        )
+        short = text_lengths < size
+        valid = (positions <= text_lengths - size) | (short & (positions == 0))
+        shingles = np.where(short, tokens, shingles)[valid]
+        counts = np.where(lengths >= size, lengths - size + 1, np.minimum(lengths, 1))
+        return shingles, counts
+
+    def signatures(
+        self, texts: typing.Sequence[str]
+    ) -> typing.Tuple[np.ndarray, np.ndarray]:
+        """Return the MinHash signature and band keys of each text.
+
+        Rows of texts without any word are all zero and must be skipped.
+        """
+        signatures = np.zeros((len(texts), self.num_perm), dtype=np.uint32)
+        # Hashing every shingle of the input at once would need num_perm
+        # times its memory, so texts are hashed in groups
+        for start in range(0, len(texts), _GROUP_SIZE):
+            shingles, counts = self._shingles(texts[start : start + _GROUP_SIZE])
+            present = np.flatnonzero(counts) + start
+            if not len(present):
+                continue
+
+            # One row per permutation keeps the reduction over contiguous memory
+            hashed = (self._a[:, None] * shingles + self._b[:, None]) >> np.uint64(32)
+            offsets = np.cumsum(counts[counts > 0]) - counts[counts > 0]
+            minima = np.minimum.reduceat(hashed.astype(np.uint32), offsets, axis=1)
+            signatures[present] = minima.T
+
+        # Each band folds into one 64-bit key; equal keys of unequal bands
+        # only cost a comparison of signatures
+        bands = signatures.reshape(len(texts), self.bands, self.rows).astype(np.uint64)
+        keys = np.zeros((len(texts), self.bands), dtype=np.uint64)
+        for row in range(self.rows):
+            keys = (keys * np.uint64(0x100000001B3)) ^ bands[:, :, row]
+        keys ^= np.arange(self.bands, dtype=np.uint64) << np.uint64(58)
+        return signatures, keys
+
+    def group(
+        self, texts: typing.Sequence[str]
+    ) -> typing.List[typing.Tuple[int, bool]]:
+        """Return the group number of each text and whether its group is new.
+
+        A text joins the group of the first indexed text it is a near-duplicate
+        of; otherwise it starts a new group and is indexed as its first text.
+        Texts without any word always start a group of their own.
+        """
+        signatures, keys = self.signatures(texts)
+        min_equal = self.threshold * self.num_perm
+        present = signatures.any(axis=1).tolist()
+        result = []
+        for signature, band_keys, has_words in zip(signatures, keys.tolist(), present):
+            match = None
+            if has_words:
+                for band_key in band_keys:
+                    candidate = self._buckets.get(band_key)
+                    if candidate is not None and (
+                        np.count_nonzero(self._signatures[candidate] == signature)
+                        >= min_equal
+                    ):
+                        match = candidate
+                        break
+            if match is not None:
+                result.append((match, False))
+                continue
+
+            group = self._groups
+            self._groups += 1
+            if has_words:
+                self._signatures[group] = signature
+                for band_key in band_keys:
+                    self._buckets.setdefault(band_key, group)
+            result.append((group, True))
+        return result
@@ -0,0 +1,190 @@
+import collections
+import copy
+import os
+import typing
+
+from stellarspider.core import instrumentation
+from stellarspider.core.pipeline import (
+    FilterPipeline,
+    _chunks,
+    _drops_rejected,
+    _score_calculator,
+)
+from stellarspider.core.rerank import RerankBudget
+
+if typing.TYPE_CHECKING:
+    import concurrent.futures
+
+    import omegaconf
+
+# Pipeline of the current worker process, built once by _init_worker
+_worker_pipeline: typing.Optional[FilterPipeline] = None
+
+
+def _init_worker(config: typing.Dict) -> None:
+    import omegaconf
+
+    global _worker_pipeline
+    _worker_pipeline = FilterPipeline.from_config(omegaconf.OmegaConf.create(config))
+
+
+def _score_chunk(chunk: typing.List[typing.Dict]) -> typing.List[typing.Dict]:
+    return _worker_pipeline._score(chunk)
+
+
+def _rule_score_chunk(chunk: typing.List[typing.Dict]) -> typing.List[typing.Dict]:
+    return next(_worker_pipeline._rule_scored([chunk]))
+
+
+def _rescore_batch(batch: typing.List[typing.Dict]) -> typing.List[typing.Dict]:
+    return next(_worker_pipeline._rescored([batch]))
+
+
+class ParallelFilterPipeline(FilterPipeline):
+    """Pipeline that scores chunks of products in a pool of worker processes.
+
+    Every worker builds its own filters from the merged config, so the main
+    process only splits the input, ships chunks out and collects results in
+    input order. Ranking therefore matches a serial run exactly. With a
+    rerank budget, workers rule-score the chunks and then the candidate
+    batches; this process picks the candidates and combines the scores.
+    """
+
+    def __init__(
+        self,
+        config: "omegaconf.DictConfig",
+        workers: int = 0,
+        chunk_size: int = 1000,
+    ):
+        if workers < 0:
+            raise ValueError(f"workers must not be negative, got {workers}")
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+
+        if isinstance(config, dict):
+            self._config = copy.deepcopy(config)
+        else:
+            import omegaconf
+
+            self._config = omegaconf.OmegaConf.to_container(config, resolve=True)
+
+        # Filters are built inside the workers, never in this process
+        super().__init__(
+            [],
+            None,
+            _drops_rejected(self._config),
+            RerankBudget.from_config(self._config),
+        )
+        # Reranked runs combine scores here, once the whole run is scored
+        if self.rerank is not None:
+            self.score_calculator = _score_calculator(self._config)
+
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+
+        # Without a limit every worker's torch would use every core
+        semantic_config = self._config.get("semantic") or {}
+        if semantic_config.get("model_path") and not semantic_config.get("num_threads"):
+            semantic_config["num_threads"] = max(
+                1, (os.cpu_count() or 1) // self.workers
+            )
+
+        self._executor: typing.Optional["concurrent.futures.ProcessPoolExecutor"] = None
+
+    def _pool(self) -> "concurrent.futures.ProcessPoolExecutor":
+        """Start the worker processes on first use."""
+        if self._executor is None:
+            # Imported here so serial runs never pay for them
+            import concurrent.futures
+            import multiprocessing
+
+            self.logger.info(f"Starting {self.workers} worker processes")
+            # Spawned workers do not inherit the threads (e.g. torch's) of
+            # this process, which can deadlock forked children
+            self._executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self._config,),
+            )
+        return self._executor
+
+    def _score(self, products: typing.List[typing.Dict]) -> typing.List[typing.Dict]:
+        """Score products in chunks spread over the workers."""
+        return [
+            product
+            for scored in self._score_chunks(_chunks(products, self.chunk_size))
+            for product in scored
+        ]
+
+    def _map(
+        self,
+        function: typing.Callable[[typing.List[typing.Dict]], typing.List[typing.Dict]],
+        chunks: typing.Iterable[typing.List[typing.Dict]],
+    ) -> typing.Iterator[typing.List[typing.Dict]]:
+        """Apply a worker function to chunks, yielding results in input order.
+
+        At most two chunks per worker are in flight, so memory stays bounded
+        when chunks come from a stream.
+        """
+        pool = self._pool()
+        pending: typing.Deque["concurrent.futures.Future"] = collections.deque()
+
+        def result() -> typing.List[typing.Dict]:
+            # Filters run in the workers; here only waiting on them shows up
+            with instrumentation.stage("parallel.wait"):
+                scored = pending.popleft().result()
+            instrumentation.add_items("parallel.wait", len(scored))
+            return scored
+
+        for chunk in chunks:
+            pending.append(pool.submit(function, chunk))
+            if len(pending) >= 2 * self.workers:
+                yield result()
+
+        while pending:
+            yield result()
+
+    def _score_chunks(
+        self, chunks: typing.Iterable[typing.List[typing.Dict]]
+    ) -> typing.Iterator[typing.List[typing.Dict]]:
+        """Score chunks in the workers, yielding them in input order."""
+        if self.rerank is None:
+            return self._map(_score_chunk, chunks)
+        return super()._score_chunks(chunks)
+
+    def _rule_scored(
+        self, chunks: typing.Iterable[typing.List[typing.Dict]]
+    ) -> typing.Iterator[typing.List[typing.Dict]]:
+        """Rule-score chunks in the workers, yielding copies in input order."""
+        return self._map(_rule_score_chunk, chunks)
+
+    def _rescored(
+        self, batches: typing.Iterable[typing.List[typing.Dict]]
+    ) -> typing.Iterator[typing.List[typing.Dict]]:
+        """Rescore batches in the workers, copying their scores back in place."""
+        submitted: typing.Deque[typing.List[typing.Dict]] = collections.deque()
+
+        def submit() -> typing.Iterator[typing.List[typing.Dict]]:
+            for batch in batches:
+                submitted.append(batch)
+                yield batch
+
+        for scored in self._map(_rescore_batch, submit()):
+            batch = submitted.popleft()
+            for product, result in zip(batch, scored):
+                product.update(result)
+            yield batch
+
+    @classmethod
+    def from_config(
+        cls, config: "omegaconf.DictConfig", workers: int = 0
+    ) -> "ParallelFilterPipeline":
+        """Create a pipeline that builds its filters in each worker."""
+        return cls(config, workers, config.get("chunk_size", 1000))
+
+    def close(self) -> None:
+        """Stop the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
@@ -1,66 +1,279 @@
+import heapq
+import itertools
 import logging
 import typing
 
-import omegaconf
-
+from stellarspider.core import instrumentation
 from stellarspider.core.filters.base import ProductFilter
 from stellarspider.core.filters.rule_based import RuleBasedFilterBuilder
 from stellarspider.core.filters.semantic import SemanticFilterBuilder
+from stellarspider.core.rerank import RerankBudget
 from stellarspider.core.scoring.combined_scorer import CombinedScoreCalculator
 
+if typing.TYPE_CHECKING:
+    import omegaconf
+
+    from stellarspider.core.embeddings import EmbeddingBackend
+
+
+def _final_score(product: typing.Dict) -> float:
+    return product.get("Scoring", {}).get("final_score", 0)
+
+
+def _rejected(product: typing.Dict) -> bool:
+    return bool(product.get("Scoring", {}).get("rejected"))
+
+
+def _drops_rejected(config: "omegaconf.DictConfig") -> bool:
+    """Return whether a config asks to leave rejected products out."""
+    cascade = config.get("cascade") or {}
+    return bool(cascade.get("enabled")) and cascade.get("rejected") == "drop"
+
+
+def _score_calculator(config: "omegaconf.DictConfig") -> CombinedScoreCalculator:
+    """Create the score calculator of a config's ``scoring`` weights."""
+    scoring_config = config.get("scoring", {})
+    return CombinedScoreCalculator(
+        rule_weight=scoring_config.get("rule_weight", 0.7),
+        semantic_weight=scoring_config.get("semantic_weight", 0.3),
+    )
+
+
+def _chunks(
+    products: typing.Iterable[typing.Dict], chunk_size: int
+) -> typing.Iterator[typing.List[typing.Dict]]:
+    iterator = iter(products)
+    while chunk := list(itertools.islice(iterator, chunk_size)):
+        yield chunk
+
+
+def _rank(
+    scored: typing.Iterable[typing.Dict],
+    top: typing.Optional[int] = None,
+    min_score: typing.Optional[float] = None,
+) -> typing.List[typing.Dict]:
+    """Return scored products best first, keeping at most ``top`` of them."""
+    if min_score is not None:
+        scored = (p for p in scored if _final_score(p) >= min_score)
+
+    if top is None:
+        return sorted(scored, key=_final_score, reverse=True)
+    # Same order as a stable full sort, in O(n log top)
+    return heapq.nlargest(top, scored, key=_final_score)
+
 
 class FilterPipeline:
-    """Pipeline that applies multiple filters in sequence using DIP."""
+    """Pipeline that applies multiple filters in sequence using DIP.
+
+    A product a filter marks as rejected in ``Scoring.rejected`` skips the
+    filters after it and gets a final score of 0. ``drop_rejected`` leaves
+    such products out of the results; they are still scored in place.
+
+    With a ``rerank`` budget, the first filter scores every product and the
+    later, expensive ones only score the budget's candidates; the others
+    are combined without their scores. Candidates and the time budget are
+    those of the whole run, whatever its chunk size.
+    """
 
     def __init__(
         self,
         filters: typing.List[ProductFilter],
         score_calculator: CombinedScoreCalculator,
+        drop_rejected: bool = False,
+        rerank: typing.Optional[RerankBudget] = None,
     ):
         self.filters = filters
         self.score_calculator = score_calculator
+        self.drop_rejected = drop_rejected
+        self.rerank = rerank
         self.logger = logging.getLogger(__name__)
 
+    def _apply(
+        self, filters: typing.List[ProductFilter], products: typing.List[typing.Dict]
+    ) -> typing.List[typing.Dict]:
+        """Apply filters in sequence; return the products none rejected."""
+        for filter_instance in filters:
+            name = f"filter.{type(filter_instance).__name__}"
+            with instrumentation.stage(name, len(products)):
+                products = filter_instance.filter_products(products)
+
+            # Products rejected by a cheap filter skip the expensive ones
+            products = [p for p in products if not _rejected(p)]
+        return products
+
+    def _rule_scored(
+        self, chunks: typing.Iterable[typing.List[typing.Dict]]
+    ) -> typing.Iterator[typing.List[typing.Dict]]:
+        """Apply the first filter to chunks, yielding them in input order."""
+        for chunk in chunks:
+            self._apply(self.filters[:1], chunk)
+            yield chunk
+
+    def _rescored(
+        self, batches: typing.Iterable[typing.List[typing.Dict]]
+    ) -> typing.Iterator[typing.List[typing.Dict]]:
+        """Apply the filters after the first to batches, scoring them in place."""
+        for batch in batches:
+            self._apply(self.filters[1:], batch)
+            yield batch
+
+    def _rerank(self, products: typing.List[typing.Dict]) -> None:
+        """Apply the filters after the first to the rerank candidates."""
+        scored = 0
+        with instrumentation.stage("rerank"):
+            for batch in self._rescored(self.rerank.batches(products)):
+                scored += len(batch)
+        instrumentation.add_items("rerank", scored)
+        self.logger.debug(f"Re-ranked {scored} of {len(products)} products")
+
+    def _combine(self, products: typing.List[typing.Dict]) -> typing.List[typing.Dict]:
+        """Calculate final scores; rejected products get a final score of 0."""
+        current_products = [p for p in products if not _rejected(p)]
+        with instrumentation.stage("combine", len(current_products)):
+            self.score_calculator.calculate_final_score(current_products)
+
+        rejected = len(products) - len(current_products)
+        if not rejected:
+            return products
+        instrumentation.add_items("rejected", rejected)
+        for product in products:
+            if _rejected(product):
+                product["Scoring"]["final_score"] = 0.0
+        return products
+
+    def _score(self, products: typing.List[typing.Dict]) -> typing.List[typing.Dict]:
+        """Apply all filters in sequence and calculate final scores.
+
+        Returns every product, rejected ones included, in input order.
+        """
+        self.logger.debug(f"Applying {len(self.filters)} filters")
+        if self.rerank is not None:
+            return [p for scored in self._score_chunks([products]) for p in scored]
+        self._apply(self.filters, products)
+        return self._combine(products)
+
+    def _kept(self, products: typing.Iterable[typing.Dict]) -> typing.Iterable:
+        """Return scored products without the rejected ones if they are dropped."""
+        if not self.drop_rejected:
+            return products
+        return (product for product in products if not _rejected(product))
+
+    def _score_chunks(
+        self, chunks: typing.Iterable[typing.List[typing.Dict]]
+    ) -> typing.Iterator[typing.List[typing.Dict]]:
+        """Score chunks of products, yielding them in input order.
+
+        With a rerank budget, candidates are chosen across all chunks, so
+        every chunk is rule-scored and held before the first is yielded.
+        """
+        if self.rerank is None:
+            for chunk in chunks:
+                yield self._score(chunk)
+            return
+
+        scored = list(self._rule_scored(chunks))
+        self._rerank([p for chunk in scored for p in chunk if not _rejected(p)])
+        for chunk in scored:
+            yield self._combine(chunk)
+
     def process(self, products: typing.List[typing.Dict]) -> typing.List[typing.Dict]:
         """Apply all filters in sequence and calculate final scores."""
         self.logger.info(f"Processing {len(products)} products through pipeline")
 
-        current_products = products
-
-        # Apply filters
-        for i, filter_instance in enumerate(self.filters):
-            self.logger.debug(f"Applying filter {i + 1}/{len(self.filters)}")
-            current_products = filter_instance.filter_products(current_products)
-
-        # Calculate final scores
-        final_products = self.score_calculator.calculate_final_score(current_products)
+        final_products = list(self._kept(self._score(products)))
 
         # Sort by final score descending
-        final_products.sort(
-            key=lambda x: x.get("Scoring", {}).get("final_score", 0), reverse=True
-        )
+        with instrumentation.stage("rank", len(final_products)):
+            final_products.sort(key=_final_score, reverse=True)
 
         self.logger.info("Pipeline processing complete")
         return final_products
 
+    def process_top(
+        self,
+        products: typing.Iterable[typing.Dict],
+        top: typing.Optional[int] = None,
+        min_score: typing.Optional[float] = None,
+        chunk_size: int = 1000,
+    ) -> typing.List[typing.Dict]:
+        """Return the ``top`` best products, ranked like ``process``.
+
+        Products are scored in chunks and fed through a bounded heap, so only
+        ``top`` products are kept no matter how many come in. Products below
+        ``min_score`` are dropped as soon as they are scored. A rerank budget
+        holds every product until all are rule-scored, as ``process_stream``
+        does.
+        """
+        # Scoring runs inside the rank stage, which records it as nested stages
+        with instrumentation.stage("rank"):
+            ranked = _rank(self.process_stream(products, chunk_size), top, min_score)
+        self.logger.info(f"Selected {len(ranked)} top products")
+        return ranked
+
+    def process_stream(
+        self, products: typing.Iterable[typing.Dict], chunk_size: int = 1000
+    ) -> typing.Iterator[typing.Dict]:
+        """Score products lazily, one chunk at a time.
+
+        Only ``chunk_size`` products are held in memory at once. Products are
+        yielded in input order since ranking would need the whole input.
+        A rerank budget picks its candidates across the whole input, so then
+        every product is held until all are rule-scored.
+        """
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+
+        self.logger.info(
+            f"Streaming products through pipeline in chunks of {chunk_size}"
+        )
+
+        # Producing a chunk decodes it when the input is read lazily
+        chunks = instrumentation.timed("input", _chunks(products, chunk_size))
+        total = 0
+        for scored in self._score_chunks(chunks):
+            total += len(scored)
+            self.logger.debug(f"Scored chunk of {len(scored)} products ({total} total)")
+            yield from self._kept(scored)
+
+        self.logger.info(f"Pipeline streaming complete: {total} products")
+
     @classmethod
-    def from_config(cls, config: omegaconf.DictConfig) -> "FilterPipeline":
-        """Create pipeline from configuration using dependency injection."""
+    def from_config(
+        cls,
+        config: "omegaconf.DictConfig",
+        backends: typing.Optional[typing.Dict[typing.Tuple, "EmbeddingBackend"]] = None,
+        rule_filter: typing.Optional[ProductFilter] = None,
+    ) -> "FilterPipeline":
+        """Create pipeline from configuration using dependency injection.
+
+        ``backends`` lets several pipelines share loaded embedding models;
+        ``rule_filter`` is a rule-based filter already built from ``config``.
+        """
         filters = []
 
         # Build rule-based filter
-        rule_builder = RuleBasedFilterBuilder(config)
-        filters.append(rule_builder.build())
+        if rule_filter is None:
+            rule_builder = RuleBasedFilterBuilder(config)
+            rule_filter = rule_builder.build()
+        filters.append(rule_filter)
 
         # Build semantic filter
-        semantic_builder = SemanticFilterBuilder(config)
+        semantic_builder = SemanticFilterBuilder(config, backends)
         filters.append(semantic_builder.build())
 
-        # Create score calculator
-        scoring_config = config.get("scoring", {})
-        score_calculator = CombinedScoreCalculator(
-            rule_weight=scoring_config.get("rule_weight", 0.7),
-            semantic_weight=scoring_config.get("semantic_weight", 0.3),
+        return cls(
+            filters,
+            _score_calculator(config),
+            _drops_rejected(config),
+            RerankBudget.from_config(config),
         )
 
-        return cls(filters, score_calculator)
+    def close(self) -> None:
+        """Release resources held by the pipeline."""
+        pass
+
+    def __enter__(self) -> "FilterPipeline":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
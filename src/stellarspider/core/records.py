@@ -0,0 +1,252 @@
+import abc
+import collections.abc
+import typing
+
+# Scoring fields, in the order filters add them
+SCORE_FIELDS = (
+    "rule_score",
+    "rule_reasoning",
+    "rule_breakdown",
+    "extracted_price",
+    "price_per_oz",
+    "semantic_score",
+    "semantic_breakdown",
+    "final_score",
+    "weights",
+)
+_FIELD_SET = frozenset(SCORE_FIELDS)
+
+# Explanation fields written at each output detail level; the others are
+# numbers, always written
+EXPLANATIONS = ("rule_reasoning", "rule_breakdown", "semantic_breakdown", "weights")
+EXPLAIN_LEVELS = {
+    "none": frozenset(),
+    "summary": frozenset(["rule_reasoning"]),
+    "full": frozenset(EXPLANATIONS),
+}
+_LEFT_OUT = {
+    level: frozenset(EXPLANATIONS) - fields for level, fields in EXPLAIN_LEVELS.items()
+}
+
+
+class Deferred(abc.ABC):
+    """Scoring fields kept compactly and built only when they are read.
+
+    Subclasses hold what is specific to one product, e.g. keyword hits as
+    slot numbers, and refer to the filter that scored it for everything
+    shared, e.g. keyword lists. They are never changed after scoring, so
+    copies share them. Pickling builds them, so a scored product sent to
+    another process never drags the filter (or its model) along.
+    """
+
+    __slots__ = ()
+
+    # Fields this value stands for
+    KEYS: typing.Tuple[str, ...] = ()
+
+    @abc.abstractmethod
+    def fields(self) -> typing.Dict[str, typing.Any]:
+        """Return every field this value stands for, built."""
+
+    def build(self, key: str) -> typing.Any:
+        """Return field ``key``, built."""
+        return self.fields()[key]
+
+    def __copy__(self) -> "Deferred":
+        return self
+
+    def __deepcopy__(self, memo: typing.Dict) -> "Deferred":
+        return self
+
+    def __reduce__(self) -> typing.Tuple:
+        return Built, (self.fields(),)
+
+
+class Built(Deferred):
+    """Deferred fields that are already built, e.g. unpickled ones."""
+
+    __slots__ = ("values",)
+
+    def __init__(self, values: typing.Dict[str, typing.Any]):
+        self.values = values
+
+    @property
+    def KEYS(self) -> typing.Tuple[str, ...]:
+        return tuple(self.values)
+
+    def fields(self) -> typing.Dict[str, typing.Any]:
+        return self.values
+
+
+class ScoreRecord(collections.abc.MutableMapping):
+    """Slotted ``Scoring`` of a product, read and written like a dict.
+
+    The scoring fields live in slots, and explanations are stored as
+    ``Deferred`` values that are built when read, e.g. while encoding the
+    output, so a scored product holds a few small objects instead of nested
+    dicts and lists. Other keys (``category``, ``duplicate_of`` ...) are
+    kept in a dict. Keys iterate in insertion order like a dict, as long as
+    keys set before the first scoring field are set before it.
+    """
+
+    __slots__ = SCORE_FIELDS + ("_extra", "_head")
+
+    def __init__(self, initial: typing.Optional[typing.Mapping] = None):
+        self._extra: typing.Optional[typing.Dict[str, typing.Any]] = None
+        # Number of extra keys set before any scoring field
+        self._head = 0
+        if initial:
+            self.update(initial)
+
+    def _has_fields(self) -> bool:
+        return any(hasattr(self, name) for name in SCORE_FIELDS)
+
+    def __getitem__(self, key: str) -> typing.Any:
+        if key in _FIELD_SET:
+            try:
+                value = getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+            if isinstance(value, Deferred):
+                return value.build(key)
+            return value
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def __setitem__(self, key: str, value: typing.Any) -> None:
+        if key in _FIELD_SET:
+            setattr(self, key, value)
+            return
+        if self._extra is None:
+            self._extra = {}
+        if key not in self._extra and not self._has_fields():
+            self._head += 1
+        self._extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in _FIELD_SET:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+            return
+        if self._extra is None:
+            raise KeyError(key)
+        if list(self._extra).index(key) < self._head:
+            self._head -= 1
+        del self._extra[key]
+
+    def __iter__(self) -> typing.Iterator[str]:
+        extra = list(self._extra or ())
+        yield from extra[: self._head]
+        for name in SCORE_FIELDS:
+            if hasattr(self, name):
+                yield name
+        yield from extra[self._head :]
+
+    def __len__(self) -> int:
+        fields = sum(hasattr(self, name) for name in SCORE_FIELDS)
+        return fields + len(self._extra or ())
+
+    def __contains__(self, key: object) -> bool:
+        if key in _FIELD_SET:
+            return hasattr(self, key)
+        return self._extra is not None and key in self._extra
+
+    def get(self, key: str, default: typing.Any = None) -> typing.Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def stored(self, key: str, default: typing.Any = None) -> typing.Any:
+        """Return the value stored for ``key``, leaving ``Deferred`` unbuilt."""
+        if key in _FIELD_SET:
+            return getattr(self, key, default)
+        return self.get(key, default)
+
+    def copy(self) -> "ScoreRecord":
+        """Return a shallow copy; deferred values are shared."""
+        record = ScoreRecord()
+        for name in SCORE_FIELDS:
+            value = getattr(self, name, record)
+            if value is not record:
+                setattr(record, name, value)
+        if self._extra is not None:
+            record._extra = dict(self._extra)
+        record._head = self._head
+        return record
+
+    def to_dict(self, explain: str = "full") -> typing.Dict[str, typing.Any]:
+        """Return the scoring as plain nested dicts, in today's JSON shape.
+
+        ``explain`` is the detail level; explanations it leaves out are
+        never built.
+        """
+        left_out = _LEFT_OUT[explain]
+        result = {}
+        # Deferred values standing for several fields are built once
+        built: typing.Dict[int, typing.Dict[str, typing.Any]] = {}
+        extra = self._extra or {}
+        for key in self:
+            if key not in _FIELD_SET:
+                result[key] = extra[key]
+                continue
+            if key in left_out:
+                continue
+            value = getattr(self, key)
+            if isinstance(value, Deferred):
+                fields = built.get(id(value))
+                if fields is None:
+                    fields = built[id(value)] = value.fields()
+                value = fields[key]
+            result[key] = value
+        return result
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+def scoring_of(product: typing.Dict) -> typing.MutableMapping[str, typing.Any]:
+    """Return the scoring of a product, giving it an empty record if it has none."""
+    if "Scoring" not in product:
+        product["Scoring"] = ScoreRecord()
+    return product["Scoring"]
+
+
+def store(scoring: typing.MutableMapping[str, typing.Any], value: Deferred) -> None:
+    """Store deferred fields, built at once unless ``scoring`` is a record."""
+    if isinstance(scoring, ScoreRecord):
+        for key in value.KEYS:
+            setattr(scoring, key, value)
+    else:
+        scoring.update(value.fields())
+
+
+def plain(scoring: typing.Any) -> typing.Any:
+    """Return a scoring as plain dicts, e.g. to store or send it elsewhere."""
+    return scoring.to_dict() if isinstance(scoring, ScoreRecord) else scoring
+
+
+def explained(product: typing.Dict, explain: str = "full") -> typing.Dict:
+    """Return a product with only the explanations of detail level ``explain``.
+
+    The product is copied unless it is left as it is.
+    """
+    scoring = product.get("Scoring")
+    if scoring is None or explain == "full":
+        return product
+    if isinstance(scoring, ScoreRecord):
+        scoring = scoring.to_dict(explain)
+    else:
+        left_out = _LEFT_OUT[explain]
+        scoring = {k: v for k, v in scoring.items() if k not in left_out}
+    return {**product, "Scoring": scoring}
+
+
+def json_default(value: typing.Any) -> typing.Any:
+    """``default`` hook of ``json.dump`` that encodes score records."""
+    if isinstance(value, ScoreRecord):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,86 @@
+import heapq
+import itertools
+import time
+import typing
+
+if typing.TYPE_CHECKING:
+    import omegaconf
+
+
+def _rule_score(product: typing.Dict) -> float:
+    return product.get("Scoring", {}).get("rule_score", 0)
+
+
+class RerankBudget:
+    """Which rule-scored products get the expensive filters, and for how long.
+
+    Candidates are the ``candidates`` best products by rule score that are
+    within ``margin`` rule points of the best one (either may be None for
+    no limit), in rule-score order. They are handed out in batches of
+    ``batch_size`` until ``time_budget`` seconds have passed since
+    ``batches`` was called. Pipelines call it once per run, with every
+    rule-scored product of the run.
+    """
+
+    def __init__(
+        self,
+        candidates: typing.Optional[int] = None,
+        margin: typing.Optional[float] = None,
+        time_budget: typing.Optional[float] = None,
+        batch_size: int = 64,
+    ):
+        if candidates is not None and candidates < 0:
+            raise ValueError(f"candidates must not be negative, got {candidates}")
+        if margin is not None and margin < 0:
+            raise ValueError(f"margin must not be negative, got {margin}")
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be positive, got {batch_size}")
+
+        self.candidates = candidates
+        self.margin = margin
+        self.time_budget = time_budget
+        self.batch_size = batch_size
+
+    def select(self, products: typing.List[typing.Dict]) -> typing.List[typing.Dict]:
+        """Return the candidates among rule-scored products, best first."""
+        if self.candidates is None:
+            ordered = sorted(products, key=_rule_score, reverse=True)
+        else:
+            ordered = heapq.nlargest(self.candidates, products, key=_rule_score)
+
+        if self.margin is not None and ordered:
+            cutoff = _rule_score(ordered[0]) - self.margin
+            ordered = list(
+                itertools.takewhile(lambda p: _rule_score(p) >= cutoff, ordered)
+            )
+        return ordered
+
+    def batches(
+        self, products: typing.List[typing.Dict]
+    ) -> typing.Iterator[typing.List[typing.Dict]]:
+        """Yield the candidates in batches, best first, until the deadline."""
+        deadline = None
+        if self.time_budget is not None:
+            deadline = time.monotonic() + self.time_budget
+
+        candidates = self.select(products)
+        for start in range(0, len(candidates), self.batch_size):
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+            yield candidates[start : start + self.batch_size]
+
+    @classmethod
+    def from_config(
+        cls, config: "omegaconf.DictConfig"
+    ) -> typing.Optional["RerankBudget"]:
+        """Create the budget of a config's ``rerank`` section, None if it is unset."""
+        rerank = config.get("rerank") or {}
+        options = {
+            key: rerank.get(key)
+            for key in ("candidates", "margin", "time_budget")
+            if rerank.get(key) is not None
+        }
+        if not options:
+            return None
+        semantic_config = config.get("semantic") or {}
+        return cls(**options, batch_size=semantic_config.get("batch_size", 64))
@@ -0,0 +1,184 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import sqlite3
+import typing
+
+from stellarspider.core.config_snapshot import _package_fingerprint, default_cache_dir
+
+# Fields that scoring reads from a product; equal fields mean equal scores
+FINGERPRINT_FIELDS = ("URL", "Name", "CleanedText")
+
+# Config keys that change how a run reads, ranks or writes products but not
+# the score of any single product; dotted keys are nested ones. Rerank
+# budgets are among them since only completely scored products are stored
+RUN_OPTIONS = (
+    "input",
+    "input_format",
+    "input_workers",
+    "input_fields",
+    "output",
+    "stream",
+    "chunk_size",
+    "workers",
+    "top",
+    "min_score",
+    "categories",
+    "category_output",
+    "incremental",
+    "dedup",
+    "dedup_threshold",
+    "verbose",
+    "version",
+    "json_backend",
+    "rule_engine",
+    "rerank",
+    "cascade.rejected",
+    "semantic.cache_dir",
+)
+
+# Stay well below SQLite's limit on the number of query parameters
+_QUERY_BATCH = 500
+
+# Results stored per transaction; committing every chunk costs more than
+# storing its results
+_COMMIT_EVERY = 10000
+
+
+def _without(config: typing.Mapping, keys: typing.Iterable[str]) -> typing.Dict:
+    """Return a config without ``keys``, dotted ones naming nested keys."""
+    top = {key for key in keys if "." not in key}
+    nested: typing.Dict[str, typing.List[str]] = {}
+    for key in keys:
+        if "." in key:
+            section, rest = key.split(".", 1)
+            nested.setdefault(section, []).append(rest)
+
+    result = {}
+    for key, value in config.items():
+        if key in top:
+            continue
+        if key in nested and isinstance(value, typing.Mapping):
+            value = _without(value, nested[key])
+        result[key] = value
+    return result
+
+
+def config_hash(config: typing.Mapping) -> str:
+    """Return the hash of everything in a config that affects scores.
+
+    The package code is part of the hash, so changing the scoring code
+    invalidates stored scores just like editing the category YAML does.
+    """
+    if not isinstance(config, dict):
+        import omegaconf
+
+        config = omegaconf.OmegaConf.to_container(config, resolve=True)
+    scoring = _without(config, RUN_OPTIONS)
+    header = {"code": _package_fingerprint(), "config": scoring}
+    encoded = json.dumps(header, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def fingerprint(product: typing.Mapping) -> int:
+    """Return the 64-bit fingerprint of the fields of a product that are scored."""
+    fields = json.dumps([product.get(field) for field in FINGERPRINT_FIELDS])
+    digest = hashlib.blake2b(fields.encode("utf-8"), digest_size=8).digest()
+    # Signed, so it fits SQLite's integer primary key
+    return int.from_bytes(digest, "big", signed=True)
+
+
+class ScoreStore:
+    """SQLite store of the scoring results of products seen before.
+
+    Results are pickled and keyed by product fingerprint. The store
+    belongs to one config hash: opening it with another one, e.g. after
+    editing the category YAML, deletes every stored result. Results are
+    committed in large transactions; ``commit`` or ``close`` commit the rest.
+    """
+
+    def __init__(self, path: str, config_hash: str):
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+        self._uncommitted = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # The serve command scores in another thread than the one opening
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS scores "
+                "(fingerprint INTEGER PRIMARY KEY, result BLOB)"
+            )
+            row = self._db.execute(
+                "SELECT value FROM meta WHERE key = 'config_hash'"
+            ).fetchone()
+            if row is None or row[0] != config_hash:
+                if row is not None:
+                    self.logger.info(f"Config changed, clearing score store {path}")
+                self._db.execute("DELETE FROM scores")
+                self._db.execute(
+                    "INSERT OR REPLACE INTO meta VALUES ('config_hash', ?)",
+                    (config_hash,),
+                )
+
+    def get_many(
+        self, fingerprints: typing.Sequence[int]
+    ) -> typing.Dict[int, typing.Dict]:
+        """Return the stored results of the fingerprints that are present."""
+        found = {}
+        for start in range(0, len(fingerprints), _QUERY_BATCH):
+            batch = fingerprints[start : start + _QUERY_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._db.execute(
+                "SELECT fingerprint, result FROM scores "
+                f"WHERE fingerprint IN ({placeholders})",
+                batch,
+            )
+            for key, result in rows:
+                found[key] = pickle.loads(result)
+        return found
+
+    def put_many(
+        self, results: typing.Iterable[typing.Tuple[int, typing.Dict]]
+    ) -> None:
+        """Store the results of products by fingerprint."""
+        rows = [
+            (key, pickle.dumps(result, pickle.HIGHEST_PROTOCOL))
+            for key, result in results
+        ]
+        self._db.executemany("INSERT OR REPLACE INTO scores VALUES (?, ?)", rows)
+        self._uncommitted += len(rows)
+        if self._uncommitted >= _COMMIT_EVERY:
+            self.commit()
+
+    def commit(self) -> None:
+        """Commit the results stored since the last commit."""
+        self._db.commit()
+        self._uncommitted = 0
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+    def close(self) -> None:
+        """Commit the stored results and close the database."""
+        self.commit()
+        self._db.close()
+
+    @classmethod
+    def for_config(
+        cls, config: typing.Mapping, cache_dir: typing.Optional[str] = None
+    ) -> "ScoreStore":
+        """Open the store of a category config in the cache directory."""
+        category = config.get("category_name") or config.get("filter_type", "default")
+        path = os.path.join(
+            cache_dir or default_cache_dir(), "scores", f"{category}.db"
+        )
+        return cls(path, config_hash(config))
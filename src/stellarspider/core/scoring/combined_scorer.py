@@ -1,5 +1,7 @@
 import typing
 
+from stellarspider.core import records
+
 
 class CombinedScoreCalculator:
     """Combines rule-based and semantic scores following SRP."""
@@ -13,11 +15,10 @@ class CombinedScoreCalculator:
     ) -> typing.List[typing.Dict]:
         """Calculate weighted combined score."""
         for product in products:
-            if "Scoring" not in product:
-                product["Scoring"] = {}
+            scoring = records.scoring_of(product)
 
-            rule_score = product["Scoring"].get("rule_score", 0)
-            semantic_score = product["Scoring"].get("semantic_score", 0)
+            rule_score = scoring.get("rule_score", 0)
+            semantic_score = scoring.get("semantic_score", 0)
 
             # Normalize rule score to 0-1 range
             normalized_rule = min(rule_score / 20, 1.0) if rule_score > 0 else 0
@@ -26,11 +27,30 @@ class CombinedScoreCalculator:
                 semantic_score * self.semantic_weight
             )
 
-            product["Scoring"]["final_score"] = round(final_score, 2)
-            product["Scoring"]["weights"] = {
-                "rule_weight": self.rule_weight,
-                "semantic_weight": self.semantic_weight,
-                "normalized_rule_score": normalized_rule,
-            }
+            scoring["final_score"] = round(final_score, 2)
+            records.store(scoring, Weights(self, normalized_rule))
 
         return products
+
+
+class Weights(records.Deferred):
+    """Weights of a final score, with the calculator's weights not copied."""
+
+    __slots__ = ("calculator", "normalized_rule_score")
+
+    KEYS = ("weights",)
+
+    def __init__(
+        self, calculator: CombinedScoreCalculator, normalized_rule_score: float
+    ):
+        self.calculator = calculator
+        self.normalized_rule_score = normalized_rule_score
+
+    def fields(self) -> typing.Dict[str, typing.Any]:
+        return {
+            "weights": {
+                "rule_weight": self.calculator.rule_weight,
+                "semantic_weight": self.calculator.semantic_weight,
+                "normalized_rule_score": self.normalized_rule_score,
+            }
+        }
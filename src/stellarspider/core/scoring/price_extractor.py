@@ -2,87 +2,127 @@ import re
 import typing
 
 
+class PriceDetails(typing.NamedTuple):
+    """Price and unit information extracted from one product."""
+
+    price: typing.Optional[float]
+    price_per_oz: typing.Optional[float]
+    price_per_lb: typing.Optional[float]
+    weight_oz: typing.Optional[float]
+
+
+# Every stage lists its patterns in the order it tries them, each with a
+# literal that all of its matches contain, so texts without that literal skip
+# the regex. A pattern with two groups holds a price written as "$10 . 99".
+_PRICE_PATTERNS = (
+    ("$", re.compile(r"\$\s*(\d+\.\d{2})", re.IGNORECASE)),  # $10.99
+    ("$", re.compile(r"\$\s*(\d+)\s*\.\s*(\d{2})", re.IGNORECASE)),  # $10 . 99
+    # "price: $10.99" is always caught by the first pattern, so it needs none
+    ("", re.compile(r"(\d+\.\d{2})\s*/\s*ea", re.IGNORECASE)),  # 10.99 / ea
+)
+
+_PER_OZ_PATTERNS = (
+    ("oz", re.compile(r"\$\s*(\d+\.\d{2})/oz")),
+    ("oz", re.compile(r"\$\s*(\d+\.\d{2})\s*/\s*oz")),
+    ("ounce", re.compile(r"\(\$\s*(\d+\.\d{2})/ounce\)")),
+    ("ounce", re.compile(r"\(\$\s*(\d+\.\d{2})\s*/\s*ounce\)")),
+    ("oz", re.compile(r"(\d+\.\d{2})\s*/\s*oz")),
+)
+
+_PER_LB_PATTERNS = (
+    ("lb", re.compile(r"\$(\d+\.\d{2})/lb")),
+    ("lb", re.compile(r"\$(\d+\.\d{2})\s*/\s*lb")),
+    ("lb", re.compile(r"\$\s*(\d+\.\d{2})\s*/\s*lb")),
+    ("lb", re.compile(r"\$\s*(\d+)\s*\.\s*(\d{2})\s*/\s*lb")),
+    ("lb", re.compile(r"(\d+\.\d{2})\s*/\s*lb")),
+    # "price: $10.99 per pound" is always caught by this pattern first
+    ("pound", re.compile(r"\$(\d+\.\d{2})\s*per\s*pound")),
+)
+
+# Weight patterns with the number of ounces in their unit
+_WEIGHT_PATTERNS = (
+    ("oz", re.compile(r"(\d+(?:\.\d+)?)\s*oz"), 1),
+    ("ounce", re.compile(r"(\d+(?:\.\d+)?)\s*ounce"), 1),
+    ("lb", re.compile(r"(\d+(?:\.\d+)?)\s*lb"), 16),
+    ("pound", re.compile(r"(\d+(?:\.\d+)?)\s*pound"), 16),
+)
+
+
+def _first_match(
+    patterns: typing.Iterable[typing.Tuple], text: str, pos: int = 0
+) -> typing.Optional[typing.Tuple[re.Match, typing.Tuple]]:
+    """Return the leftmost match of the first pattern that matches at all."""
+    for entry in patterns:
+        literal, pattern = entry[0], entry[1]
+        if literal not in text:
+            continue
+        match = pattern.search(text, pos)
+        if match is not None:
+            return match, entry
+    return None
+
+
+def _match_value(match: re.Match) -> float:
+    """Return the amount captured by a price pattern."""
+    if match.lastindex == 2:
+        return float(f"{match.group(1)}.{match.group(2)}")
+    return float(match.group(1))
+
+
 class PriceExtractor:
     """Handles price extraction and per-unit calculations following SRP."""
 
+    def _details(
+        self, combined_text: str, price: typing.Optional[float]
+    ) -> PriceDetails:
+        """Derive per-unit prices and weight from lowercased name and text."""
+        per_lb = _first_match(_PER_LB_PATTERNS, combined_text)
+        price_per_lb = _match_value(per_lb[0]) if per_lb else None
+
+        weight = _first_match(_WEIGHT_PATTERNS, combined_text)
+        weight_oz = None
+        if weight:
+            match, (_, _, ounces_per_unit) = weight
+            weight_oz = float(match.group(1)) * ounces_per_unit
+
+        # Direct price per ounce, then price per pound, then price by weight
+        per_oz = _first_match(_PER_OZ_PATTERNS, combined_text)
+        if per_oz:
+            price_per_oz = _match_value(per_oz[0])
+        elif price_per_lb is not None:
+            price_per_oz = round(price_per_lb / 16, 2)
+        elif price and weight_oz is not None:
+            price_per_oz = round(price / weight_oz, 2)
+        else:
+            price_per_oz = None
+
+        return PriceDetails(price, price_per_oz, price_per_lb, weight_oz)
+
+    def extract_from_text(self, combined_text: str, text_offset: int) -> PriceDetails:
+        """Extract all price details from lowercased ``"{name} {text}"``.
+
+        ``text_offset`` is where the product text starts; like
+        ``extract_price``, the base price is only read from the product text.
+        """
+        price_match = _first_match(_PRICE_PATTERNS, combined_text, text_offset)
+        price = _match_value(price_match[0]) if price_match else None
+        return self._details(combined_text, price)
+
+    def extract(self, product: typing.Dict) -> PriceDetails:
+        """Extract price, per-unit prices and weight together."""
+        name = product.get("Name", "").lower()
+        text = product.get("CleanedText", "").lower()
+        return self.extract_from_text(f"{name} {text}", len(name) + 1)
+
     def extract_price(self, text: str) -> typing.Optional[float]:
         """Extract price from product text."""
-        price_patterns = [
-            r"\$\s*(\d+\.\d{2})",  # $10.99
-            r"\$\s*(\d+)\s*\.\s*(\d{2})",  # $10 . 99
-            r"price:\s*\$\s*(\d+\.\d{2})",  # price: $10.99
-            r"(\d+\.\d{2})\s*/\s*ea",  # 10.99 / ea
-        ]
-
-        for pattern in price_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            if matches:
-                if isinstance(matches[0], tuple):
-                    return float(f"{matches[0][0]}.{matches[0][1]}")
-                else:
-                    return float(matches[0])
-        return None
+        price_match = _first_match(_PRICE_PATTERNS, text)
+        return _match_value(price_match[0]) if price_match else None
 
     def calculate_price_per_oz(
         self, product: typing.Dict, price: typing.Optional[float]
     ) -> typing.Optional[float]:
         """Calculate price per ounce for comparison."""
-        text = product.get("CleanedText", "").lower()
         name = product.get("Name", "").lower()
-        combined = f"{name} {text}"
-
-        # Direct price per ounce patterns
-        price_per_oz_patterns = [
-            r"\$\s*(\d+\.\d{2})/oz",
-            r"\$\s*(\d+\.\d{2})\s*/\s*oz",
-            r"\(\$\s*(\d+\.\d{2})/ounce\)",
-            r"\(\$\s*(\d+\.\d{2})\s*/\s*ounce\)",
-            r"(\d+\.\d{2})\s*/\s*oz",
-            r"\$\s*(\d+\.\d{2})\s*/\s*oz",
-        ]
-
-        for pattern in price_per_oz_patterns:
-            matches = re.findall(pattern, combined)
-            if matches:
-                return float(matches[0])
-
-        # Price per pound patterns (convert to per ounce)
-        price_per_lb_patterns = [
-            r"\$(\d+\.\d{2})/lb",
-            r"\$(\d+\.\d{2})\s*/\s*lb",
-            r"\$\s*(\d+\.\d{2})\s*/\s*lb",
-            r"\$\s*(\d+)\s*\.\s*(\d{2})\s*/\s*lb",
-            r"(\d+\.\d{2})\s*/\s*lb",
-            r"\$(\d+\.\d{2})\s*per\s*pound",
-            r"price:\s*\$(\d+\.\d{2})\s*per\s*pound",
-        ]
-
-        for pattern in price_per_lb_patterns:
-            matches = re.findall(pattern, combined)
-            if matches:
-                if isinstance(matches[0], tuple):
-                    price_per_lb = float(f"{matches[0][0]}.{matches[0][1]}")
-                else:
-                    price_per_lb = float(matches[0])
-                return round(price_per_lb / 16, 2)
-
-        # Calculate from base price and weight
-        if not price:
-            return None
-
-        weight_patterns = [
-            r"(\d+(?:\.\d+)?)\s*oz",
-            r"(\d+(?:\.\d+)?)\s*ounce",
-            r"(\d+(?:\.\d+)?)\s*lb",
-            r"(\d+(?:\.\d+)?)\s*pound",
-        ]
-
-        for pattern in weight_patterns:
-            matches = re.findall(pattern, combined)
-            if matches:
-                weight = float(matches[0])
-                if "lb" in pattern or "pound" in pattern:
-                    weight *= 16  # Convert pounds to ounces
-                return round(price / weight, 2)
-
-        return None
+        text = product.get("CleanedText", "").lower()
+        return self._details(f"{name} {text}", price).price_per_oz
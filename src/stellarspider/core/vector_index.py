@@ -0,0 +1,323 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import typing
+
+import numpy as np
+
+from stellarspider.core.embeddings import EmbeddingBackend
+from stellarspider.core.filters.semantic import SemanticFilter
+from stellarspider.core.pipeline import _chunks
+
+FORMAT_VERSION = 1
+
+# Product fields stored with each vector and returned by queries
+INDEX_FIELDS = ("Name", "URL", "Category")
+
+# Catalogs smaller than this are searched exhaustively
+MIN_IVF_SIZE = 10_000
+
+# Rows read at once while assigning vectors to lists
+_ASSIGN_CHUNK = 65_536
+
+
+def default_lists(count: int) -> int:
+    """Return the number of inverted lists for a catalog of ``count`` vectors."""
+    if count < MIN_IVF_SIZE:
+        return 0
+    return min(int(4 * count**0.5), 65_536)
+
+
+def _url_key(url: str) -> int:
+    return int.from_bytes(hashlib.sha256(url.encode("utf-8")).digest()[:8], "little")
+
+
+class SearchResult(typing.NamedTuple):
+    """One product found by a query, with its cosine similarity."""
+
+    row: int
+    similarity: float
+    product: typing.Dict[str, typing.Any]
+
+
+class VectorIndex:
+    """On-disk nearest-neighbour index of product embeddings.
+
+    An index is a directory holding ``meta.json``, the unit vectors of all
+    products as raw float32 rows (``vectors.f32``, memory-mapped) and the
+    ``INDEX_FIELDS`` of each product as NDJSON with their byte offsets.
+    Large catalogs are split into inverted lists around k-means centroids
+    (IVF): a query only compares against the vectors of the ``nprobe``
+    lists whose centroids are closest to it. Small ones are searched
+    exhaustively. Products can be looked up by URL through a sorted array
+    of URL digests.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+
+        try:
+            with open(self._file("meta.json"), encoding="utf-8") as f:
+                self.meta = json.load(f)
+        except FileNotFoundError:
+            raise ValueError(f"No vector index at {path}") from None
+        if self.meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported vector index version at {path}")
+
+        self.model_id: str = self.meta["model_id"]
+        self.count: int = self.meta["count"]
+        self.dim: int = self.meta["dim"]
+
+        self.vectors = (
+            np.memmap(
+                self._file("vectors.f32"),
+                dtype=np.float32,
+                mode="r",
+                shape=(self.count, self.dim),
+            )
+            if self.count
+            else np.zeros((0, self.dim), dtype=np.float32)
+        )
+        self.offsets = np.load(self._file("offsets.npy"), mmap_mode="r")
+        self.url_keys = np.load(self._file("url_keys.npy"), mmap_mode="r")
+        self.url_rows = np.load(self._file("url_rows.npy"), mmap_mode="r")
+
+        self.centroids = None
+        if self.meta["lists"]:
+            self.centroids = np.load(self._file("centroids.npy"))
+            self.list_rows = np.load(self._file("list_rows.npy"), mmap_mode="r")
+            self.list_offsets = np.load(self._file("list_offsets.npy"))
+
+        self._items = open(self._file("items.ndjson"), "rb")
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def close(self) -> None:
+        self._items.close()
+
+    def __enter__(self) -> "VectorIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def product(self, row: int) -> typing.Dict[str, typing.Any]:
+        """Return the stored fields of the product in ``row``."""
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        self._items.seek(start)
+        return json.loads(self._items.read(end - start))
+
+    def find_url(self, url: str) -> typing.Optional[int]:
+        """Return the row of the first product with ``url``, or None."""
+        key = np.uint64(_url_key(url))
+        i = int(np.searchsorted(self.url_keys, key))
+        while i < len(self.url_keys) and self.url_keys[i] == key:
+            row = int(self.url_rows[i])
+            if self.product(row).get("URL") == url:
+                return row
+            i += 1
+        return None
+
+    def _candidates(
+        self, query: np.ndarray, nprobe: int
+    ) -> typing.Optional[np.ndarray]:
+        """Return the rows of the ``nprobe`` lists closest to the query."""
+        if self.centroids is None:
+            return None
+        nprobe = min(nprobe, len(self.centroids))
+        closest = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        rows = np.concatenate(
+            [
+                self.list_rows[self.list_offsets[i] : self.list_offsets[i + 1]]
+                for i in closest
+            ]
+        )
+        # Rows in file order read the memory-mapped vectors front to back
+        rows.sort()
+        return rows
+
+    def search(
+        self,
+        vector: np.ndarray,
+        k: int = 10,
+        nprobe: int = 32,
+        exclude: typing.Collection[int] = (),
+    ) -> typing.List[SearchResult]:
+        """Return the ``k`` products most similar to ``vector``, best first."""
+        query = np.asarray(vector, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+
+        rows = self._candidates(query, nprobe)
+        if rows is None:
+            similarities = self.vectors @ query
+            rows = np.arange(self.count)
+        else:
+            similarities = self.vectors[rows] @ query
+
+        if exclude:
+            keep = ~np.isin(rows, list(exclude))
+            rows, similarities = rows[keep], similarities[keep]
+
+        k = min(k, len(rows))
+        if k <= 0:
+            return []
+        best = np.argpartition(-similarities, k - 1)[:k]
+        best = best[np.argsort(-similarities[best], kind="stable")]
+        return [
+            SearchResult(
+                int(rows[i]), float(similarities[i]), self.product(int(rows[i]))
+            )
+            for i in best
+        ]
+
+    def search_text(
+        self, backend: EmbeddingBackend, text: str, k: int = 10, nprobe: int = 32
+    ) -> typing.List[SearchResult]:
+        """Return the ``k`` products most similar to a text, e.g. a concept."""
+        if backend.model_id != self.model_id:
+            self.logger.warning(
+                f"Index was built with {self.model_id}, querying with "
+                f"{backend.model_id}"
+            )
+        return self.search(backend.encode([text])[0], k, nprobe)
+
+    def search_like(
+        self, url: str, k: int = 10, nprobe: int = 32
+    ) -> typing.List[SearchResult]:
+        """Return the ``k`` products most similar to the stored one at ``url``."""
+        row = self.find_url(url)
+        if row is None:
+            raise KeyError(url)
+        return self.search(self.vectors[row], k, nprobe, exclude=(row,))
+
+    @classmethod
+    def build(
+        cls,
+        path: str,
+        backend: EmbeddingBackend,
+        products: typing.Iterable[typing.Dict],
+        lists: typing.Optional[int] = None,
+        chunk_size: int = 1000,
+        batch_size: int = 32,
+        seed: int = 0,
+    ) -> "VectorIndex":
+        """Embed products chunk by chunk and write an index of them to ``path``.
+
+        ``lists`` is the number of inverted lists (0 searches exhaustively;
+        None picks one from the catalog size). The index is written next to
+        ``path`` and moved into place when complete, replacing an older
+        index there.
+        """
+        logger = logging.getLogger(__name__)
+        meta_path = os.path.join(path, "meta.json")
+        if os.path.exists(path) and not os.path.exists(meta_path):
+            if not os.path.isdir(path) or os.listdir(path):
+                raise ValueError(f"{path} exists and is not a vector index")
+
+        staging = f"{path}.building"
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+
+        def staged(name: str) -> str:
+            return os.path.join(staging, name)
+
+        count, dim = 0, None
+        offsets = [0]
+        url_keys: typing.List[int] = []
+        url_rows: typing.List[int] = []
+        with (
+            open(staged("vectors.f32"), "wb") as vectors_file,
+            open(staged("items.ndjson"), "wb") as items_file,
+        ):
+            for chunk in _chunks(products, chunk_size):
+                texts = [SemanticFilter.product_text(product) for product in chunk]
+                vectors = np.ascontiguousarray(
+                    backend.encode(texts, batch_size), dtype=np.float32
+                )
+                dim = vectors.shape[1]
+                vectors_file.write(vectors.tobytes())
+
+                for product in chunk:
+                    item = {f: product[f] for f in INDEX_FIELDS if f in product}
+                    line = json.dumps(item, ensure_ascii=False).encode("utf-8") + b"\n"
+                    items_file.write(line)
+                    offsets.append(offsets[-1] + len(line))
+                    if item.get("URL"):
+                        url_keys.append(_url_key(item["URL"]))
+                        url_rows.append(count)
+                    count += 1
+                logger.info(f"Embedded {count} products")
+
+        if dim is None:
+            dim = backend.encode([""], batch_size).shape[1]
+
+        np.save(staged("offsets.npy"), np.array(offsets, dtype=np.int64))
+        keys = np.array(url_keys, dtype=np.uint64)
+        order = np.argsort(keys, kind="stable")
+        np.save(staged("url_keys.npy"), keys[order])
+        np.save(staged("url_rows.npy"), np.array(url_rows, dtype=np.int64)[order])
+
+        if lists is None:
+            lists = default_lists(count)
+        lists = min(lists, count)
+        if lists:
+            vectors = np.memmap(
+                staged("vectors.f32"), dtype=np.float32, mode="r", shape=(count, dim)
+            )
+            _build_lists(staging, vectors, lists, seed)
+            del vectors
+
+        with open(staged("meta.json"), "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": FORMAT_VERSION,
+                    "model_id": backend.model_id,
+                    "count": count,
+                    "dim": dim,
+                    "lists": lists,
+                },
+                f,
+            )
+
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(staging, path)
+        logger.info(f"Indexed {count} products in {lists or 'no'} lists at {path}")
+        return cls(path)
+
+
+def _build_lists(path: str, vectors: np.ndarray, lists: int, seed: int) -> None:
+    """Train centroids on a sample and write the inverted lists of all rows."""
+    # Imported here so querying an index never loads scikit-learn
+    from sklearn.cluster import MiniBatchKMeans
+
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(vectors), max(lists * 64, 100_000))
+    sample = np.sort(rng.choice(len(vectors), sample_size, replace=False))
+
+    kmeans = MiniBatchKMeans(
+        n_clusters=lists, random_state=seed, n_init=1, batch_size=4096
+    )
+    kmeans.fit(np.asarray(vectors[sample]))
+    # Vectors are unit rows: closest by dot product means closest by angle
+    centroids = kmeans.cluster_centers_.astype(np.float32)
+    norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+    centroids /= np.where(norms == 0, 1, norms)
+
+    assignments = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), _ASSIGN_CHUNK):
+        block = np.asarray(vectors[start : start + _ASSIGN_CHUNK])
+        assignments[start : start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+
+    list_rows = np.argsort(assignments, kind="stable").astype(np.int64)
+    list_offsets = np.zeros(lists + 1, dtype=np.int64)
+    np.cumsum(np.bincount(assignments, minlength=lists), out=list_offsets[1:])
+
+    np.save(os.path.join(path, "centroids.npy"), centroids)
+    np.save(os.path.join(path, "list_rows.npy"), list_rows)
+    np.save(os.path.join(path, "list_offsets.npy"), list_offsets)
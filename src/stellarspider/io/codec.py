@@ -0,0 +1,188 @@
+import functools
+import json
+import typing
+
+from stellarspider.core.records import json_default
+
+JSON_BACKENDS = ("auto", "orjson", "msgspec", "json")
+
+# Fields of a product that scoring reads, kept by --input-fields without a list
+PRODUCT_FIELDS = ("Name", "Category", "URL", "CleanedText")
+
+_COMPACT_SEPARATORS = (",", ":")
+
+
+def _installed(backend: str) -> bool:
+    try:
+        __import__(backend)
+    except ImportError:
+        return False
+    return True
+
+
+def resolve_backend(backend: str = "auto") -> str:
+    """Return the backend to use: ``auto`` picks ``msgspec`` if installed."""
+    if backend == "auto":
+        # orjson is left out: it decodes integers wider than 64 bits as floats
+        return "msgspec" if _installed("msgspec") else "json"
+    if backend not in JSON_BACKENDS:
+        raise ValueError(f"Unknown JSON backend: {backend}")
+    if backend != "json" and not _installed(backend):
+        raise ValueError(f"JSON backend {backend} is not installed")
+    return backend
+
+
+@functools.lru_cache(maxsize=None)
+def _msgspec_product_decoders(fields: typing.Tuple[str, ...]) -> typing.Tuple:
+    """Return msgspec decoders of one product and of an array of products.
+
+    Products decode into a struct of the projected fields only, so other
+    fields are skipped without being materialized.
+    """
+    import msgspec
+
+    product_type = msgspec.defstruct(
+        "Product",
+        [(field, typing.Any, msgspec.UNSET) for field in fields],
+        forbid_unknown_fields=False,
+    )
+    return (
+        msgspec.json.Decoder(product_type),
+        msgspec.json.Decoder(typing.List[product_type]),
+    )
+
+
+class JsonCodec:
+    """Decodes input and encodes output JSON with a pluggable backend.
+
+    With ``auto``, input is decoded with ``msgspec`` when installed, but
+    output is encoded by the standard library, so it stays byte for byte the
+    same whatever is installed. ``orjson`` is only used when named, as it
+    decodes integers wider than 64 bits as floats. Naming ``orjson`` or
+    ``msgspec`` encodes with them too: the same JSON, but not the same
+    bytes, as non-ASCII text is written as UTF-8 rather than escaped, and
+    floats may use another exponent notation. Pretty-printing other than
+    ``orjson``'s two-space indent goes through the standard library.
+
+    Input a fast backend rejects is decoded again by the standard library,
+    so what ``json`` accepts beyond strict JSON, e.g. ``NaN``, ``Infinity``
+    or unpaired surrogates, reads the same with every backend.
+
+    With ``fields``, decoded products keep only those fields, in that order;
+    ``msgspec`` skips the others without materializing them.
+    """
+
+    def __init__(
+        self,
+        backend: str = "auto",
+        fields: typing.Optional[typing.Sequence[str]] = None,
+    ):
+        self.backend = resolve_backend(backend)
+        # Only a backend picked by name may change the bytes written
+        self.encoder = "json" if backend == "auto" else self.backend
+        self.fields = tuple(fields) if fields else None
+
+    @classmethod
+    def from_config(cls, config: typing.Mapping) -> "JsonCodec":
+        """Create the codec of a config's ``json_backend`` and ``input_fields``."""
+        return cls(config.get("json_backend", "auto"), config.get("input_fields"))
+
+    def _project(self, value: typing.Any) -> typing.Any:
+        if self.fields is None or not isinstance(value, dict):
+            return value
+        return {field: value[field] for field in self.fields if field in value}
+
+    def _from_struct(self, product: typing.Any) -> typing.Dict:
+        import msgspec
+
+        return {
+            field: value
+            for field in self.fields
+            if (value := getattr(product, field)) is not msgspec.UNSET
+        }
+
+    def decode(self, data: typing.Union[bytes, str]) -> typing.Any:
+        """Decode a JSON document.
+
+        Raises ``json.JSONDecodeError`` for invalid JSON with every backend.
+        """
+        if self.backend == "orjson":
+            import orjson
+
+            try:
+                return orjson.loads(data)
+            except orjson.JSONDecodeError:
+                pass
+        elif self.backend == "msgspec":
+            import msgspec
+
+            try:
+                return msgspec.json.decode(data)
+            except msgspec.DecodeError:
+                pass
+        # Also what the standard library accepts beyond strict JSON
+        return json.loads(data)
+
+    def decode_products(self, data: typing.Union[bytes, str]) -> typing.Any:
+        """Decode a JSON array of products, projected to ``fields``.
+
+        Anything other than an array of objects is returned as decoded, for
+        the caller to reject.
+        """
+        if self.backend == "msgspec" and self.fields is not None:
+            import msgspec
+
+            try:
+                products = _msgspec_product_decoders(self.fields)[1].decode(data)
+                return [self._from_struct(product) for product in products]
+            except msgspec.DecodeError:
+                # Not an array of objects, or not strict JSON: decoded again
+                pass
+        decoded = self.decode(data)
+        if self.fields is None or not isinstance(decoded, list):
+            return decoded
+        return [self._project(product) for product in decoded]
+
+    def decode_product(self, data: typing.Union[bytes, str]) -> typing.Any:
+        """Decode one product, e.g. an NDJSON line, projected to ``fields``."""
+        if self.backend == "msgspec" and self.fields is not None:
+            import msgspec
+
+            try:
+                product = _msgspec_product_decoders(self.fields)[0].decode(data)
+                return self._from_struct(product)
+            except msgspec.DecodeError:
+                pass
+        return self._project(self.decode(data))
+
+    def encode(
+        self,
+        value: typing.Any,
+        indent: typing.Optional[int] = None,
+        compact: bool = False,
+    ) -> str:
+        """Encode a value, with score records built into plain JSON.
+
+        ``compact`` leaves out the spaces after separators, and ``indent``
+        with it.
+        """
+        if compact:
+            indent = None
+        if self.encoder == "orjson" and (compact or indent == 2):
+            import orjson
+
+            option = orjson.OPT_INDENT_2 if indent == 2 else 0
+            return orjson.dumps(value, default=json_default, option=option).decode()
+        if self.encoder == "msgspec" and (compact or indent is not None):
+            import msgspec
+
+            encoded = msgspec.json.encode(value, enc_hook=json_default)
+            if indent is not None:
+                encoded = msgspec.json.format(encoded, indent=indent)
+            return encoded.decode()
+        return json.dumps(
+            value,
+            indent=indent,
+            separators=_COMPACT_SEPARATORS if compact else None,
+            default=json_default,
+        )
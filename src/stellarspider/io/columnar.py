@@ -0,0 +1,196 @@
+import abc
+import csv
+import typing
+
+from stellarspider.core.records import ScoreRecord
+
+# Columns of the columnar formats and their types: product fields, then the
+# main scoring fields flattened out of Scoring
+COLUMNS = (
+    ("Name", "string"),
+    ("URL", "string"),
+    ("Category", "string"),
+    ("final_score", "float"),
+    ("rule_score", "float"),
+    ("semantic_score", "float"),
+    ("extracted_price", "float"),
+    ("price_per_oz", "float"),
+    ("ocean_origin", "string"),
+    ("scored_category", "string"),
+)
+COLUMN_NAMES = tuple(name for name, _ in COLUMNS)
+
+DELIMITERS = {"csv": ",", "tsv": "\t"}
+ARROW_FORMATS = ("arrow", "parquet")
+COLUMNAR_FORMATS = tuple(DELIMITERS) + ARROW_FORMATS
+
+
+def _ocean_origin(scoring: typing.Mapping) -> typing.Optional[str]:
+    """Return the primary ocean origin of a scoring, if it has one.
+
+    A deferred rule explanation gives it without building the breakdown.
+    """
+    if isinstance(scoring, ScoreRecord):
+        explanation = scoring.stored("rule_breakdown")
+        if hasattr(explanation, "primary_origin"):
+            return explanation.primary_origin()
+    breakdown = scoring.get("rule_breakdown") or {}
+    return (breakdown.get("ocean_origin") or {}).get("primary_origin")
+
+
+def _float(value: typing.Any) -> typing.Optional[float]:
+    return None if value is None else float(value)
+
+
+def row(product: typing.Dict) -> typing.Tuple:
+    """Return a product's values of ``COLUMNS``; missing ones are None."""
+    scoring = product.get("Scoring") or {}
+    return (
+        product.get("Name"),
+        product.get("URL"),
+        product.get("Category"),
+        _float(scoring.get("final_score")),
+        _float(scoring.get("rule_score")),
+        _float(scoring.get("semantic_score")),
+        _float(scoring.get("extracted_price")),
+        _float(scoring.get("price_per_oz")),
+        _ocean_origin(scoring),
+        scoring.get("category"),
+    )
+
+
+class ColumnarWriter(abc.ABC):
+    """Writes products as rows of ``COLUMNS`` in batches of ``batch_size``.
+
+    Products are turned into rows as they arrive and written a batch at a
+    time, so a stream is written while it is scored and only one batch is
+    held in memory.
+    """
+
+    def __init__(self, stream: typing.BinaryIO, batch_size: int = 10000):
+        self.stream = stream
+        self.batch_size = batch_size
+        self.count = 0
+        self._rows: typing.List[typing.Tuple] = []
+
+    def write(self, products: typing.Iterable[typing.Dict]) -> int:
+        """Write products, returning the number written so far."""
+        for product in products:
+            self._rows.append(row(product))
+            if len(self._rows) >= self.batch_size:
+                self.flush()
+        return self.count
+
+    def flush(self) -> None:
+        """Write the batched rows."""
+        if self._rows:
+            self._write_batch(self._rows)
+            self.count += len(self._rows)
+            self._rows = []
+
+    def close(self) -> None:
+        """Write the remaining rows and finish the output."""
+        self.flush()
+
+    @abc.abstractmethod
+    def _write_batch(self, rows: typing.List[typing.Tuple]) -> None:
+        """Write one batch of rows to the output."""
+
+    def __enter__(self) -> "ColumnarWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+class DelimitedWriter(ColumnarWriter):
+    """Writes CSV or TSV with a header row; missing values are empty."""
+
+    def __init__(
+        self,
+        stream: typing.BinaryIO,
+        batch_size: int = 10000,
+        delimiter: str = ",",
+    ):
+        super().__init__(stream, batch_size)
+        self._text = _TextSink(stream)
+        self._writer = csv.writer(self._text, delimiter=delimiter, lineterminator="\n")
+        self._writer.writerow(COLUMN_NAMES)
+
+    def _write_batch(self, rows: typing.List[typing.Tuple]) -> None:
+        self._writer.writerows(rows)
+        self._text.flush()
+
+
+class _TextSink:
+    """Text file interface that buffers and writes UTF-8 to a binary stream."""
+
+    def __init__(self, stream: typing.BinaryIO):
+        self.stream = stream
+        self._parts: typing.List[str] = []
+
+    def write(self, text: str) -> None:
+        self._parts.append(text)
+
+    def flush(self) -> None:
+        self.stream.write("".join(self._parts).encode("utf-8"))
+        self.stream.flush()
+        self._parts = []
+
+
+class ArrowWriter(ColumnarWriter):
+    """Writes an Arrow IPC stream or a Parquet file, a record batch per batch.
+
+    Needs pyarrow, imported only when one of these formats is written.
+    """
+
+    def __init__(
+        self,
+        stream: typing.BinaryIO,
+        batch_size: int = 10000,
+        output_format: str = "parquet",
+    ):
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ValueError(
+                f"Output format {output_format} needs pyarrow "
+                "(pip install 'stellarspider[arrow]')"
+            ) from None
+
+        super().__init__(stream, batch_size)
+        types = {"string": pa.string(), "float": pa.float64()}
+        self.schema = pa.schema([(name, types[kind]) for name, kind in COLUMNS])
+        sink = pa.PythonFile(stream, mode="w")
+        if output_format == "parquet":
+            import pyarrow.parquet as pq
+
+            self._writer = pq.ParquetWriter(sink, self.schema)
+        elif output_format == "arrow":
+            self._writer = pa.ipc.new_stream(sink, self.schema)
+        else:
+            raise ValueError(f"Unsupported Arrow format: {output_format}")
+
+    def _write_batch(self, rows: typing.List[typing.Tuple]) -> None:
+        import pyarrow as pa
+
+        columns = [list(column) for column in zip(*rows)]
+        self._writer.write_batch(
+            pa.RecordBatch.from_arrays(columns, schema=self.schema)
+        )
+
+    def close(self) -> None:
+        super().close()
+        self._writer.close()
+        self.stream.flush()
+
+
+def create_writer(
+    output_format: str, stream: typing.BinaryIO, batch_size: int = 10000
+) -> ColumnarWriter:
+    """Create the writer of a columnar output format."""
+    if output_format in DELIMITERS:
+        return DelimitedWriter(stream, batch_size, DELIMITERS[output_format])
+    if output_format in ARROW_FORMATS:
+        return ArrowWriter(stream, batch_size, output_format)
+    raise ValueError(f"Unsupported columnar format: {output_format}")
@@ -1,38 +1,237 @@
+import collections
+import concurrent.futures
+import contextlib
+import errno
+import glob
+import itertools
 import json
 import logging
 import sys
 import typing
 
+from stellarspider.core import instrumentation
+from stellarspider.io import json_array
+from stellarspider.io.codec import JsonCodec
+
+if typing.TYPE_CHECKING:
+    import omegaconf
+
+INPUT_FORMATS = ("json", "ndjson")
+
+# Field naming the file each product was read from, set when the input is
+# several files or a glob
+SOURCE_FIELD = "Source"
+
+# An input source: stdin (None or "-"), a path or glob, or several of them
+InputSource = typing.Union[None, str, typing.Sequence[str]]
+
+
+def _is_glob(path: str) -> bool:
+    return any(char in path for char in "*?[")
+
 
 class DataLoader:
     """Handles loading data from various sources following SRP."""
 
-    def __init__(self):
+    def __init__(self, codec: typing.Optional[JsonCodec] = None, workers: int = 8):
+        self.codec = codec or JsonCodec("json")
+        # Threads reading and decoding files when the input is several files
+        self.workers = max(workers, 1)
         self.logger = logging.getLogger(__name__)
 
-    def load(self, input_source: typing.Optional[str]) -> typing.List[typing.Dict]:
-        """Load data from file or stdin."""
+    @classmethod
+    def from_config(cls, config: "omegaconf.DictConfig") -> "DataLoader":
+        """Create the loader of a config's codec and ``input_workers``."""
+        return cls(JsonCodec.from_config(config), config.get("input_workers", 8))
+
+    def _files(self, input_source: InputSource) -> typing.Optional[typing.List[str]]:
+        """Return the files of a multi-file input, or None for a single source.
+
+        Globs are expanded in sorted order; one that matches nothing raises
+        FileNotFoundError like a missing file would.
+        """
+        if input_source is None or isinstance(input_source, str):
+            sources = [input_source]
+        else:
+            sources = list(input_source)
+        if len(sources) == 1 and not (sources[0] and _is_glob(sources[0])):
+            return None
+
+        files = []
+        for source in sources:
+            if source in (None, "-"):
+                raise ValueError("stdin cannot be read together with files")
+            if not _is_glob(source):
+                files.append(source)
+                continue
+            matches = sorted(glob.glob(source, recursive=True))
+            if not matches:
+                raise FileNotFoundError(errno.ENOENT, "No input files match", source)
+            files.extend(matches)
+        return files
+
+    @staticmethod
+    def _single(input_source: InputSource) -> typing.Optional[str]:
+        if input_source is None or isinstance(input_source, str):
+            return input_source
+        return input_source[0]
+
+    @contextlib.contextmanager
+    def _open(
+        self, input_source: typing.Optional[str]
+    ) -> typing.Iterator[typing.BinaryIO]:
+        """Open the input file, or stdin for None and "-", as bytes."""
+        if input_source is None or input_source == "-":
+            self.logger.debug("Reading from stdin")
+            yield sys.stdin.buffer
+        else:
+            self.logger.debug(f"Reading from file: {input_source}")
+            with open(input_source, "rb") as f:
+                yield f
+
+    def load(
+        self, input_source: InputSource, input_format: str = "json"
+    ) -> typing.List[typing.Dict]:
+        """Load data from file, files or stdin."""
         try:
-            if input_source is None or input_source == "-":
-                self.logger.debug("Reading from stdin")
-                data = json.load(sys.stdin)
-            else:
-                self.logger.debug(f"Reading from file: {input_source}")
-                with open(input_source, "r", encoding="utf-8") as f:
-                    data = json.load(f)
+            with instrumentation.stage("load"):
+                files = self._files(input_source)
+                if files is not None:
+                    data = list(self._read_files(files, input_format))
+                elif input_format == "ndjson":
+                    data = list(self.stream(input_source, input_format))
+                elif input_format == "json":
+                    with self._open(self._single(input_source)) as f:
+                        data = self.codec.decode_products(f.read())
+                else:
+                    raise ValueError(f"Unsupported input format: {input_format}")
 
             if not isinstance(data, list):
                 raise ValueError("Input data must be a JSON array")
 
+            instrumentation.add_items("load", len(data))
             self.logger.info(f"Loaded {len(data)} products")
             return data
 
         except json.JSONDecodeError as e:
             self.logger.error(f"Invalid JSON format: {e}")
             raise
-        except FileNotFoundError:
-            self.logger.error(f"Could not find file {input_source}")
+        except FileNotFoundError as e:
+            self.logger.error(f"Could not find file {e.filename or input_source}")
             raise
         except Exception as e:
             self.logger.error(f"Error loading input data: {e}")
             raise
+
+    def stream(
+        self, input_source: InputSource, input_format: str = "ndjson"
+    ) -> typing.Iterator[typing.Dict]:
+        """Yield products one at a time from file, files or stdin.
+
+        NDJSON input is decoded line by line, and a JSON array file one
+        element at a time, so memory does not grow with the input size. A
+        JSON array on stdin has to be decoded as a whole first. Several
+        files are decoded a few at a time and yielded file by file.
+        Products keep only the codec's ``fields``, if it has any.
+        """
+        files = self._files(input_source)
+        if files is not None:
+            yield from self._read_files(files, input_format)
+            return
+
+        source = self._single(input_source)
+        if input_format == "json" and source not in (None, "-"):
+            yield from self._stream_array(source)
+            return
+
+        if input_format != "ndjson":
+            yield from self.load(input_source, input_format)
+            return
+
+        with self._open(self._single(input_source)) as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    product = self.codec.decode_product(line)
+                except json.JSONDecodeError as e:
+                    self.logger.error(f"Invalid JSON on line {line_number}: {e}")
+                    raise
+                if not isinstance(product, dict):
+                    raise ValueError(f"NDJSON line {line_number} must be a JSON object")
+                yield product
+
+    def _stream_array(self, path: str) -> typing.Iterator[typing.Dict]:
+        """Yield the products of a JSON array file one at a time."""
+        self.logger.debug(f"Reading from file: {path}")
+        try:
+            for product in json_array.decode_array(path, self.codec):
+                if not isinstance(product, dict):
+                    raise ValueError(f"Array elements in {path} must be JSON objects")
+                yield product
+        except json.JSONDecodeError as e:
+            self.logger.error(f"Invalid JSON format: {e}")
+            raise
+        except FileNotFoundError:
+            self.logger.error(f"Could not find file {path}")
+            raise
+
+    def _read_files(
+        self, files: typing.List[str], input_format: str
+    ) -> typing.Iterator[typing.Dict]:
+        """Yield the products of several files in order, decoded concurrently.
+
+        Up to ``workers`` threads read and decode the next files while the
+        products of earlier ones are consumed; at most twice as many files
+        are held decoded at once.
+        """
+        if input_format not in INPUT_FORMATS:
+            raise ValueError(f"Unsupported input format: {input_format}")
+
+        self.logger.info(f"Reading {len(files)} input files")
+        paths = iter(files)
+        executor = concurrent.futures.ThreadPoolExecutor(
+            self.workers, thread_name_prefix="stellarspider-load"
+        )
+
+        def submit(path: str) -> concurrent.futures.Future:
+            return executor.submit(self._read_file, path, input_format)
+
+        try:
+            pending = collections.deque(
+                submit(path) for path in itertools.islice(paths, 2 * self.workers)
+            )
+            while pending:
+                products = pending.popleft().result()
+                next_path = next(paths, None)
+                if next_path is not None:
+                    pending.append(submit(next_path))
+                yield from products
+        finally:
+            # Files not yet started are skipped when the consumer stops early
+            executor.shutdown(cancel_futures=True)
+
+    def _read_file(self, path: str, input_format: str) -> typing.List[typing.Dict]:
+        """Decode one file of a multi-file input and tag its products."""
+        with open(path, "rb") as f:
+            raw = f.read()
+        try:
+            if input_format == "json":
+                products = self.codec.decode_products(raw)
+                if not isinstance(products, list):
+                    raise ValueError(f"Input data in {path} must be a JSON array")
+            else:
+                products = [
+                    self.codec.decode_product(line)
+                    for line in raw.splitlines()
+                    if line.strip()
+                ]
+        except json.JSONDecodeError as e:
+            self.logger.error(f"Invalid JSON in {path}: {e}")
+            raise
+
+        for product in products:
+            if not isinstance(product, dict):
+                raise ValueError(f"Products in {path} must be JSON objects")
+            product[SOURCE_FIELD] = path
+        return products
@@ -0,0 +1,212 @@
+import contextlib
+import json
+import mmap
+import re
+import typing
+
+from stellarspider.io.codec import JsonCodec
+
+# A complete JSON string, consumed in one step so nothing inside it is
+# mistaken for structure
+_STRING = rb'"[^"\\]*+(?:\\.[^"\\]*+)*+"'
+
+# Skip strings and other bytes up to the next byte that matters; group 1 is
+# that byte. Between top-level elements, separators matter; inside one, only
+# brackets do. A quote in group 1 opens a string that is never closed.
+_NEXT_TOP = re.compile(rb'(?:[^"\[\]{},]++|' + _STRING + rb')*+([\[\]{},"])', re.S)
+_NEXT_NESTED = re.compile(rb'(?:[^"\[\]{}]++|' + _STRING + rb')*+([\[\]{}"])', re.S)
+
+_WHITESPACE = re.compile(rb"[ \t\n\r]*+")
+_NEWLINE = re.compile(rb"\n")
+
+# Where one top-level object may end and the next begin
+_BOUNDARY = re.compile(rb"\}[ \t\n\r]*+,[ \t\n\r]*+\{")
+
+# Bytes decoded at once, cut where an object seems to end
+_BLOCK_BYTES = 1024 * 1024
+
+# Bytes scanned between releases of the mapped pages before them
+_RELEASE_BYTES = 16 * 1024 * 1024
+
+
+class _Lines:
+    """What ``json.JSONDecodeError`` needs of a document to find its line.
+
+    Counts lines in the bytes of a buffer, so errors in a mapped file
+    report lines and columns without decoding it to text.
+    """
+
+    def __init__(self, buffer: typing.Any):
+        self.buffer = buffer
+
+    def count(self, _newline: str, start: int, end: int) -> int:
+        return sum(1 for _ in _NEWLINE.finditer(self.buffer, start, end))
+
+    def rfind(self, _newline: str, start: int, end: int) -> int:
+        return self.buffer.rfind(b"\n", start, end)
+
+
+def _error(message: str, buffer: typing.Any, pos: int) -> json.JSONDecodeError:
+    return json.JSONDecodeError(message, _Lines(buffer), pos)
+
+
+def _blank(buffer: typing.Any, start: int, end: int) -> bool:
+    return _WHITESPACE.match(buffer, start, end).end() == end
+
+
+def _array_start(buffer: typing.Any) -> int:
+    """Return the offset just past the bracket that opens the array."""
+    pos = _WHITESPACE.match(buffer).end()
+    if pos == len(buffer):
+        raise _error("Expecting value", buffer, pos)
+    opening = buffer[pos : pos + 1]
+    if opening == b"{":
+        raise ValueError("Input data must be a JSON array")
+    if opening != b"[":
+        raise _error("Expecting '['", buffer, pos)
+    return pos + 1
+
+
+def _spans(
+    buffer: typing.Any, pos: int, first: bool = True
+) -> typing.Iterator[typing.Tuple[int, int]]:
+    """Yield the spans of the elements from the one starting at ``pos`` on.
+
+    ``first`` says whether that is the first element, i.e. whether the
+    array may end right there. The separator or bracket after an element
+    is at its span's end.
+    """
+    start = pos
+    depth = 0
+    while True:
+        match = (_NEXT_NESTED if depth else _NEXT_TOP).match(buffer, pos)
+        if match is None:
+            raise _error("Unterminated array", buffer, len(buffer))
+        i = match.start(1)
+        char = match.group(1)
+        pos = i + 1
+
+        if char == b'"':
+            raise _error("Unterminated string starting at", buffer, i)
+        if char in b"[{":
+            depth += 1
+        elif depth:
+            depth -= 1
+        elif char == b"}":
+            raise _error("Unexpected '}'", buffer, i)
+        else:
+            # A separator or the closing bracket of the array itself
+            if _blank(buffer, start, i):
+                if char == b"]" and first:
+                    break
+                raise _error("Expecting value", buffer, i)
+            yield start, i
+            first = False
+            if char == b"]":
+                break
+            start = pos
+
+    pos = _WHITESPACE.match(buffer, pos).end()
+    if pos != len(buffer):
+        raise _error("Extra data", buffer, pos)
+
+
+def element_spans(buffer: typing.Any) -> typing.Iterator[typing.Tuple[int, int]]:
+    """Yield the ``(start, end)`` byte offsets of each element of a JSON array.
+
+    ``buffer`` is anything ``re`` can search, e.g. bytes or an mmap. Only
+    nesting, strings and separators are tracked, so the scan never builds
+    values; each element is checked when it is decoded. Raises
+    ``json.JSONDecodeError`` for a malformed array and ``ValueError`` if
+    the document is a JSON object instead.
+    """
+    return _spans(buffer, _array_start(buffer))
+
+
+@contextlib.contextmanager
+def _mapped(path: str) -> typing.Iterator[typing.Any]:
+    """Memory-map a file read-only, to be read front to back."""
+    with open(path, "rb") as f:
+        if not f.seek(0, 2):
+            # An empty file cannot be mapped; it decodes like empty bytes
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                buffer.madvise(mmap.MADV_SEQUENTIAL)
+            yield buffer
+
+
+def _release(buffer: typing.Any, end: int) -> None:
+    """Drop the mapped pages before ``end``; they are read from disk if needed."""
+    length = end - end % mmap.PAGESIZE
+    if length and hasattr(mmap, "MADV_DONTNEED"):
+        buffer.madvise(mmap.MADV_DONTNEED, 0, length)
+
+
+def _closing_bracket(buffer: typing.Any) -> typing.Optional[int]:
+    """Return the offset of the last byte if it is a ``]``, ignoring whitespace."""
+    end = len(buffer)
+    while end and buffer[end - 1 : end] in (b" ", b"\t", b"\n", b"\r"):
+        end -= 1
+    if buffer[end - 1 : end] != b"]":
+        return None
+    return end - 1
+
+
+def decode_array(path: str, codec: JsonCodec) -> typing.Iterator[typing.Any]:
+    """Yield the elements of the JSON array in a file one at a time.
+
+    The file is memory-mapped and cut into blocks of about ``_BLOCK_BYTES``
+    where one object seems to end and the next to begin. Each block is
+    decoded as an array of its own by the codec. A cut that is not between
+    top-level elements always makes its block invalid JSON, so such a block,
+    like one holding a real error, is scanned exactly and decoded element
+    by element instead, which also reports errors at their position in the
+    file. Pages already decoded are released as the scan moves on, so
+    memory is bounded by a block or the largest element, not the file.
+    """
+    with _mapped(path) as buffer:
+        start = _array_start(buffer)
+        close = _closing_bracket(buffer)
+        if close is None:
+            # Not closed like an array: the exact scan finds what is wrong
+            for element_start, end in _spans(buffer, start):
+                yield _decode(codec, buffer, element_start, end)
+            return
+        if _blank(buffer, start, close):
+            return
+
+        released = 0
+        first = True
+        while start < close:
+            boundary = _BOUNDARY.search(buffer, start + _BLOCK_BYTES, close)
+            cut = boundary.start() + 1 if boundary else close
+            if _blank(buffer, start, cut):
+                raise _error("Expecting value", buffer, cut)
+
+            try:
+                elements = codec.decode_products(b"[" + buffer[start:cut] + b"]")
+            except json.JSONDecodeError:
+                elements = None
+            if elements is not None:
+                yield from elements
+                start = boundary.end() - 1 if boundary else close
+            else:
+                for element_start, end in _spans(buffer, start, first):
+                    yield _decode(codec, buffer, element_start, end)
+                    if end >= cut:
+                        break
+                start = end + 1
+            first = False
+
+            if start - released >= _RELEASE_BYTES:
+                _release(buffer, start)
+                released = start
+
+
+def _decode(codec: JsonCodec, buffer: typing.Any, start: int, end: int) -> typing.Any:
+    try:
+        return codec.decode_product(buffer[start:end])
+    except json.JSONDecodeError as e:
+        raise _error(e.msg, buffer, start + e.pos) from None
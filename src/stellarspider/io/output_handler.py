@@ -1,34 +1,168 @@
-import json
+import itertools
 import logging
 import sys
 import typing
 
-import omegaconf
+from stellarspider.core import instrumentation
+from stellarspider.core.records import EXPLAIN_LEVELS, explained
+from stellarspider.io import columnar
+from stellarspider.io.codec import JsonCodec
+
+if typing.TYPE_CHECKING:
+    import omegaconf
+
+OUTPUT_FORMATS = ("json", "ndjson") + columnar.COLUMNAR_FORMATS
 
 
 class OutputHandler:
     """Handles output formatting and writing following SRP."""
 
-    def __init__(self, output_config: omegaconf.DictConfig):
+    def __init__(
+        self,
+        output_config: "omegaconf.DictConfig",
+        codec: typing.Optional[JsonCodec] = None,
+    ):
         self.config = output_config
+        self.codec = codec or JsonCodec("json")
         self.logger = logging.getLogger(__name__)
 
+        # Compact JSON has no whitespace at all, which overrides the indent
+        self.compact = self.config.get("compact", False)
+
+        # Detail level of the explanations written with each product's scores
+        self.explain = self.config.get("explain", "full")
+        if self.explain not in EXPLAIN_LEVELS:
+            raise ValueError(f"Unsupported explain level: {self.explain}")
+
+    def _explained(self, data: typing.Iterable[typing.Dict]) -> typing.Iterable:
+        """Return products with the explanations of the configured level."""
+        if self.explain == "full":
+            return data
+        return (explained(product, self.explain) for product in data)
+
     def write(self, data: typing.List[typing.Dict]) -> None:
         """Write data to stdout in configured format."""
         try:
             format_type = self.config.get("format", "json")
 
-            if format_type == "json":
-                self._write_json(data)
-            else:
-                raise ValueError(f"Unsupported output format: {format_type}")
+            with instrumentation.stage("output", len(data)):
+                if format_type == "json":
+                    self._write_json(data)
+                elif format_type == "ndjson":
+                    self._write_ndjson(data)
+                elif format_type in columnar.COLUMNAR_FORMATS:
+                    self._write_columnar(data, format_type)
+                else:
+                    raise ValueError(f"Unsupported output format: {format_type}")
+
+        except Exception as e:
+            self.logger.error(f"Error writing output: {e}")
+            raise
+
+    def write_groups(self, groups: typing.Dict[str, typing.List[typing.Dict]]) -> None:
+        """Write groups of products to stdout in configured format.
+
+        JSON output is one object of arrays keyed by group; NDJSON and
+        columnar output write the products of each group in turn.
+        """
+        try:
+            format_type = self.config.get("format", "json")
+
+            items = sum(len(group) for group in groups.values())
+            with instrumentation.stage("output", items):
+                if format_type == "json":
+                    self._write_json(groups)
+                elif format_type == "ndjson":
+                    self._write_ndjson(itertools.chain.from_iterable(groups.values()))
+                elif format_type in columnar.COLUMNAR_FORMATS:
+                    self._write_columnar(
+                        itertools.chain.from_iterable(groups.values()), format_type
+                    )
+                else:
+                    raise ValueError(f"Unsupported output format: {format_type}")
 
         except Exception as e:
             self.logger.error(f"Error writing output: {e}")
             raise
 
-    def _write_json(self, data: typing.List[typing.Dict]) -> None:
+    def write_stream(self, data: typing.Iterable[typing.Dict]) -> int:
+        """Write products to stdout as they are produced.
+
+        Returns the number of products written.
+        """
+        try:
+            format_type = self.config.get("format", "json")
+
+            # Scoring the stream happens inside this stage, as nested stages
+            with instrumentation.stage("output"):
+                if format_type == "json":
+                    count = self._write_json_stream(data)
+                elif format_type == "ndjson":
+                    count = self._write_ndjson(data)
+                elif format_type in columnar.COLUMNAR_FORMATS:
+                    count = self._write_columnar(data, format_type)
+                else:
+                    raise ValueError(f"Unsupported output format: {format_type}")
+            instrumentation.add_items("output", count)
+            return count
+
+        except Exception as e:
+            self.logger.error(f"Error writing output: {e}")
+            raise
+
+    def _write_json(
+        self, data: typing.Union[typing.List[typing.Dict], typing.Dict]
+    ) -> None:
         """Write data as JSON to stdout."""
         indent = self.config.get("indent", 2)
-        json.dump(data, sys.stdout, indent=indent)
+        if self.explain != "full":
+            if isinstance(data, dict):
+                data = {k: list(self._explained(group)) for k, group in data.items()}
+            else:
+                data = list(self._explained(data))
+        sys.stdout.write(self.codec.encode(data, indent, self.compact))
         print()  # Add newline at end
+
+    def _write_json_stream(self, data: typing.Iterable[typing.Dict]) -> int:
+        """Write products as one JSON array, element by element."""
+        indent = None if self.compact else self.config.get("indent", 2)
+        if indent is None:
+            item_prefix, closing = "", "]"
+            separator = "," if self.compact else ", "
+        else:
+            item_prefix, closing = "\n" + " " * indent, "\n]"
+            separator = ","
+
+        count = 0
+        sys.stdout.write("[")
+        for product in self._explained(data):
+            encoded = self.codec.encode(product, indent, self.compact)
+            if count:
+                sys.stdout.write(separator)
+            sys.stdout.write(item_prefix + encoded.replace("\n", item_prefix))
+            count += 1
+        sys.stdout.write((closing if count else "]") + "\n")
+        return count
+
+    def _write_ndjson(self, data: typing.Iterable[typing.Dict]) -> int:
+        """Write one compact JSON object per line to stdout."""
+        count = 0
+        for product in self._explained(data):
+            sys.stdout.write(self.codec.encode(product, compact=self.compact) + "\n")
+            count += 1
+        return count
+
+    def _write_columnar(
+        self, data: typing.Iterable[typing.Dict], format_type: str
+    ) -> int:
+        """Write products as typed columns, a batch of rows at a time.
+
+        Only the main scores are written, so explanations are never built.
+        """
+        batch_size = self.config.get("batch_size", 10000)
+        sys.stdout.flush()
+        with columnar.create_writer(
+            format_type, sys.stdout.buffer, batch_size
+        ) as writer:
+            writer.write(data)
+        return writer.count
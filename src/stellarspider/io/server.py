@@ -0,0 +1,319 @@
+import concurrent.futures
+import http.server
+import logging
+import os
+import queue
+import socketserver
+import stat
+import sys
+import threading
+import time
+import typing
+import urllib.parse
+
+from stellarspider.core.pipeline import FilterPipeline, _rank
+from stellarspider.core.records import EXPLAIN_LEVELS, explained
+from stellarspider.io.codec import JsonCodec
+
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson")
+
+
+class _Request:
+    """Products of one client request waiting to be scored."""
+
+    __slots__ = ("category", "products", "future")
+
+    def __init__(self, category: str, products: typing.List[typing.Dict]):
+        self.category = category
+        self.products = products
+        self.future: concurrent.futures.Future = concurrent.futures.Future()
+
+
+class BatchScorer:
+    """Scores the requests of concurrent clients together in one thread.
+
+    Requests that queue up while a batch is being scored, or that arrive
+    within ``max_wait`` seconds of it, are scored together as one batch of
+    up to ``max_batch`` products per category: under load many small
+    requests cost about as much as one large one, while a lone request is
+    scored at once. A pipeline with a rerank budget scores each request of
+    a batch on its own, so a client's candidates never depend on another's
+    products. All pipelines are only ever used from the scoring thread, so
+    they need not be thread-safe.
+    """
+
+    def __init__(
+        self,
+        pipelines: typing.Dict[str, FilterPipeline],
+        max_batch: int = 1000,
+        max_wait: float = 0.0,
+        chunk_size: int = 1000,
+    ):
+        self.pipelines = pipelines
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.chunk_size = chunk_size
+        self.logger = logging.getLogger(__name__)
+        self.stats = {"requests": 0, "products": 0, "batches": 0}
+
+        self._queue: "queue.Queue[typing.Optional[_Request]]" = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run, name="stellarspider-scorer", daemon=True
+        )
+        self._thread.start()
+
+    def submit(
+        self, category: str, products: typing.List[typing.Dict]
+    ) -> concurrent.futures.Future:
+        """Queue products for scoring; the future resolves to them, scored."""
+        if category not in self.pipelines:
+            raise KeyError(category)
+        request = _Request(category, products)
+        self._queue.put(request)
+        return request.future
+
+    def _collect(self, first: _Request) -> typing.Tuple[typing.List[_Request], bool]:
+        """Gather the requests that arrive while the batch is open."""
+        batch = [first]
+        size = len(first.products)
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch:
+            try:
+                request = self._queue.get_nowait()
+            except queue.Empty:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if request is None:
+                return batch, True
+            batch.append(request)
+            size += len(request.products)
+        return batch, False
+
+    def _score_batch(self, batch: typing.List[_Request]) -> None:
+        by_category: typing.Dict[str, typing.List[_Request]] = {}
+        for request in batch:
+            by_category.setdefault(request.category, []).append(request)
+
+        for category, requests in by_category.items():
+            pipeline = self.pipelines[category]
+            products = [p for request in requests for p in request.products]
+            if pipeline.rerank is None:
+                groups = [products]
+            else:
+                # Rerank candidates are chosen per request, never across clients
+                groups = [request.products for request in requests]
+            try:
+                # Products are scored in place, so each request keeps its own
+                for group in groups:
+                    for _ in pipeline.process_stream(group, self.chunk_size):
+                        pass
+            except Exception as e:
+                self.logger.error(f"Error scoring batch for {category}: {e}")
+                for request in requests:
+                    request.future.set_exception(e)
+                continue
+
+            for request in requests:
+                request.future.set_result(request.products)
+            self.stats["requests"] += len(requests)
+            self.stats["products"] += len(products)
+            self.stats["batches"] += 1
+            self.logger.debug(
+                f"Scored {len(products)} {category} products "
+                f"from {len(requests)} requests"
+            )
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch, stopping = self._collect(first)
+            self._score_batch(batch)
+
+    def close(self) -> None:
+        """Score the requests already queued, then stop the scoring thread."""
+        self._queue.put(None)
+        self._thread.join()
+        for pipeline in self.pipelines.values():
+            pipeline.close()
+
+
+def _decode_products(
+    codec: JsonCodec, body: bytes, ndjson: bool
+) -> typing.List[typing.Dict]:
+    """Decode a request body holding a JSON array or NDJSON products."""
+    if ndjson:
+        products = [
+            codec.decode_product(line) for line in body.splitlines() if line.strip()
+        ]
+    else:
+        products = codec.decode_products(body)
+        if not isinstance(products, list):
+            raise ValueError("Request body must be a JSON array")
+    if not all(isinstance(product, dict) for product in products):
+        raise ValueError("Every product must be a JSON object")
+    return products
+
+
+class ScoringRequestHandler(http.server.BaseHTTPRequestHandler):
+    """HTTP API of the scoring daemon.
+
+    ``GET /health`` reports the daemon's state. ``POST /score/<category>``
+    takes a JSON array (or NDJSON with an NDJSON content type) of products
+    and returns them ranked; ``top`` and ``min_score`` query parameters
+    trim the ranking, ``explain`` sets the detail level of explanations
+    like ``--explain``, and ``format=ndjson`` selects NDJSON output.
+    """
+
+    # Keep-alive connections spare clients a connect per request
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        if urllib.parse.urlsplit(self.path).path != "/health":
+            self._send_error(404, f"Not found: {self.path}")
+            return
+        scorer = self.server.scorer
+        self._send_json(
+            200,
+            {
+                "status": "ok",
+                "categories": sorted(scorer.pipelines),
+                "uptime": round(time.monotonic() - self.server.started, 3),
+                **scorer.stats,
+            },
+        )
+
+    def do_POST(self) -> None:
+        url = urllib.parse.urlsplit(self.path)
+        prefix, _, category = url.path.strip("/").partition("/")
+        if prefix != "score" or not category:
+            self._send_error(404, f"Not found: {self.path}")
+            return
+        if category not in self.server.scorer.pipelines:
+            self._send_error(404, f"Unknown category: {category}")
+            return
+
+        try:
+            params = urllib.parse.parse_qs(url.query)
+            top = int(params["top"][0]) if "top" in params else None
+            min_score = float(params["min_score"][0]) if "min_score" in params else None
+            explain = params.get("explain", ["full"])[0]
+            if explain not in EXPLAIN_LEVELS:
+                raise ValueError(f"unknown explain level {explain}")
+            length = int(self.headers.get("Content-Length", 0))
+            content_type = self.headers.get("Content-Type", "").split(";")[0]
+            products = _decode_products(
+                self.server.codec,
+                self.rfile.read(length),
+                content_type.strip() in NDJSON_TYPES,
+            )
+        except ValueError as e:
+            self._send_error(400, f"Bad request: {e}")
+            return
+
+        try:
+            scored = self.server.scorer.submit(category, products).result()
+        except Exception as e:
+            self._send_error(500, f"Error scoring products: {e}")
+            return
+        ranked = [explained(p, explain) for p in _rank(scored, top, min_score)]
+
+        if params.get("format", ["json"])[0] == "ndjson":
+            codec = self.server.codec
+            body = "".join(codec.encode(product) + "\n" for product in ranked)
+            self._send(200, body.encode(), "application/x-ndjson")
+        else:
+            self._send_json(200, ranked)
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, data: typing.Any) -> None:
+        body = self.server.codec.encode(data).encode()
+        self._send(status, body, "application/json")
+
+    def _send_error(self, status: int, message: str) -> None:
+        self._send_json(status, {"error": message})
+
+    def address_string(self) -> str:
+        # Unix socket clients have no address
+        if isinstance(self.client_address, tuple):
+            return str(self.client_address[0])
+        return "unix"
+
+    def log_message(self, format: str, *args) -> None:
+        logging.getLogger(__name__).debug(f"{self.address_string()} - {format % args}")
+
+
+class _ServerMixin:
+    daemon_threads = True
+    # Plenty of scraper clients may connect at once
+    request_queue_size = 128
+
+    scorer: BatchScorer
+    codec: JsonCodec
+    started: float
+
+    def handle_error(self, request, client_address) -> None:
+        # Clients that hang up early are no reason for a traceback
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            logging.getLogger(__name__).debug("Client closed the connection early")
+            return
+        super().handle_error(request, client_address)
+
+
+class ScoringHTTPServer(_ServerMixin, http.server.ThreadingHTTPServer):
+    """Scoring daemon listening on a TCP address."""
+
+
+class UnixScoringHTTPServer(_ServerMixin, socketserver.ThreadingUnixStreamServer):
+    """Scoring daemon listening on a Unix socket."""
+
+    def server_bind(self) -> None:
+        # A socket left behind by an earlier daemon would make bind fail
+        try:
+            if stat.S_ISSOCK(os.stat(self.server_address).st_mode):
+                os.remove(self.server_address)
+        except FileNotFoundError:
+            pass
+        super().server_bind()
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            os.remove(self.server_address)
+        except FileNotFoundError:
+            pass
+
+
+def make_server(
+    scorer: BatchScorer,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    socket_path: typing.Optional[str] = None,
+    codec: typing.Optional[JsonCodec] = None,
+) -> typing.Union[ScoringHTTPServer, UnixScoringHTTPServer]:
+    """Create a daemon serving ``scorer`` on a Unix socket or a TCP address.
+
+    Request and response bodies go through ``codec``, the standard library
+    by default.
+    """
+    if socket_path:
+        server = UnixScoringHTTPServer(socket_path, ScoringRequestHandler)
+    else:
+        server = ScoringHTTPServer((host, port), ScoringRequestHandler)
+    server.scorer = scorer
+    server.codec = codec or JsonCodec("json")
+    server.started = time.monotonic()
+    return server
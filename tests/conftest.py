@@ -0,0 +1,19 @@
+import pytest
+
+from stellarspider.core.filters.rule_based import RuleBasedFilter
+from stellarspider.core.pipeline import FilterPipeline
+from stellarspider.core.scoring.combined_scorer import CombinedScoreCalculator
+
+KEYWORDS = {"positive": ["salmon"], "negative": ["burger"]}
+SCORING = {"positive_multiplier": 3, "negative_multiplier": -5}
+
+
+@pytest.fixture
+def rule_pipeline():
+    """Return a factory of rule-scored pipelines that favour salmon over burgers."""
+
+    def make():
+        rule_filter = RuleBasedFilter(KEYWORDS, SCORING)
+        return FilterPipeline([rule_filter], CombinedScoreCalculator())
+
+    return make
@@ -0,0 +1,80 @@
+import pytest
+
+from stellarspider.bench.baseline import compare, load_baseline, save_baseline
+from stellarspider.bench.generator import ProductGenerator
+from stellarspider.bench.runner import STAGES, BenchmarkRunner, StageResult
+from stellarspider.io.data_loader import DataLoader
+
+CONFIG = {
+    "filter_type": "salmon",
+    "keywords": {"positive": ["salmon"], "negative": ["burger"]},
+    "scoring": {"positive_multiplier": 3, "negative_multiplier": -5},
+    "output": {"format": "json", "indent": 2},
+}
+
+
+class TestProductGenerator:
+    """Test suite for ProductGenerator."""
+
+    def test_same_seed_same_products(self):
+        """Test listings only depend on the seed."""
+        products = list(ProductGenerator(seed=7).products(50))
+
+        assert products == list(ProductGenerator(seed=7).products(50))
+        assert products != list(ProductGenerator(seed=8).products(50))
+        assert all(
+            set(product) == {"Name", "Category", "URL", "CleanedText"}
+            for product in products
+        )
+
+    @pytest.mark.parametrize("output_format", ["json", "ndjson"])
+    def test_written_listings_load(self, tmp_path, output_format):
+        """Test written files load back as the generated listings."""
+        path = str(tmp_path / "products")
+        ProductGenerator().write(path, 20, output_format)
+
+        loaded = DataLoader().load(path, output_format)
+        assert loaded == list(ProductGenerator().products(20))
+
+
+class TestBenchmarkRunner:
+    """Test suite for BenchmarkRunner."""
+
+    def test_every_stage_is_timed(self, tmp_path):
+        """Test a run reports each stage with a positive throughput."""
+        runner = BenchmarkRunner(CONFIG, work_dir=str(tmp_path))
+
+        results = runner.run(30)
+
+        assert [result.stage for result in results] == list(STAGES)
+        assert all(result.products_per_second > 0 for result in results)
+
+    def test_unknown_stage(self):
+        """Test unknown stages are rejected."""
+        with pytest.raises(ValueError):
+            BenchmarkRunner(CONFIG, stages=["rule", "parse"])
+
+
+class TestBaseline:
+    """Test suite for baseline comparison."""
+
+    def test_drop_past_threshold_is_a_regression(self, tmp_path):
+        """Test only stages that slowed down by more than the threshold fail."""
+        path = str(tmp_path / "baseline.json")
+        save_baseline(
+            path,
+            [
+                StageResult(1000, "rule", 1.0, 50.0),
+                StageResult(1000, "price", 1.0, 50.0),
+            ],
+        )
+
+        current = [
+            StageResult(1000, "rule", 2.0, 50.0),
+            StageResult(1000, "price", 1.1, 50.0),
+            StageResult(5000, "rule", 100.0, 50.0),
+        ]
+        regressions = compare(current, load_baseline(path), threshold=0.2)
+
+        assert [(r.size, r.stage) for r in regressions] == [(1000, "rule")]
+        assert regressions[0].drop == pytest.approx(0.5)
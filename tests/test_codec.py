@@ -0,0 +1,163 @@
+import json
+import math
+
+import pytest
+
+from stellarspider.core.records import ScoreRecord
+from stellarspider.io.codec import PRODUCT_FIELDS, JsonCodec
+from stellarspider.io.data_loader import DataLoader
+
+PRODUCTS = [
+    {
+        "Name": "Wild Salmon Fillet",
+        "Price": "$12.99",
+        "URL": "a",
+        "CleanedText": "Frozen wild sockeye salmon",
+        "Images": ["a.jpg", "b.jpg"],
+    },
+    {"Name": "Tuna Steak", "CleanedText": "Yellowfin tuna"},
+]
+
+
+def _backends():
+    backends = ["json"]
+    for name in ("orjson", "msgspec"):
+        try:
+            __import__(name)
+        except ImportError:
+            continue
+        backends.append(name)
+    return backends
+
+
+class TestJsonCodec:
+    """Test suite for JsonCodec."""
+
+    def test_unknown_backend_is_rejected(self):
+        """Test an unknown backend name raises ValueError."""
+        with pytest.raises(ValueError):
+            JsonCodec("yaml")
+
+    @pytest.mark.parametrize("backend", _backends())
+    def test_decode_products_projects_fields(self, backend):
+        """Test decoded products keep only the projected fields, in order."""
+        codec = JsonCodec(backend, PRODUCT_FIELDS)
+
+        products = codec.decode_products(json.dumps(PRODUCTS).encode())
+
+        assert products == [
+            {
+                "Name": "Wild Salmon Fillet",
+                "URL": "a",
+                "CleanedText": "Frozen wild sockeye salmon",
+            },
+            {"Name": "Tuna Steak", "CleanedText": "Yellowfin tuna"},
+        ]
+
+    @pytest.mark.parametrize("backend", _backends())
+    def test_decode_product_projects_fields(self, backend):
+        """Test a single decoded product keeps only the projected fields."""
+        codec = JsonCodec(backend, ["Name"])
+
+        assert codec.decode_product(json.dumps(PRODUCTS[0])) == {
+            "Name": "Wild Salmon Fillet"
+        }
+
+    @pytest.mark.parametrize("backend", _backends())
+    def test_decode_products_returns_non_arrays(self, backend):
+        """Test anything but an array of objects is returned for rejection."""
+        codec = JsonCodec(backend, PRODUCT_FIELDS)
+
+        assert codec.decode_products(b'{"Name": "Salmon"}') == {"Name": "Salmon"}
+        assert codec.decode_products(b"[1, 2]") == [1, 2]
+
+    @pytest.mark.parametrize("backend", _backends())
+    def test_invalid_json_raises_json_decode_error(self, backend):
+        """Test every backend raises json.JSONDecodeError for invalid JSON."""
+        codec = JsonCodec(backend, PRODUCT_FIELDS)
+
+        with pytest.raises(json.JSONDecodeError):
+            codec.decode_products(b"[{")
+        with pytest.raises(json.JSONDecodeError):
+            codec.decode_product(b"not json")
+
+    @pytest.mark.parametrize("backend", _backends())
+    @pytest.mark.parametrize("fields", [None, PRODUCT_FIELDS])
+    def test_decodes_what_the_standard_library_accepts(self, backend, fields):
+        """Test input a fast backend rejects is decoded like json.loads does."""
+        codec = JsonCodec(backend, fields)
+        data = b'[{"Name": "Salmon", "URL": NaN, "Category": -Infinity}]'
+
+        products = codec.decode_products(data)
+        product = codec.decode_product(data[1:-1])
+
+        assert products == [product]
+        assert math.isnan(product["URL"])
+        assert product["Category"] == -math.inf
+
+    def test_auto_decodes_wide_integers_exactly(self):
+        """Test the default backend keeps integers wider than 64 bits."""
+        data = b'[{"Name": "Salmon", "URL": 123456789012345678901234567890}]'
+
+        assert JsonCodec().decode_products(data) == json.loads(data)
+
+    @pytest.mark.parametrize("backend", _backends())
+    def test_encode_matches_standard_library(self, backend):
+        """Test every backend writes the same JSON, records included."""
+        record = ScoreRecord({"rule_score": 3, "final_score": 0.5})
+        value = [{"Name": "Salmon", "Scoring": record}]
+        codec = JsonCodec(backend)
+
+        for options in ({"compact": True}, {"indent": 2}, {}):
+            assert json.loads(codec.encode(value, **options)) == [
+                {"Name": "Salmon", "Scoring": {"rule_score": 3, "final_score": 0.5}}
+            ]
+
+    @pytest.mark.parametrize("backend", _backends())
+    def test_compact_has_no_whitespace(self, backend):
+        """Test compact output leaves out indentation and separator spaces."""
+        codec = JsonCodec(backend)
+
+        encoded = codec.encode([{"Name": "Salmon", "URL": "a"}], indent=2, compact=True)
+
+        assert encoded == '[{"Name":"Salmon","URL":"a"}]'
+
+    def test_auto_writes_the_standard_library_bytes(self):
+        """Test the default backend writes ASCII-escaped output like json.dumps."""
+        value = [{"Name": "Saumon fumé", "Price": 1e-07}]
+        codec = JsonCodec()
+
+        for options in ({"compact": True}, {"indent": 2}, {}):
+            assert codec.encode(value, **options) == JsonCodec("json").encode(
+                value, **options
+            )
+        assert "\\u00e9" in codec.encode(value)
+
+    @pytest.mark.parametrize("backend", _backends()[1:])
+    def test_named_fast_backend_writes_utf8(self, backend):
+        """Test naming a fast backend opts in to unescaped UTF-8 output."""
+        encoded = JsonCodec(backend).encode([{"Name": "Saumon fumé"}], compact=True)
+
+        assert encoded == '[{"Name":"Saumon fumé"}]'
+
+
+class TestDataLoaderProjection:
+    """Test suite for DataLoader with a projecting codec."""
+
+    def test_load_json_projects_fields(self, tmp_path):
+        """Test loaded JSON products keep only the codec's fields."""
+        path = tmp_path / "products.json"
+        path.write_text(json.dumps(PRODUCTS))
+
+        products = DataLoader(JsonCodec("json", ["Name"])).load(str(path))
+
+        assert products == [{"Name": "Wild Salmon Fillet"}, {"Name": "Tuna Steak"}]
+
+    def test_stream_ndjson_projects_fields(self, tmp_path):
+        """Test streamed NDJSON products keep only the codec's fields."""
+        path = tmp_path / "products.ndjson"
+        path.write_text("".join(json.dumps(p) + "\n" for p in PRODUCTS))
+
+        stream = DataLoader(JsonCodec("json", ["URL"])).stream(str(path), "ndjson")
+
+        assert list(stream) == [{"URL": "a"}, {}]
@@ -0,0 +1,107 @@
+import csv
+import io
+
+import pytest
+
+from stellarspider.core.filters.rule_based import SalmonRuleBasedFilter
+from stellarspider.io.columnar import COLUMN_NAMES, create_writer, row
+
+PRODUCTS = [
+    {
+        "Name": "Wild Salmon Fillet",
+        "URL": "a",
+        "CleanedText": "Frozen wild sockeye salmon $12.99 16 oz",
+    },
+    {"Name": "Atlantic Salmon", "URL": "b", "CleanedText": "Farmed salmon"},
+]
+
+
+def _scored():
+    rule_filter = SalmonRuleBasedFilter(
+        {"positive": ["salmon", "sockeye"], "negative": ["farmed"]},
+        {"positive_multiplier": 3, "negative_multiplier": -5},
+        ocean_origins={"pacific": ["sockeye"], "atlantic": ["atlantic"]},
+    )
+    return rule_filter.filter_products([dict(p) for p in PRODUCTS])
+
+
+class TestRow:
+    """Test suite for flattening products into rows."""
+
+    def test_row_flattens_scores(self):
+        """Test a row holds the main scores, typed, and the ocean origin."""
+        product = _scored()[0]
+
+        values = dict(zip(COLUMN_NAMES, row(product)))
+
+        assert values["Name"] == "Wild Salmon Fillet"
+        assert values["rule_score"] == 6.0
+        assert values["extracted_price"] == 12.99
+        assert values["ocean_origin"] == "pacific"
+        assert values["semantic_score"] is None
+
+    def test_row_origin_matches_breakdown(self):
+        """Test the origin read from a deferred explanation matches the built one."""
+        for product in _scored():
+            breakdown = product["Scoring"]["rule_breakdown"]
+            origin = breakdown["ocean_origin"]["primary_origin"]
+
+            assert dict(zip(COLUMN_NAMES, row(product)))["ocean_origin"] == origin
+
+    def test_row_of_plain_scoring(self):
+        """Test rows are also built from plain scoring dicts."""
+        product = {
+            "Name": "Salmon",
+            "Scoring": {
+                "final_score": 1,
+                "rule_breakdown": {"ocean_origin": {"primary_origin": "arctic"}},
+                "category": "salmon",
+            },
+        }
+
+        values = dict(zip(COLUMN_NAMES, row(product)))
+
+        assert values["final_score"] == 1.0
+        assert values["ocean_origin"] == "arctic"
+        assert values["scored_category"] == "salmon"
+
+
+class TestColumnarWriters:
+    """Test suite for the columnar writers."""
+
+    @pytest.mark.parametrize("output_format, delimiter", [("csv", ","), ("tsv", "\t")])
+    def test_delimited_writes_header_and_rows(self, output_format, delimiter):
+        """Test CSV and TSV output has a header and one row per product."""
+        stream = io.BytesIO()
+
+        with create_writer(output_format, stream, batch_size=1) as writer:
+            writer.write(_scored())
+
+        rows = list(
+            csv.reader(io.StringIO(stream.getvalue().decode()), delimiter=delimiter)
+        )
+        assert writer.count == 2
+        assert rows[0] == list(COLUMN_NAMES)
+        assert [r[0] for r in rows[1:]] == ["Wild Salmon Fillet", "Atlantic Salmon"]
+
+    def test_parquet_writes_row_groups_of_batch_size(self, tmp_path):
+        """Test Parquet output is written a row group per batch."""
+        pq = pytest.importorskip("pyarrow.parquet")
+        path = tmp_path / "ranked.parquet"
+
+        with open(path, "wb") as f:
+            with create_writer("parquet", f, batch_size=1) as writer:
+                writer.write(_scored())
+
+        parquet_file = pq.ParquetFile(path)
+        assert parquet_file.metadata.num_row_groups == 2
+        assert parquet_file.schema_arrow.names == list(COLUMN_NAMES)
+        assert parquet_file.read().column("ocean_origin").to_pylist() == [
+            "pacific",
+            "atlantic",
+        ]
+
+    def test_unknown_format_is_rejected(self):
+        """Test an unknown columnar format raises ValueError."""
+        with pytest.raises(ValueError):
+            create_writer("xlsx", io.BytesIO())
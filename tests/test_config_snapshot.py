@@ -0,0 +1,61 @@
+import os
+
+from stellarspider.core.config_snapshot import ConfigSnapshotCache
+from stellarspider.core.filters.rule_based import RuleBasedFilter
+
+
+class TestConfigSnapshotCache:
+    """Test suite for ConfigSnapshotCache."""
+
+    def test_round_trip_with_prebuilt_filter(self, tmp_path):
+        """Test a stored snapshot loads back with a working rule filter."""
+        cache = ConfigSnapshotCache(str(tmp_path))
+        key = cache.key({"config.yaml": b"top: null\n"}, {"category": "salmon"})
+        rule_filter = RuleBasedFilter({"positive": ["salmon"]}, {})
+
+        cache.store(key, {"config": {"top": None}, "rule_filters": [rule_filter]})
+        snapshot = ConfigSnapshotCache(str(tmp_path)).load(key)
+
+        assert snapshot["config"] == {"top": None}
+        product = {"Name": "Salmon", "CleanedText": "salmon $1.00"}
+        loaded_filter = snapshot["rule_filters"][0]
+        assert loaded_filter.filter_products([product])[0]["Scoring"]["rule_score"]
+
+    def test_key_changes_with_sources_and_options(self, tmp_path):
+        """Test editing a config file or an option selects a new snapshot."""
+        cache = ConfigSnapshotCache(str(tmp_path))
+        base = cache.key({"config.yaml": b"top: null\n"}, {"category": "salmon"})
+
+        assert base == cache.key(
+            {"config.yaml": b"top: null\n"}, {"category": "salmon"}
+        )
+        assert base != cache.key({"config.yaml": b"top: 5\n"}, {"category": "salmon"})
+        assert base != cache.key({"config.yaml": b"top: null\n"}, {"category": "nuts"})
+
+    def test_missing_or_corrupt_snapshot_is_a_miss(self, tmp_path):
+        """Test unreadable snapshots are ignored rather than raised."""
+        cache = ConfigSnapshotCache(str(tmp_path))
+        key = cache.key({}, {})
+
+        assert cache.load(key) is None
+
+        cache.store(key, {"config": {}})
+        with open(cache._file(key), "wb") as f:
+            f.write(b"not a pickle")
+
+        assert cache.load(key) is None
+
+    def test_only_most_recently_used_snapshots_are_kept(self, tmp_path):
+        """Test storing past max_snapshots removes the least recently used."""
+        cache = ConfigSnapshotCache(str(tmp_path), max_snapshots=2)
+        keys = [cache.key({}, {"top": top}) for top in range(3)]
+
+        for i, key in enumerate(keys[:2]):
+            cache.store(key, {"config": {}})
+            os.utime(cache._file(key), ns=(i, i))
+        cache.load(keys[0])
+        cache.store(keys[2], {"config": {}})
+
+        assert cache.load(keys[0]) is not None
+        assert cache.load(keys[1]) is None
+        assert cache.load(keys[2]) is not None
@@ -0,0 +1,106 @@
+import json
+
+import pytest
+
+from stellarspider.io.data_loader import DataLoader
+
+
+class TestDataLoader:
+    """Test suite for DataLoader."""
+
+    def test_load_json_array(self, tmp_path):
+        """Test loading a JSON array file."""
+        path = tmp_path / "products.json"
+        path.write_text(json.dumps([{"Name": "Salmon"}, {"Name": "Tuna"}]))
+
+        products = DataLoader().load(str(path))
+
+        assert products == [{"Name": "Salmon"}, {"Name": "Tuna"}]
+
+    def test_load_ndjson(self, tmp_path):
+        """Test loading NDJSON, skipping blank lines."""
+        path = tmp_path / "products.ndjson"
+        path.write_text('{"Name": "Salmon"}\n\n{"Name": "Tuna"}\n')
+
+        products = DataLoader().load(str(path), "ndjson")
+
+        assert products == [{"Name": "Salmon"}, {"Name": "Tuna"}]
+
+    def test_stream_ndjson_is_lazy(self, tmp_path):
+        """Test that NDJSON streaming yields products before reading the rest."""
+        path = tmp_path / "products.ndjson"
+        path.write_text('{"Name": "Salmon"}\nnot json\n')
+
+        stream = DataLoader().stream(str(path), "ndjson")
+
+        assert next(stream) == {"Name": "Salmon"}
+        with pytest.raises(json.JSONDecodeError):
+            next(stream)
+
+    def test_stream_ndjson_rejects_non_objects(self, tmp_path):
+        """Test that every NDJSON line must be an object."""
+        path = tmp_path / "products.ndjson"
+        path.write_text("[1, 2]\n")
+
+        with pytest.raises(ValueError):
+            list(DataLoader().stream(str(path), "ndjson"))
+
+
+class TestMultiFileInput:
+    """Test suite for DataLoader reading several files."""
+
+    def _write_parts(self, tmp_path, count=5):
+        paths = []
+        for i in range(count):
+            path = tmp_path / f"part{i}.json"
+            path.write_text(json.dumps([{"Name": f"Salmon {i}a"}, {"Name": f"{i}b"}]))
+            paths.append(str(path))
+        return paths
+
+    def test_load_files_in_order_with_source(self, tmp_path):
+        """Test several files are loaded in order, each product with its file."""
+        paths = self._write_parts(tmp_path)
+
+        products = DataLoader(workers=2).load(paths)
+
+        assert [p["Name"] for p in products] == [
+            name for i in range(5) for name in (f"Salmon {i}a", f"{i}b")
+        ]
+        assert [p["Source"] for p in products[:3]] == [paths[0], paths[0], paths[1]]
+
+    def test_glob_is_expanded_sorted(self, tmp_path):
+        """Test a glob reads its matches in sorted order, even a single one."""
+        paths = self._write_parts(tmp_path, 2)
+        (tmp_path / "other.ndjson").write_text('{"Name": "Tuna"}\n')
+
+        products = list(DataLoader().stream(str(tmp_path / "part*.json"), "json"))
+        ndjson = DataLoader().load([str(tmp_path / "*.ndjson")], "ndjson")
+
+        assert [p["Source"] for p in products] == [paths[0]] * 2 + [paths[1]] * 2
+        assert ndjson == [{"Name": "Tuna", "Source": str(tmp_path / "other.ndjson")}]
+
+    def test_single_path_has_no_source(self, tmp_path):
+        """Test a single file in a list is read like a plain path."""
+        paths = self._write_parts(tmp_path, 1)
+
+        assert "Source" not in DataLoader().load(paths)[0]
+
+    def test_unmatched_glob_raises_file_not_found(self, tmp_path):
+        """Test a glob without matches fails like a missing file."""
+        with pytest.raises(FileNotFoundError):
+            DataLoader().load(str(tmp_path / "*.json"))
+
+    def test_stdin_cannot_be_combined_with_files(self, tmp_path):
+        """Test stdin is rejected among several inputs."""
+        paths = self._write_parts(tmp_path, 1)
+
+        with pytest.raises(ValueError):
+            DataLoader().load(paths + ["-"])
+
+    def test_invalid_file_raises_decode_error(self, tmp_path):
+        """Test a file that is not JSON fails the whole load."""
+        paths = self._write_parts(tmp_path, 2)
+        (tmp_path / "part1.json").write_text("[{")
+
+        with pytest.raises(json.JSONDecodeError):
+            DataLoader().load(paths)
@@ -0,0 +1,88 @@
+import copy
+
+import pytest
+
+from stellarspider.core.dedup_pipeline import DedupFilterPipeline
+from stellarspider.core.near_duplicates import MinHashIndex
+
+TEXT = (
+    "Wild caught Alaskan sockeye salmon fillets, skin on, frozen at sea within "
+    "hours of the catch and vacuum sealed in individual portions for easy "
+    "thawing. Rich in omega-3, ready for the grill, the oven or the pan"
+)
+
+PRODUCTS = [
+    {"Name": "Sockeye Salmon", "URL": "a", "CleanedText": f"{TEXT} $12.99 16 oz"},
+    {"Name": "Salmon Burger", "URL": "b", "CleanedText": "Salmon patties $7.49"},
+    {"Name": "Sockeye Salmon", "URL": "c", "CleanedText": f"{TEXT} $12.99 16 oz"},
+    {"Name": "Sockeye Salmon", "URL": "d", "CleanedText": f"{TEXT} $12.49 16 oz"},
+]
+
+
+class TestMinHashIndex:
+    """Test suite for MinHashIndex."""
+
+    def test_near_duplicates_share_a_group(self):
+        """Test lightly changed texts join the group of the first one."""
+        index = MinHashIndex(threshold=0.7)
+        texts = [TEXT, "Peanut butter, creamy", f"{TEXT} today"]
+
+        assert index.group(texts) == [(0, True), (1, True), (0, False)]
+        assert index.group([f"Fresh {TEXT}"]) == [(0, False)]
+
+    def test_texts_without_words_are_never_grouped(self):
+        """Test empty texts each start a group of their own."""
+        index = MinHashIndex()
+
+        assert index.group(["", "--", ""]) == [(0, True), (1, True), (2, True)]
+
+    def test_invalid_threshold(self):
+        """Test thresholds outside (0, 1] are rejected."""
+        with pytest.raises(ValueError):
+            MinHashIndex(threshold=0)
+
+
+class TestDedupFilterPipeline:
+    """Test suite for DedupFilterPipeline."""
+
+    def test_copy_mode_copies_scores_with_own_prices(self, rule_pipeline):
+        """Test duplicates get the scores of their representative."""
+        pipeline = DedupFilterPipeline(rule_pipeline(), "copy")
+        result = {p["URL"]: p for p in pipeline.process(copy.deepcopy(PRODUCTS))}
+        expected = {
+            p["URL"]: p for p in rule_pipeline().process(copy.deepcopy(PRODUCTS))
+        }
+
+        assert len(result) == 4
+        assert result["c"]["Scoring"] == {
+            **expected["c"]["Scoring"],
+            "duplicate_of": "a",
+        }
+        assert result["d"]["Scoring"]["duplicate_of"] == "a"
+        assert result["d"]["Scoring"]["extracted_price"] == 12.49
+        assert result["d"]["PricePerOZ"] == expected["d"]["PricePerOZ"]
+        assert "duplicate_of" not in result["a"]["Scoring"]
+
+    def test_group_mode_lists_duplicates(self, rule_pipeline):
+        """Test group mode keeps representatives only and lists the others."""
+        pipeline = DedupFilterPipeline(rule_pipeline(), "group")
+        result = list(pipeline.process_stream(copy.deepcopy(PRODUCTS), chunk_size=4))
+
+        assert [p["URL"] for p in result] == ["a", "b"]
+        assert result[0]["Scoring"]["duplicates"] == ["c", "d"]
+
+    def test_group_mode_keeps_duplicates_of_written_representatives(
+        self, rule_pipeline
+    ):
+        """Test members after a chunk boundary are kept, not silently lost."""
+        pipeline = DedupFilterPipeline(rule_pipeline(), "group")
+        result = list(pipeline.process_stream(copy.deepcopy(PRODUCTS), chunk_size=2))
+
+        assert [p["URL"] for p in result] == ["a", "b", "c", "d"]
+        assert "duplicates" not in result[0]["Scoring"]
+        assert [p["Scoring"]["duplicate_of"] for p in result[2:]] == ["a", "a"]
+
+    def test_unknown_mode(self, rule_pipeline):
+        """Test an unknown mode is rejected."""
+        with pytest.raises(ValueError):
+            DedupFilterPipeline(rule_pipeline(), "merge")
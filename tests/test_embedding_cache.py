@@ -0,0 +1,108 @@
+import numpy as np
+
+from stellarspider.core.embedding_cache import CachedEmbeddingBackend, EmbeddingCache
+from stellarspider.core.embeddings import EmbeddingBackend
+
+
+class CountingBackend(EmbeddingBackend):
+    """Stand-in model that records which texts it had to encode."""
+
+    def __init__(self, model_id="counting"):
+        self._model_id = model_id
+        self.encoded = []
+
+    @property
+    def model_id(self):
+        return self._model_id
+
+    def encode(self, texts, batch_size=32):
+        self.encoded.extend(texts)
+        return np.array(
+            [[len(text), text.count("a") + 1] for text in texts], dtype=np.float32
+        )
+
+
+class TestEmbeddingCache:
+    """Test suite for EmbeddingCache and CachedEmbeddingBackend."""
+
+    def test_only_misses_reach_the_model(self, tmp_path):
+        """Test that repeated and already cached texts are not re-encoded."""
+        model = CountingBackend()
+        backend = CachedEmbeddingBackend(model, EmbeddingCache(str(tmp_path), "m"))
+
+        first = backend.encode(["wild salmon", "raw  peanuts", "wild salmon"])
+        second = backend.encode(["raw peanuts", "tuna"])
+
+        assert model.encoded == ["wild salmon", "raw  peanuts", "tuna"]
+        np.testing.assert_array_equal(first[1], second[0])
+        assert first.shape == (3, 2)
+
+    def test_misses_encode_the_original_text(self, tmp_path):
+        """Test a first cached run embeds texts like a run without the cache."""
+        texts = ["  Wild   salmon\n", "raw peanuts"]
+        backend = CachedEmbeddingBackend(
+            CountingBackend(), EmbeddingCache(str(tmp_path), "m")
+        )
+
+        np.testing.assert_array_equal(
+            backend.encode(texts), CountingBackend().encode(texts)
+        )
+
+    def test_cache_persists_across_instances(self, tmp_path):
+        """Test that a new process-like instance reads earlier entries."""
+        CachedEmbeddingBackend(
+            CountingBackend(), EmbeddingCache(str(tmp_path), "m")
+        ).encode(["wild salmon"])
+
+        model = CountingBackend()
+        backend = CachedEmbeddingBackend(model, EmbeddingCache(str(tmp_path), "m"))
+        result = backend.encode(["wild salmon"])
+
+        assert model.encoded == []
+        np.testing.assert_array_equal(result, [[11, 2]])
+
+    def test_models_do_not_share_entries(self, tmp_path):
+        """Test that keys include the model ID."""
+        CachedEmbeddingBackend(
+            CountingBackend("a"), EmbeddingCache(str(tmp_path), "a")
+        ).encode(["salmon"])
+
+        model = CountingBackend("b")
+        CachedEmbeddingBackend(model, EmbeddingCache(str(tmp_path), "b")).encode(
+            ["salmon"]
+        )
+
+        assert model.encoded == ["salmon"]
+
+    def test_least_recently_used_entries_are_evicted(self, tmp_path):
+        """Test LRU eviction once the cache is full."""
+        cache = EmbeddingCache(str(tmp_path), "m", max_entries=2)
+        key_a, key_b, key_c = (cache.key(t) for t in ["a", "b", "c"])
+
+        cache.put_many({key_a: np.ones(2), key_b: np.ones(2)})
+        cache.get_many([key_a])
+        cache.put_many({key_c: np.zeros(2)})
+
+        assert set(cache.get_many([key_a, key_b, key_c])) == {key_a, key_c}
+        assert len(cache) == 2
+
+    def test_reopened_cache_keeps_its_capacity(self, tmp_path):
+        """Test a larger max_entries on reopening stays within the stored slots."""
+        EmbeddingCache(str(tmp_path), "m", max_entries=2).put_many(
+            {b"a" * 16: np.ones(2)}
+        )
+
+        cache = EmbeddingCache(str(tmp_path), "m", max_entries=10)
+        cache.put_many({cache.key(str(i)): np.full(2, i) for i in range(5)})
+
+        assert len(cache) == 2
+
+    def test_reader_detects_slot_evicted_by_another_writer(self, tmp_path):
+        """Test that a stale reader never returns another text's vector."""
+        reader = EmbeddingCache(str(tmp_path), "m", max_entries=1)
+        reader.put_many({reader.key("a"): np.ones(2)})
+
+        writer = EmbeddingCache(str(tmp_path), "m", max_entries=1)
+        writer.put_many({writer.key("b"): np.zeros(2)})
+
+        assert reader.get_many([reader.key("a")]) == {}
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from stellarspider.core.embeddings import SentenceTransformerBackend
+
+
+@pytest.fixture(scope="module")
+def tiny_model_path(tmp_path_factory):
+    """Save a tiny word-embedding sentence-transformers model to disk."""
+    sentence_transformers = pytest.importorskip("sentence_transformers")
+    torch = pytest.importorskip("torch")
+    from sentence_transformers.models.tokenizer import WhitespaceTokenizer
+
+    vocabulary = ["salmon", "fillet", "fresh", "fish", "peanuts", "raw", "nuts"]
+    generator = torch.Generator().manual_seed(0)
+    weights = torch.randn(len(vocabulary), 8, generator=generator)
+
+    word_embeddings = sentence_transformers.models.WordEmbeddings(
+        WhitespaceTokenizer(vocab=vocabulary, do_lower_case=True), weights
+    )
+    pooling = sentence_transformers.models.Pooling(8)
+    model = sentence_transformers.SentenceTransformer(
+        modules=[word_embeddings, pooling], device="cpu"
+    )
+
+    path = tmp_path_factory.mktemp("tiny-model")
+    model.save(str(path))
+    return str(path)
+
+
+class TestSentenceTransformerBackend:
+    """Test suite for SentenceTransformerBackend with a tiny local model."""
+
+    def test_encode_returns_unit_rows(self, tiny_model_path):
+        """Test that embeddings are normalized and batched."""
+        backend = SentenceTransformerBackend(tiny_model_path, num_threads=1)
+
+        embeddings = backend.encode(
+            ["fresh salmon fillet", "raw peanuts", "salmon"], batch_size=2
+        )
+
+        assert embeddings.shape == (3, 8)
+        assert embeddings.dtype == np.float32
+        np.testing.assert_allclose(np.linalg.norm(embeddings, axis=1), 1, rtol=1e-5)
+
+    def test_encode_empty(self, tiny_model_path):
+        """Test encoding an empty batch."""
+        backend = SentenceTransformerBackend(tiny_model_path)
+
+        assert backend.encode([]).shape == (0, 8)
+        assert backend.model_id == tiny_model_path
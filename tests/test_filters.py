@@ -1,4 +1,9 @@
+import numpy as np
+import pytest
+
+from stellarspider.core.embeddings import EmbeddingBackend
 from stellarspider.core.filters.rule_based import RuleBasedFilter
+from stellarspider.core.filters.semantic import SemanticFilter
 
 
 class TestRuleBasedFilter:
@@ -69,3 +74,124 @@ class TestRuleBasedFilter:
         result = filter_instance.filter_products([])
 
         assert result == []
+
+    def test_sparse_engine_matches_default(self):
+        """Test the sparse engine produces the same scoring as the default."""
+        keywords = {
+            "positive": ["salmon", "fillet", "salmon fillet"],
+            "negative": ["farm", "canned"],
+            "preferred": ["fresh"],
+        }
+        scoring_config = {
+            "positive_multiplier": 3,
+            "negative_multiplier": -10,
+            "preferred_multiplier": 2.5,
+        }
+        texts = [
+            ("Fresh Salmon Fillet", "Current price: $12.99 1 lb"),
+            ("Farmed Salmon", "Canned, $3.99"),
+            ("Tuna", "No keywords here"),
+        ]
+
+        results = {}
+        for engine in ("default", "sparse"):
+            products = [{"Name": n, "CleanedText": t} for n, t in texts]
+            filter_instance = RuleBasedFilter(keywords, scoring_config, engine=engine)
+            results[engine] = filter_instance.filter_products(products)
+
+        assert results["sparse"] == results["default"]
+        assert results["sparse"][1]["Scoring"]["rule_score"] == -17
+
+    def test_reject_keywords_skip_price(self):
+        """Test products hitting a reject keyword keep only their rule score."""
+        filter_instance = RuleBasedFilter(
+            {"positive": ["peanuts"], "negative": ["candy"]},
+            {"positive_multiplier": 3, "negative_multiplier": -8},
+            reject_keywords=["peanut butter"],
+            min_rule_score=0,
+        )
+        products = [
+            {"Name": "Raw Peanuts", "CleanedText": "$4.99 16 oz"},
+            {"Name": "Creamy Peanut Butter", "CleanedText": "$3.99 16 oz"},
+            {"Name": "Peanuts Candy", "CleanedText": "$2.99"},
+        ]
+
+        result = filter_instance.filter_products(products)
+
+        assert result[0]["Scoring"]["extracted_price"] == 4.99
+        assert "rejected" not in result[0]["Scoring"]
+        assert dict(result[1]["Scoring"]) == {
+            "rule_score": 0,
+            "rejected": "Reject keyword: peanut butter",
+        }
+        assert result[2]["Scoring"]["rejected"] == "Rule score -5 below 0"
+        assert "PricePerOZ" not in result[2]
+
+    def test_unknown_engine(self):
+        """Test an unknown rule engine is rejected."""
+        with pytest.raises(ValueError):
+            RuleBasedFilter({"positive": []}, {}, engine="dense")
+
+
+class BagOfWordsBackend(EmbeddingBackend):
+    """Tiny stand-in embedding model: normalized word counts over a vocabulary."""
+
+    def __init__(self, vocabulary):
+        self.vocabulary = vocabulary
+        self.calls = []
+
+    @property
+    def model_id(self):
+        return "bag-of-words"
+
+    def encode(self, texts, batch_size=32):
+        self.calls.append(len(texts))
+        vectors = np.array(
+            [
+                [text.lower().split().count(word) for word in self.vocabulary]
+                for text in texts
+            ],
+            dtype=np.float32,
+        )
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+
+class TestSemanticFilter:
+    """Test suite for SemanticFilter."""
+
+    def test_keyword_overlap_without_backend(self):
+        """Test the keyword-overlap fallback when no model is configured."""
+        filter_instance = SemanticFilter(["salmon", "fillet", "fish", "seafood"])
+
+        products = [{"Name": "Salmon Fillet", "CleanedText": "Fresh fillet"}]
+        result = filter_instance.filter_products(products)
+
+        assert result[0]["Scoring"]["semantic_score"] == 0.5
+        assert result[0]["Scoring"]["semantic_breakdown"]["matched_concepts"] == [
+            "salmon",
+            "fillet",
+        ]
+
+    def test_embedding_similarity_in_batches(self):
+        """Test cosine similarity scoring with batched encoding."""
+        backend = BagOfWordsBackend(["salmon", "fillet", "peanuts"])
+        filter_instance = SemanticFilter(
+            ["salmon", "peanuts"], backend=backend, batch_size=2
+        )
+
+        products = [
+            {"Name": "Salmon", "CleanedText": "salmon fillet"},
+            {"Name": "Peanuts", "CleanedText": "raw"},
+            {"Name": "Tuna", "CleanedText": "steak"},
+        ]
+        result = filter_instance.filter_products(products)
+
+        # Concepts are encoded once, then products in batches of two
+        assert backend.calls == [2, 2, 1]
+        assert result[0]["Scoring"]["semantic_score"] == pytest.approx(0.894, 1e-3)
+        assert result[1]["Scoring"]["semantic_score"] == pytest.approx(1.0)
+        assert result[2]["Scoring"]["semantic_score"] == 0
+        breakdown = result[0]["Scoring"]["semantic_breakdown"]
+        assert breakdown["matched_concepts"] == ["salmon"]
+        assert breakdown["concept_similarities"] == {"salmon": 0.8944, "peanuts": 0.0}
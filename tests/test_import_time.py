@@ -0,0 +1,97 @@
+import json
+import os
+import re
+import subprocess
+import sys
+
+# Generous enough for slow CI machines, tight enough to catch an eager
+# import of omegaconf, numpy or torch (each costs far more on its own)
+IMPORT_BUDGET_MS = float(os.environ.get("STELLARSPIDER_IMPORT_BUDGET_MS", "250"))
+
+HEAVY_MODULES = (
+    "omegaconf",
+    "yaml",
+    "numpy",
+    "scipy",
+    "sklearn",
+    "torch",
+    "sentence_transformers",
+)
+
+
+def _run_python(code, *options, env=None):
+    return subprocess.run(
+        [sys.executable, *options, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    )
+
+
+class TestImportTime:
+    """Test suite for the startup cost of the package."""
+
+    def test_import_stays_within_budget(self):
+        """Test importing the package stays within the time budget."""
+        result = _run_python("import stellarspider", "-X", "importtime")
+
+        match = re.search(r"\|\s*(\d+)\s*\|\s*stellarspider$", result.stderr, re.M)
+        assert match, result.stderr
+        cumulative_ms = int(match.group(1)) / 1000
+        assert cumulative_ms < IMPORT_BUDGET_MS, result.stderr
+
+    def test_import_loads_no_heavy_modules(self):
+        """Test heavy dependencies are only imported when they are used."""
+        result = _run_python(
+            "import sys, stellarspider\n"
+            f"print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+        )
+
+        assert result.stdout.split() == []
+
+    def test_config_snapshot_hit_skips_omegaconf(self, tmp_path):
+        """Test a run served from the config snapshot never imports omegaconf."""
+        empty_input = tmp_path / "empty.json"
+        empty_input.write_text("[]")
+        env = dict(os.environ, STELLARSPIDER_CACHE_DIR=str(tmp_path / "cache"))
+        code = (
+            "import sys, stellarspider\n"
+            f"sys.argv = ['stellarspider', '--category', 'salmon', "
+            f"'-i', {str(empty_input)!r}]\n"
+            "stellarspider.main()\n"
+            "print('omegaconf' in sys.modules, file=sys.stderr)"
+        )
+
+        first = _run_python(code, env=env)
+        second = _run_python(code, env=env)
+
+        assert first.stdout.strip() == second.stdout.strip() == "[]"
+        assert first.stderr.strip().endswith("True")
+        assert second.stderr.strip().endswith("False")
+
+    def test_run_options_share_a_config_snapshot(self, tmp_path):
+        """Test options that only steer a run reuse the same config snapshot."""
+        products = tmp_path / "products.json"
+        products.write_text(
+            '[{"Name": "Wild Salmon", "URL": "a", "CleanedText": "salmon $9.99"},'
+            ' {"Name": "Salmon Fillet", "URL": "b", "CleanedText": "salmon $5"}]'
+        )
+        env = dict(os.environ, STELLARSPIDER_CACHE_DIR=str(tmp_path / "cache"))
+
+        def run(*options):
+            argv = ["stellarspider", "--category", "salmon", "-i", str(products)]
+            return _run_python(
+                "import sys, stellarspider\n"
+                f"sys.argv = {argv + list(options)!r}\n"
+                "stellarspider.main()\n"
+                "print('omegaconf' in sys.modules, file=sys.stderr)",
+                env=env,
+            )
+
+        run()
+        top = run("--top", "1", "--compact")
+
+        assert top.stderr.strip().endswith("False")
+        assert len(json.loads(top.stdout)) == 1
+        assert len(os.listdir(tmp_path / "cache" / "config")) == 1
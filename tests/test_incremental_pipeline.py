@@ -0,0 +1,159 @@
+import copy
+
+from stellarspider.core.filters.rule_based import RuleBasedFilter
+from stellarspider.core.filters.semantic import SemanticFilter
+from stellarspider.core.incremental_pipeline import IncrementalFilterPipeline
+from stellarspider.core.pipeline import FilterPipeline
+from stellarspider.core.rerank import RerankBudget
+from stellarspider.core.score_store import ScoreStore, config_hash, fingerprint
+from stellarspider.core.scoring.combined_scorer import CombinedScoreCalculator
+
+CONFIG = {
+    "category_name": "fish",
+    "keywords": {"positive": ["salmon"], "negative": ["burger"]},
+    "scoring": {"positive_multiplier": 3, "negative_multiplier": -5},
+    "top": None,
+}
+
+PRODUCTS = [
+    {"Name": "Wild Salmon", "URL": "a", "CleanedText": "Salmon fillet $12.99 16 oz"},
+    {"Name": "Salmon Burger", "URL": "b", "CleanedText": "Salmon patties $7.49"},
+    {"Name": "Tuna Steak", "URL": "c", "CleanedText": "Yellowfin tuna $9.99"},
+]
+
+
+class TestScoreStore:
+    """Test suite for ScoreStore."""
+
+    def test_round_trip(self, tmp_path):
+        """Test stored results are found again after reopening the store."""
+        path = str(tmp_path / "fish.db")
+        store = ScoreStore(path, "hash")
+        store.put_many([(1, {"Scoring": {"final_score": 0.5}})])
+        store.close()
+
+        store = ScoreStore(path, "hash")
+        assert store.get_many([1, 2]) == {1: {"Scoring": {"final_score": 0.5}}}
+
+    def test_other_config_hash_clears_the_store(self, tmp_path):
+        """Test opening the store for another config drops every result."""
+        path = str(tmp_path / "fish.db")
+        store = ScoreStore(path, "old")
+        store.put_many([(1, {"Scoring": {}})])
+        store.close()
+
+        assert len(ScoreStore(path, "new")) == 0
+
+    def test_config_hash_ignores_run_options(self):
+        """Test only options that change scores change the config hash."""
+        base = config_hash(CONFIG)
+
+        assert config_hash({**CONFIG, "top": 5, "input": "crawl.json"}) == base
+        assert config_hash({**CONFIG, "json_backend": "orjson"}) == base
+        assert config_hash({**CONFIG, "input_workers": 2, "input_fields": []}) == base
+        assert config_hash({**CONFIG, "rerank": {"candidates": 50}}) == base
+        keywords = {"positive": ["salmon", "trout"], "negative": []}
+        assert config_hash({**CONFIG, "keywords": keywords}) != base
+
+    def test_fingerprint_covers_scored_fields(self):
+        """Test the fingerprint changes with the text but not other fields."""
+        product = PRODUCTS[0]
+
+        assert fingerprint({**product, "Category": "fish"}) == fingerprint(product)
+        assert fingerprint({**product, "CleanedText": "new"}) != fingerprint(product)
+
+
+class TestIncrementalFilterPipeline:
+    """Test suite for IncrementalFilterPipeline."""
+
+    def test_stored_results_match_a_full_run(self, rule_pipeline, tmp_path):
+        """Test a second run reuses every result and ranks like a full run."""
+        expected = rule_pipeline().process(copy.deepcopy(PRODUCTS))
+
+        for _ in range(2):
+            with IncrementalFilterPipeline.from_config(
+                CONFIG, rule_pipeline(), str(tmp_path)
+            ) as pipeline:
+                result = pipeline.process(copy.deepcopy(PRODUCTS))
+
+        assert result == expected
+        assert (pipeline.hits, pipeline.misses) == (3, 0)
+
+    def test_only_changed_products_are_scored(self, rule_pipeline, tmp_path):
+        """Test new or changed products go through the wrapped pipeline."""
+        with IncrementalFilterPipeline.from_config(
+            CONFIG, rule_pipeline(), str(tmp_path)
+        ) as pipeline:
+            list(pipeline.process_stream(copy.deepcopy(PRODUCTS), chunk_size=2))
+
+        changed = copy.deepcopy(PRODUCTS)
+        changed[2]["CleanedText"] = "Wild salmon $9.99"
+        with IncrementalFilterPipeline.from_config(
+            CONFIG, rule_pipeline(), str(tmp_path)
+        ) as pipeline:
+            result = list(pipeline.process_stream(changed, chunk_size=2))
+
+        assert (pipeline.hits, pipeline.misses) == (2, 1)
+        assert result == list(rule_pipeline().process_stream(copy.deepcopy(changed)))
+
+    def test_products_left_out_of_a_rerank_are_not_stored(self, tmp_path):
+        """Test only products with every filter's score are stored for reuse."""
+        rule_filter = RuleBasedFilter(CONFIG["keywords"], CONFIG["scoring"])
+        pipeline = FilterPipeline(
+            [rule_filter, SemanticFilter(["salmon"])],
+            CombinedScoreCalculator(),
+            rerank=RerankBudget(candidates=1),
+        )
+
+        with IncrementalFilterPipeline.from_config(
+            CONFIG, pipeline, str(tmp_path)
+        ) as incremental:
+            incremental.process(copy.deepcopy(PRODUCTS))
+            stored = incremental.store.get_many(
+                [fingerprint(product) for product in PRODUCTS]
+            )
+
+        assert [result["Scoring"]["rule_score"] for result in stored.values()] == [3]
+
+    def test_results_keep_only_the_explanations_written(self, rule_pipeline, tmp_path):
+        """Test stored rows follow the explain level and fuller runs rebuild."""
+        with IncrementalFilterPipeline(
+            rule_pipeline(), ScoreStore(str(tmp_path / "fish.db"), "hash"), "none"
+        ) as pipeline:
+            pipeline.process(copy.deepcopy(PRODUCTS))
+            stored = pipeline.store.get_many([fingerprint(PRODUCTS[0])])
+
+        assert "rule_breakdown" not in next(iter(stored.values()))["Scoring"]
+
+        for explain, misses in (("none", 0), ("full", 3), ("summary", 0)):
+            with IncrementalFilterPipeline(
+                rule_pipeline(), ScoreStore(str(tmp_path / "fish.db"), "hash"), explain
+            ) as pipeline:
+                result = pipeline.process(copy.deepcopy(PRODUCTS))
+            assert pipeline.misses == misses
+        assert result == rule_pipeline().process(copy.deepcopy(PRODUCTS))
+
+    def test_switching_rule_engine_keeps_the_store(self, tmp_path):
+        """Test options that do not change scores never clear stored ones."""
+        config = {
+            **CONFIG,
+            "cascade": {"enabled": True, "rejected": "minimal"},
+            "semantic": {"cache_dir": None},
+        }
+        store = ScoreStore.for_config(config, str(tmp_path))
+        store.put_many([(1, {"Scoring": {}})])
+        store.close()
+
+        for rule_engine, rejected in (("sparse", "drop"), ("default", "minimal")):
+            switched = {
+                **config,
+                "rule_engine": rule_engine,
+                "cascade": {"enabled": True, "rejected": rejected},
+                "semantic": {"cache_dir": "~/.cache/embeddings"},
+            }
+            store = ScoreStore.for_config(switched, str(tmp_path))
+            assert len(store) == 1
+            store.close()
+
+        edited = {**config, "cascade": {"enabled": False, "rejected": "minimal"}}
+        assert len(ScoreStore.for_config(edited, str(tmp_path))) == 0
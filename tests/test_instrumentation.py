@@ -0,0 +1,106 @@
+import copy
+import json
+import pstats
+import time
+
+from stellarspider.core import instrumentation
+from stellarspider.core.instrumentation import Recorder
+
+PRODUCTS = [
+    {"Name": "Wild Salmon", "URL": "a", "CleanedText": "Salmon fillet $12.99 16 oz"},
+    {"Name": "Salmon Burger", "URL": "b", "CleanedText": "Salmon patties $7.49"},
+    {"Name": "Tuna Steak", "URL": "c", "CleanedText": "Yellowfin tuna $9.99"},
+]
+
+
+class TestRecorder:
+    """Test suite for Recorder."""
+
+    def test_nested_stages(self):
+        """Test a stage's self time excludes the stages run inside it."""
+        recorder = Recorder()
+        with instrumentation.recording(recorder):
+            with instrumentation.stage("outer", 10):
+                with instrumentation.stage("inner", 4):
+                    time.sleep(0.02)
+                with instrumentation.stage("inner", 6):
+                    pass
+
+        stages = recorder.summary()["stages"]
+        assert (stages["inner"]["calls"], stages["inner"]["items"]) == (2, 10)
+        assert stages["outer"]["wall"] >= stages["inner"]["wall"] >= 0.02
+        assert stages["outer"]["self_wall"] < 0.02
+        assert stages["run"]["calls"] == 1
+
+    def test_nothing_recorded_without_recorder(self):
+        """Test stages outside ``recording`` are not recorded anywhere."""
+        recorder = Recorder()
+        with instrumentation.stage("load", 5):
+            pass
+
+        assert list(instrumentation.timed("input", [[1], [2]])) == [[1], [2]]
+        assert recorder.summary() == {"stages": {}}
+
+    def test_allocation_peaks(self):
+        """Test the peak allocated in a stage is recorded with tracing on."""
+        recorder = Recorder(track_allocations=True)
+        with instrumentation.recording(recorder):
+            with instrumentation.stage("outer"):
+                with instrumentation.stage("allocate"):
+                    data = bytearray(4_000_000)
+                    del data
+
+        stages = recorder.summary()["stages"]
+        assert stages["allocate"]["alloc_peak"] >= 4_000_000
+        assert stages["outer"]["alloc_peak"] >= 4_000_000
+
+    def test_pipeline_stages(self, rule_pipeline):
+        """Test a pipeline run records its filters, scoring and input."""
+        recorder = Recorder()
+        with instrumentation.recording(recorder):
+            list(rule_pipeline().process_stream(copy.deepcopy(PRODUCTS), chunk_size=2))
+
+        stages = recorder.summary()["stages"]
+        assert stages["input"]["items"] == 3
+        assert stages["filter.RuleBasedFilter"]["calls"] == 2
+        assert stages["rule.price"]["items"] == 3
+        assert stages["combine"]["items"] == 3
+
+
+class TestMetricsOutput:
+    """Test suite for metrics output."""
+
+    def test_prometheus_textfile(self, tmp_path):
+        """Test every stage is exported as labelled Prometheus samples."""
+        recorder = Recorder()
+        with instrumentation.recording(recorder):
+            with instrumentation.stage("load", 3):
+                pass
+
+        path = str(tmp_path / "stellarspider.prom")
+        instrumentation.write_metrics(recorder.summary(), "prometheus", path)
+
+        lines = open(path).read().splitlines()
+        assert "# TYPE stellarspider_stage_items_total counter" in lines
+        assert 'stellarspider_stage_items_total{stage="load"} 3' in lines
+        assert not any("alloc_peak" in line for line in lines)
+
+    def test_json_summary(self, rule_pipeline, tmp_path):
+        """Test the JSON summary lists every stage."""
+        recorder = Recorder()
+        with instrumentation.recording(recorder):
+            rule_pipeline().process(copy.deepcopy(PRODUCTS))
+
+        path = str(tmp_path / "metrics.json")
+        instrumentation.write_metrics(recorder.summary(), "json", path)
+
+        stages = json.load(open(path))["stages"]
+        assert {"rank", "combine", "run"} <= set(stages)
+
+    def test_cprofile_dump(self, rule_pipeline, tmp_path):
+        """Test --profile writes a dump pstats can read."""
+        path = str(tmp_path / "run.prof")
+        with instrumentation.profiling(path, "cprofile"):
+            rule_pipeline().process(copy.deepcopy(PRODUCTS))
+
+        assert pstats.Stats(path).total_calls > 0
@@ -0,0 +1,112 @@
+import json
+
+import pytest
+
+from stellarspider.io import json_array
+from stellarspider.io.codec import JsonCodec
+from stellarspider.io.data_loader import DataLoader
+
+# Strings and nested values that look like element boundaries
+TRICKY = (
+    b' [ {"a": "x},{]\\"}"}, {"b": [{"c": 2}, {"d": 3}]} ,\n'
+    b'{"e": "\xc3\xa9 },{\\\\"}, {"f": []} ] \n'
+)
+
+
+def _backends():
+    backends = ["json"]
+    for name in ("orjson", "msgspec"):
+        try:
+            __import__(name)
+        except ImportError:
+            continue
+        backends.append(name)
+    return backends
+
+
+@pytest.fixture
+def small_blocks(monkeypatch):
+    """Cut arrays after every few bytes, so every boundary is tried."""
+    monkeypatch.setattr(json_array, "_BLOCK_BYTES", 4)
+
+
+def _write(tmp_path, data):
+    path = tmp_path / "products.json"
+    path.write_bytes(data)
+    return str(path)
+
+
+class TestDecodeArray:
+    """Test suite for decode_array."""
+
+    @pytest.mark.parametrize("backend", _backends())
+    @pytest.mark.parametrize("data", [TRICKY, b"[]", b" [ ]\n", b'[{"a": 1}]'])
+    def test_matches_json_loads(self, tmp_path, small_blocks, backend, data):
+        """Test elements decode like the whole document, however it is cut."""
+        path = _write(tmp_path, data)
+
+        assert list(json_array.decode_array(path, JsonCodec(backend))) == json.loads(
+            data
+        )
+
+    def test_projects_fields(self, tmp_path, small_blocks):
+        """Test elements keep only the codec's fields."""
+        path = _write(tmp_path, b'[{"Name": "Salmon", "Price": 1}, {"URL": "a"}]')
+
+        elements = json_array.decode_array(path, JsonCodec("json", ["Name"]))
+
+        assert list(elements) == [{"Name": "Salmon"}, {}]
+
+    @pytest.mark.parametrize(
+        "data, message",
+        [
+            (b'[{"a": 1},\n{"b": bad},\n{"c": 3}]', "line 2 column 7"),
+            (b'[{"a": 1},\n{"b": 2},\n]', "line 3 column 1"),
+            (b'[{"a": 1}\n{"b": 2}]', "line 2 column 1"),
+            (b'[{"a": 1}] x', "line 1 column 12"),
+            (b'[{"a": "open]', "Unterminated string"),
+            (b'[{"a": 1},', "Unterminated array"),
+            (b"", "Expecting value"),
+        ],
+    )
+    def test_errors_report_file_position(self, tmp_path, small_blocks, data, message):
+        """Test invalid JSON raises JSONDecodeError at its place in the file."""
+        path = _write(tmp_path, data)
+
+        with pytest.raises(json.JSONDecodeError, match=message):
+            list(json_array.decode_array(path, JsonCodec("json")))
+
+    def test_object_is_rejected(self, tmp_path):
+        """Test a top-level object is not an array of products."""
+        path = _write(tmp_path, b'{"Name": "Salmon"}')
+
+        with pytest.raises(ValueError, match="must be a JSON array"):
+            list(json_array.decode_array(path, JsonCodec("json")))
+
+
+class TestDataLoaderArrayStream:
+    """Test suite for streaming JSON array files through DataLoader."""
+
+    def test_stream_matches_load(self, tmp_path, small_blocks):
+        """Test a streamed array file gives the products of a loaded one."""
+        path = _write(tmp_path, TRICKY.replace(b'"f": []', b'"Name": "Tuna"'))
+
+        assert list(DataLoader().stream(path, "json")) == DataLoader().load(path)
+
+    def test_stream_is_lazy(self, tmp_path, small_blocks):
+        """Test products before an error are yielded before it is found."""
+        path = _write(tmp_path, b'[{"Name": "Salmon"}, {"Name": "Tuna"}, oops]')
+
+        stream = DataLoader().stream(path, "json")
+
+        assert next(stream) == {"Name": "Salmon"}
+        assert next(stream) == {"Name": "Tuna"}
+        with pytest.raises(json.JSONDecodeError):
+            next(stream)
+
+    def test_stream_rejects_non_objects(self, tmp_path):
+        """Test every array element must be a product object."""
+        path = _write(tmp_path, b"[1, 2]")
+
+        with pytest.raises(ValueError):
+            list(DataLoader().stream(path, "json"))
@@ -0,0 +1,61 @@
+from stellarspider.core.filters.keyword_matcher import KeywordMatcher
+
+
+class TestKeywordMatcher:
+    """Test suite for KeywordMatcher."""
+
+    def test_finds_keywords_per_group_in_list_order(self):
+        """Test that hits are grouped and keep configured keyword order."""
+        matcher = KeywordMatcher(
+            {
+                "positive": ["salmon", "sockeye", "alaska"],
+                "preferred": ["wild", "fillet"],
+            }
+        )
+
+        result = matcher.find("wild alaska sockeye salmon")
+
+        assert result == {
+            "positive": ["salmon", "sockeye", "alaska"],
+            "preferred": ["wild"],
+        }
+
+    def test_overlapping_and_nested_keywords(self):
+        """Test that keywords contained in other keywords are all found."""
+        matcher = KeywordMatcher({"negative": ["smoked", "smoke", "farm", "farmed"]})
+
+        result = matcher.find("farmed smoked salmon")
+
+        assert result == {"negative": ["smoked", "smoke", "farm", "farmed"]}
+
+    def test_same_keyword_in_several_groups(self):
+        """Test that a keyword shared by groups is reported for each of them."""
+        matcher = KeywordMatcher(
+            {"negative": ["atlantic"], "origin": ["pacific", "atlantic"]}
+        )
+
+        result = matcher.match("fresh atlantic salmon")
+
+        assert result == {"negative": [0], "origin": [1]}
+
+    def test_matches_substring_semantics(self):
+        """Test that matching agrees with `keyword in text`."""
+        groups = {
+            "a": ["pacific", "pacific cod", "cod", "ifi"],
+            "b": ["north sea", "sea", "x"],
+        }
+        matcher = KeywordMatcher(groups)
+        text = "wild pacific codfish from the north seas"
+
+        expected = {
+            key: [kw for kw in keywords if kw in text]
+            for key, keywords in groups.items()
+        }
+
+        assert matcher.find(text) == {k: v for k, v in expected.items() if v}
+
+    def test_no_matches(self):
+        """Test text without any keyword."""
+        matcher = KeywordMatcher({"positive": ["salmon"]})
+
+        assert matcher.find("roasted peanuts") == {}
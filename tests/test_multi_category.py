@@ -0,0 +1,71 @@
+import copy
+
+import omegaconf
+
+from stellarspider.core.multi_category import MultiCategoryPipeline
+from stellarspider.core.pipeline import FilterPipeline
+
+CONFIGS = {
+    "fish": omegaconf.OmegaConf.create(
+        {
+            "filter_type": "generic",
+            "keywords": {"positive": ["salmon", "tuna"], "negative": ["canned"]},
+            "scoring": {"positive_multiplier": 5, "negative_multiplier": -10},
+        }
+    ),
+    "nuts": omegaconf.OmegaConf.create(
+        {
+            "filter_type": "peanuts",
+            "keywords": {"positive": ["peanut", "almond"], "negative": ["salted"]},
+            "scoring": {"positive_multiplier": 5, "negative_multiplier": -10},
+        }
+    ),
+}
+
+PRODUCTS = [
+    {"Name": "Wild Salmon", "CleanedText": "Fresh salmon fillet $12.99 / 16 oz"},
+    {"Name": "Raw Peanuts", "CleanedText": "Raw peanut kernels $4.99 1 lb"},
+    {"Name": "Canned Tuna", "CleanedText": "Tuna in oil $2.49 5 oz"},
+    {"Name": "Salted Almonds", "CleanedText": "Roasted almond snack $6.99"},
+]
+
+
+class TestMultiCategoryPipeline:
+    """Test suite for MultiCategoryPipeline."""
+
+    def test_rankings_match_single_category_runs(self):
+        """Test each category ranks products like its own pipeline would."""
+        pipeline = MultiCategoryPipeline.from_configs(CONFIGS)
+
+        rankings = pipeline.rank(copy.deepcopy(PRODUCTS), chunk_size=3)
+
+        for category, config in CONFIGS.items():
+            expected = FilterPipeline.from_config(config).process(
+                copy.deepcopy(PRODUCTS)
+            )
+            for product in rankings[category]:
+                assert product["Scoring"].pop("category") == category
+            assert rankings[category] == expected
+
+    def test_best_assigns_each_product_once(self):
+        """Test best mode keeps every product under its best category."""
+        pipeline = MultiCategoryPipeline.from_configs(CONFIGS)
+
+        result = pipeline.best(copy.deepcopy(PRODUCTS), top=3)
+
+        assert len(result) == 3
+        categories = {p["Name"]: p["Scoring"]["category"] for p in result}
+        assert categories["Wild Salmon"] == "fish"
+        assert categories["Raw Peanuts"] == "nuts"
+        scores = result[0]["Scoring"]["category_scores"]
+        assert set(scores) == {"fish", "nuts"}
+        assert result[0]["Scoring"]["final_score"] == max(scores.values())
+
+    def test_input_products_are_not_modified(self):
+        """Test every category scores its own copy of the input."""
+        pipeline = MultiCategoryPipeline.from_configs(CONFIGS)
+        products = copy.deepcopy(PRODUCTS)
+
+        list(pipeline.process_stream(products))
+
+        assert products == PRODUCTS
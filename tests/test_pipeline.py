@@ -1,7 +1,50 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+import omegaconf
+
 from stellarspider.core.filters.rule_based import RuleBasedFilter
+from stellarspider.core.filters.semantic import SemanticFilter
+from stellarspider.core.parallel_pipeline import ParallelFilterPipeline
 from stellarspider.core.pipeline import FilterPipeline
 from stellarspider.core.scoring.combined_scorer import CombinedScoreCalculator
 
+# Stand-ins for torch and sentence-transformers, importable by spawned workers
+STUB_MODULES = {
+    "torch": """
+        import contextlib
+
+        def set_num_threads(count):
+            pass
+
+        def inference_mode():
+            return contextlib.nullcontext()
+    """,
+    "sentence_transformers": """
+        import numpy as np
+
+        class SentenceTransformer:
+            def __init__(self, path, device="cpu"):
+                pass
+
+            def eval(self):
+                return self
+
+            def get_sentence_embedding_dimension(self):
+                return 2
+
+            def encode(self, texts, batch_size=32, **options):
+                vectors = np.array(
+                    [[text.lower().count("salmon") + 1, 1] for text in texts],
+                    dtype=np.float32,
+                )
+                return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    """,
+}
+
 
 class TestFilterPipeline:
     """Test suite for FilterPipeline."""
@@ -56,3 +99,175 @@ class TestFilterPipeline:
         assert (
             result[0]["Scoring"]["final_score"] >= result[1]["Scoring"]["final_score"]
         )
+
+    def test_pipeline_streams_products_in_chunks(self):
+        """Test that streaming scores every product and keeps input order."""
+        keywords = {"positive": ["salmon"], "negative": [], "preferred": []}
+        scoring_config = {"positive_multiplier": 3}
+        rule_filter = RuleBasedFilter(keywords, scoring_config)
+
+        score_calc = CombinedScoreCalculator()
+        pipeline = FilterPipeline([rule_filter], score_calc)
+
+        products = (
+            {"Name": name, "CleanedText": f"Fresh {name.lower()} $10.99"}
+            for name in ["Tuna", "Salmon", "Cod", "Salmon Fillet", "Trout"]
+        )
+
+        result = pipeline.process_stream(products, chunk_size=2)
+
+        assert not isinstance(result, list)
+        result = list(result)
+        assert [p["Name"] for p in result] == [
+            "Tuna",
+            "Salmon",
+            "Cod",
+            "Salmon Fillet",
+            "Trout",
+        ]
+        assert all("final_score" in p["Scoring"] for p in result)
+
+    def test_pipeline_top_matches_full_ranking(self):
+        """Test that top-k selection keeps the head of the full ranking."""
+        keywords = {
+            "positive": ["salmon", "wild"],
+            "negative": ["canned"],
+            "preferred": ["fillet"],
+        }
+        scoring_config = {"positive_multiplier": 3, "negative_multiplier": -10}
+
+        def make_products():
+            names = [
+                "Tuna",
+                "Wild Salmon Fillet",
+                "Canned Salmon",
+                "Salmon",
+                "Wild Salmon",
+                "Salmon Fillet",
+            ]
+            return [{"Name": n, "CleanedText": f"{n} $9.99"} for n in names]
+
+        pipeline = FilterPipeline(
+            [RuleBasedFilter(keywords, scoring_config)], CombinedScoreCalculator()
+        )
+
+        full = pipeline.process(make_products())
+        top = pipeline.process_top(make_products(), top=3, chunk_size=2)
+
+        assert top == full[:3]
+
+    def test_pipeline_top_applies_min_score(self):
+        """Test that products below the minimum score are dropped."""
+        keywords = {"positive": ["salmon"], "negative": [], "preferred": []}
+        scoring_config = {"positive_multiplier": 3}
+        pipeline = FilterPipeline(
+            [RuleBasedFilter(keywords, scoring_config)], CombinedScoreCalculator()
+        )
+
+        products = [
+            {"Name": "Tuna", "CleanedText": "Fresh tuna $10.99"},
+            {"Name": "Salmon", "CleanedText": "Fresh salmon $12.99"},
+        ]
+
+        result = pipeline.process_top(products, min_score=0.01)
+
+        assert [p["Name"] for p in result] == ["Salmon"]
+
+    def test_rejected_products_skip_later_filters(self):
+        """Test rejected products skip later filters and score 0 or are dropped."""
+        rule_filter = RuleBasedFilter(
+            {"positive": ["salmon"]},
+            {"positive_multiplier": 3},
+            reject_keywords=["caviar"],
+        )
+        semantic_filter = SemanticFilter(["salmon"])
+        products = [
+            {"Name": "Salmon Caviar", "CleanedText": "Salmon roe $19.99"},
+            {"Name": "Salmon Fillet", "CleanedText": "Fresh salmon $12.99"},
+        ]
+
+        kept = FilterPipeline(
+            [rule_filter, semantic_filter], CombinedScoreCalculator()
+        ).process([dict(p) for p in products])
+        dropped = FilterPipeline(
+            [rule_filter, semantic_filter],
+            CombinedScoreCalculator(),
+            drop_rejected=True,
+        ).process([dict(p) for p in products])
+
+        assert [p["Name"] for p in kept] == ["Salmon Fillet", "Salmon Caviar"]
+        assert kept[1]["Scoring"]["final_score"] == 0.0
+        assert "semantic_score" not in kept[1]["Scoring"]
+        assert [p["Name"] for p in dropped] == ["Salmon Fillet"]
+
+
+class TestParallelFilterPipeline:
+    """Test suite for ParallelFilterPipeline."""
+
+    def test_parallel_ranking_matches_serial(self):
+        """Test that worker processes rank products exactly like a serial run."""
+        config = omegaconf.OmegaConf.create(
+            {
+                "filter_type": "generic",
+                "keywords": {
+                    "positive": ["salmon", "wild"],
+                    "negative": ["canned"],
+                    "preferred": ["fillet"],
+                },
+                "scoring": {"positive_multiplier": 3, "negative_multiplier": -10},
+            }
+        )
+
+        def make_products():
+            names = ["Tuna", "Wild Salmon Fillet", "Canned Salmon", "Salmon"] * 3
+            return [{"Name": n, "CleanedText": f"{n} $9.99"} for n in names]
+
+        serial = FilterPipeline.from_config(config).process(make_products())
+
+        with ParallelFilterPipeline(config, workers=2, chunk_size=5) as pipeline:
+            parallel = pipeline.process(make_products())
+            streamed = list(pipeline.process_stream(make_products(), chunk_size=2))
+
+        assert parallel == serial
+        assert [p["Name"] for p in streamed] == [p["Name"] for p in make_products()]
+
+    def test_workers_with_a_model_match_a_serial_run(self, tmp_path):
+        """Test products scored by a model in workers come back to the parent."""
+        for name, source in STUB_MODULES.items():
+            (tmp_path / "stubs" / name).mkdir(parents=True)
+            (tmp_path / "stubs" / name / "__init__.py").write_text(
+                textwrap.dedent(source)
+            )
+        products = tmp_path / "products.json"
+        names = ["Wild Salmon Fillet", "Tuna Steak", "Salmon", "Canned Tuna"] * 3
+        products.write_text(
+            json.dumps([{"Name": n, "CleanedText": f"{n} $9.99"} for n in names])
+        )
+        env = dict(
+            os.environ,
+            PYTHONPATH=os.pathsep.join(
+                [str(tmp_path / "stubs"), os.environ.get("PYTHONPATH", "")]
+            ),
+            STELLARSPIDER_CACHE_DIR=str(tmp_path / "cache"),
+        )
+
+        def run(workers):
+            argv = ["stellarspider", "--category", "salmon", "-i", str(products)]
+            argv += ["--semantic-model", str(tmp_path), "--workers", workers]
+            argv += ["--chunk-size", "5"]
+            code = (
+                f"import sys, stellarspider\nsys.argv = {argv!r}\nstellarspider.main()"
+            )
+            result = subprocess.run(
+                [sys.executable, "-c", code],
+                capture_output=True,
+                text=True,
+                env=env,
+            )
+            assert result.returncode == 0, result.stderr
+            return json.loads(result.stdout)
+
+        parallel = run("2")
+
+        assert parallel == run("1")
+        assert all("semantic_breakdown" in p["Scoring"] for p in parallel)
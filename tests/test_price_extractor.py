@@ -48,3 +48,29 @@ class TestPriceExtractor:
         price_per_oz = extractor.calculate_price_per_oz(product, 16.00)
 
         assert price_per_oz == 1.00
+
+    def test_extract_returns_all_details(self):
+        """Test extracting price, unit prices and weight together."""
+        extractor = PriceExtractor()
+        product = {
+            "Name": "Wild Sockeye Salmon - 2 lb",
+            "CleanedText": "Your Price $25.98 each ($12.99 / Lb)",
+        }
+
+        details = extractor.extract(product)
+
+        assert details.price == 25.98
+        assert details.price_per_lb == 12.99
+        assert details.price_per_oz == 0.81
+        assert details.weight_oz == 32
+
+    def test_extract_ignores_price_in_name(self):
+        """Test that the base price is only read from the product text."""
+        extractor = PriceExtractor()
+        product = {"Name": "Salmon $5.00 Deal 10 oz", "CleanedText": "Fresh salmon"}
+
+        details = extractor.extract(product)
+
+        assert details.price is None
+        assert details.price_per_oz is None
+        assert details.weight_oz == 10
@@ -0,0 +1,160 @@
+import copy
+import json
+import pickle
+
+import numpy as np
+
+from stellarspider.core.embeddings import EmbeddingBackend
+from stellarspider.core.filters.rule_based import (
+    RuleExplanation,
+    SalmonRuleBasedFilter,
+)
+from stellarspider.core.filters.semantic import SemanticFilter
+from stellarspider.core.pipeline import FilterPipeline
+from stellarspider.core.records import Built, ScoreRecord, explained, json_default
+from stellarspider.core.scoring.combined_scorer import CombinedScoreCalculator
+
+PRODUCTS = [
+    {
+        "Name": "Wild Salmon Fillet",
+        "URL": "a",
+        "CleanedText": "Frozen wild sockeye salmon $12.99 16 oz",
+    },
+    {"Name": "Salmon Burger", "URL": "b", "CleanedText": "Farmed salmon patties"},
+    {"Name": "Tuna Steak", "URL": "c", "CleanedText": "Yellowfin tuna $9.99"},
+]
+
+
+class ModuleBackend(EmbeddingBackend):
+    """Stand-in model that, like a torch one, holds a module and cannot pickle."""
+
+    def __init__(self):
+        self._np = np
+
+    @property
+    def model_id(self):
+        return "module"
+
+    def encode(self, texts, batch_size=32):
+        vectors = self._np.array(
+            [[text.lower().count("salmon") + 1, len(text)] for text in texts],
+            dtype=self._np.float32,
+        ).reshape(len(texts), 2)
+        return vectors / self._np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _pipeline():
+    rule_filter = SalmonRuleBasedFilter(
+        {"positive": ["salmon", "sockeye"], "negative": ["burger", "farmed"]},
+        {"positive_multiplier": 3, "negative_multiplier": -5, "name_salmon_bonus": 2},
+        ocean_origins={"pacific": ["sockeye"]},
+    )
+    semantic_filter = SemanticFilter(["salmon", "fillet", "frozen", "fish"])
+    return FilterPipeline(
+        [rule_filter, semantic_filter], CombinedScoreCalculator(0.7, 0.3)
+    )
+
+
+class TestScoreRecord:
+    """Test suite for ScoreRecord."""
+
+    def test_keys_keep_dict_order(self):
+        """Test keys set before and after the scoring fields keep their place."""
+        record = ScoreRecord()
+        record["category"] = "salmon"
+        record["final_score"] = 0.5
+        record["rule_score"] = 3
+        record["duplicate_of"] = "a"
+
+        expected = {
+            "category": "salmon",
+            "rule_score": 3,
+            "final_score": 0.5,
+            "duplicate_of": "a",
+        }
+        assert list(record) == list(expected)
+        assert record == expected
+        del record["category"]
+        assert list(record.to_dict()) == ["rule_score", "final_score", "duplicate_of"]
+        assert "category" not in record and record.get("weights") is None
+
+    def test_scored_like_plain_dicts(self):
+        """Test records encode like the dicts of products that had a Scoring."""
+        plain = [{**product, "Scoring": {}} for product in copy.deepcopy(PRODUCTS)]
+        expected = _pipeline().process(plain)
+
+        scored = _pipeline().process(copy.deepcopy(PRODUCTS))
+
+        assert all(isinstance(p["Scoring"], ScoreRecord) for p in scored)
+        assert json.dumps(scored, default=json_default) == json.dumps(expected)
+        breakdown = scored[0]["Scoring"]["rule_breakdown"]
+        assert breakdown == expected[0]["Scoring"]["rule_breakdown"]
+
+    def test_shared_values_are_not_copied(self):
+        """Test target concepts are the filter's own list, not a copy."""
+        pipeline = _pipeline()
+        scored = pipeline.process(copy.deepcopy(PRODUCTS))
+
+        breakdown = scored[0]["Scoring"]["semantic_breakdown"]
+        assert breakdown["target_concepts"] is pipeline.filters[1].target_concepts
+        assert scored[0]["Scoring"].copy() == scored[0]["Scoring"]
+
+    def test_pickle_round_trip(self):
+        """Test records survive pickling, as parallel workers return them."""
+        scored = _pipeline().process(copy.deepcopy(PRODUCTS))
+
+        restored = pickle.loads(pickle.dumps(scored))
+
+        assert [p["Scoring"].to_dict() for p in restored] == [
+            p["Scoring"].to_dict() for p in scored
+        ]
+
+    def test_pickle_leaves_model_backed_filter_behind(self):
+        """Test pickled records hold built explanations, not the filter."""
+        semantic_filter = SemanticFilter(["salmon", "fish"], ModuleBackend())
+        pipeline = FilterPipeline(
+            [_pipeline().filters[0], semantic_filter], CombinedScoreCalculator()
+        )
+        scored = pipeline.process(copy.deepcopy(PRODUCTS))
+
+        restored = pickle.loads(pickle.dumps(scored[0]))
+
+        assert restored["Scoring"].to_dict() == scored[0]["Scoring"].to_dict()
+        deferred = restored["Scoring"].stored("semantic_breakdown")
+        assert isinstance(deferred, Built)
+        assert deferred is restored["Scoring"].stored("semantic_breakdown")
+
+
+class TestExplained:
+    """Test suite for output detail levels."""
+
+    def test_levels(self):
+        """Test each level keeps its explanations, for records and dicts."""
+        scored = _pipeline().process(copy.deepcopy(PRODUCTS))
+        plain = [{**product, "Scoring": {}} for product in copy.deepcopy(PRODUCTS)]
+        plain = _pipeline().process(plain)
+
+        for product in (scored[0], plain[0]):
+            summary = explained(product, "summary")["Scoring"]
+            assert summary["rule_reasoning"] == product["Scoring"]["rule_reasoning"]
+            assert "rule_breakdown" not in summary and "weights" not in summary
+            assert explained(product, "full") is product
+        assert explained(scored[0], "none") == explained(plain[0], "none")
+
+    def test_none_never_builds_explanations(self, monkeypatch):
+        """Test explanations left out are not built at all."""
+        scored = _pipeline().process(copy.deepcopy(PRODUCTS))
+
+        def fail(self):
+            raise AssertionError("explanation built")
+
+        monkeypatch.setattr(RuleExplanation, "fields", fail)
+        scoring = explained(scored[0], "none")["Scoring"]
+
+        assert set(scoring) == {
+            "rule_score",
+            "extracted_price",
+            "price_per_oz",
+            "semantic_score",
+            "final_score",
+        }
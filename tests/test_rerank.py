@@ -0,0 +1,177 @@
+import copy
+import json
+import subprocess
+import sys
+
+import omegaconf
+import pytest
+
+from stellarspider.core import records
+from stellarspider.core.filters.rule_based import RuleBasedFilter
+from stellarspider.core.filters.semantic import SemanticFilter
+from stellarspider.core.parallel_pipeline import ParallelFilterPipeline
+from stellarspider.core.pipeline import FilterPipeline
+from stellarspider.core.rerank import RerankBudget
+from stellarspider.core.scoring.combined_scorer import CombinedScoreCalculator
+
+
+def _scored(*rule_scores):
+    return [
+        {"Name": f"p{i}", "Scoring": {"rule_score": score}}
+        for i, score in enumerate(rule_scores)
+    ]
+
+
+class RecordingFilter(SemanticFilter):
+    """Semantic filter that records the products it scores."""
+
+    def __init__(self):
+        super().__init__(["salmon"])
+        self.seen = []
+
+    def filter_products(self, products, embeddings=None):
+        self.seen.extend(product["Name"] for product in products)
+        return super().filter_products(products, embeddings)
+
+
+class TestRerankBudget:
+    """Test suite for RerankBudget."""
+
+    def test_select_best_candidates_in_rule_order(self):
+        """Test candidates are the best by rule score, best first."""
+        products = _scored(1, 9, 5, 7)
+
+        selected = RerankBudget(candidates=2).select(products)
+
+        assert [p["Name"] for p in selected] == ["p1", "p3"]
+
+    def test_select_within_margin(self):
+        """Test only products within the margin of the best are candidates."""
+        products = _scored(1, 9, 5, 7)
+
+        selected = RerankBudget(margin=4).select(products)
+
+        assert [p["Name"] for p in selected] == ["p1", "p3", "p2"]
+
+    def test_batches_stop_at_deadline(self):
+        """Test no batch is handed out once the time budget is spent."""
+        products = _scored(1, 2, 3)
+
+        assert list(RerankBudget(time_budget=0).batches(products)) == []
+        assert len(list(RerankBudget(batch_size=2).batches(products))) == 2
+
+    def test_invalid_options(self):
+        """Test negative limits are rejected."""
+        with pytest.raises(ValueError):
+            RerankBudget(candidates=-1)
+        with pytest.raises(ValueError):
+            RerankBudget(margin=-1)
+
+    def test_from_config(self):
+        """Test a config without rerank limits gives no budget."""
+        assert RerankBudget.from_config({"rerank": {"candidates": None}}) is None
+        budget = RerankBudget.from_config(
+            {"rerank": {"candidates": 10}, "semantic": {"batch_size": 8}}
+        )
+        assert (budget.candidates, budget.batch_size) == (10, 8)
+
+
+class TestRerankPipeline:
+    """Test suite for FilterPipeline with a rerank budget."""
+
+    def test_only_candidates_get_semantic_scores(self):
+        """Test later filters only score the best products by rule score."""
+        semantic_filter = RecordingFilter()
+        pipeline = FilterPipeline(
+            [
+                RuleBasedFilter({"positive": ["salmon", "wild"]}, {}),
+                semantic_filter,
+            ],
+            CombinedScoreCalculator(),
+            rerank=RerankBudget(candidates=2),
+        )
+        products = [
+            {"Name": "Tuna", "CleanedText": "tuna"},
+            {"Name": "Wild Salmon", "CleanedText": "wild salmon"},
+            {"Name": "Salmon", "CleanedText": "salmon"},
+        ]
+
+        result = pipeline.process(products)
+
+        assert semantic_filter.seen == ["Wild Salmon", "Salmon"]
+        assert [p["Name"] for p in result] == ["Wild Salmon", "Salmon", "Tuna"]
+        assert "semantic_score" not in result[2]["Scoring"]
+        assert "final_score" in result[2]["Scoring"]
+
+    def test_candidates_are_chosen_across_chunks(self):
+        """Test the chunk size changes neither the candidates nor the deadline."""
+        products = [
+            {"Name": name, "CleanedText": name.lower()}
+            for name in ["Tuna", "Wild Salmon", "Salmon", "Wild Tuna", "Cod"]
+        ]
+        results = []
+        for chunk_size in (1, 2, 10):
+            semantic_filter = RecordingFilter()
+            budget = RerankBudget(candidates=2)
+            pipeline = FilterPipeline(
+                [
+                    RuleBasedFilter({"positive": ["salmon", "wild"]}, {}),
+                    semantic_filter,
+                ],
+                CombinedScoreCalculator(),
+                rerank=budget,
+            )
+            calls = []
+            batches = budget.batches
+            budget.batches = lambda products: calls.append(1) or batches(products)
+
+            streamed = pipeline.process_stream(copy.deepcopy(products), chunk_size)
+            results.append([p["Scoring"]["final_score"] for p in streamed])
+
+            assert semantic_filter.seen == ["Wild Salmon", "Salmon"]
+            assert calls == [1]
+        assert results[0] == results[1] == results[2]
+
+    def test_parallel_rerank_matches_serial(self):
+        """Test workers rerank the run's candidates like a serial pipeline."""
+        config = omegaconf.OmegaConf.create(
+            {
+                "filter_type": "salmon",
+                "keywords": {"positive": ["salmon", "wild"]},
+                "rerank": {"candidates": 2},
+            }
+        )
+        products = [
+            {"Name": name, "CleanedText": f"{name.lower()} $9.99"}
+            for name in ["Tuna", "Wild Salmon", "Salmon", "Wild Tuna"] * 2
+        ]
+
+        serial = FilterPipeline.from_config(config).process(copy.deepcopy(products))
+        with ParallelFilterPipeline(config, workers=2, chunk_size=3) as pipeline:
+            parallel = pipeline.process(copy.deepcopy(products))
+
+        assert [records.plain(p["Scoring"]) for p in parallel] == [
+            records.plain(p["Scoring"]) for p in serial
+        ]
+        assert sum("semantic_score" in p["Scoring"] for p in parallel) == 2
+
+    def test_chunked_runs_warn_that_products_are_held(self, tmp_path):
+        """Test a rerank budget with --top warns it holds every product."""
+        products = tmp_path / "products.json"
+        products.write_text('[{"Name": "Salmon", "CleanedText": "salmon $5"}]')
+        argv = ["stellarspider", "--category", "salmon", "-i", str(products)]
+        argv += ["--rerank", "1", "--top", "1", "--no-config-cache"]
+
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                f"import sys, stellarspider\nsys.argv = {argv!r}\nstellarspider.main()",
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+        assert "held in memory" in result.stderr
+        assert len(json.loads(result.stdout)) == 1
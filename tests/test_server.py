@@ -0,0 +1,145 @@
+import copy
+import http.client
+import json
+import threading
+
+import pytest
+
+from stellarspider.core.filters.rule_based import RuleBasedFilter
+from stellarspider.core.filters.semantic import SemanticFilter
+from stellarspider.core.pipeline import FilterPipeline
+from stellarspider.core.rerank import RerankBudget
+from stellarspider.core.scoring.combined_scorer import CombinedScoreCalculator
+from stellarspider.io.server import BatchScorer, make_server
+
+PRODUCTS = [
+    {"Name": "Tuna Steak", "CleanedText": "Yellowfin tuna $9.99"},
+    {"Name": "Wild Salmon", "CleanedText": "Wild salmon fillet $12.99 / 16 oz"},
+    {"Name": "Salmon Burger", "CleanedText": "Salmon patties $7.49"},
+]
+
+
+@pytest.fixture
+def server(rule_pipeline):
+    scorer = BatchScorer({"fish": rule_pipeline()})
+    server = make_server(scorer, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    scorer.close()
+
+
+def _request(server, method, path, body=None, headers=None):
+    connection = http.client.HTTPConnection(*server.server_address)
+    connection.request(method, path, body, headers or {})
+    response = connection.getresponse()
+    return response.status, response.read()
+
+
+class TestBatchScorer:
+    """Test suite for BatchScorer."""
+
+    def test_concurrent_requests_are_scored_like_the_pipeline(self, rule_pipeline):
+        """Test batched requests each get back their own scored products."""
+        scorer = BatchScorer({"fish": rule_pipeline()}, max_batch=100, max_wait=0.05)
+        requests = [copy.deepcopy(PRODUCTS[i:]) for i in range(len(PRODUCTS))]
+
+        futures = [scorer.submit("fish", products) for products in requests]
+        results = [future.result(timeout=5) for future in futures]
+        scorer.close()
+
+        for i, result in enumerate(results):
+            assert result == rule_pipeline()._score(copy.deepcopy(PRODUCTS[i:]))
+        assert scorer.stats["requests"] == len(requests)
+        assert scorer.stats["batches"] < len(requests)
+
+    def test_rerank_candidates_are_chosen_per_request(self):
+        """Test batched requests are reranked apart from each other."""
+        pipeline = FilterPipeline(
+            [
+                RuleBasedFilter({"positive": ["salmon", "wild"]}, {}),
+                SemanticFilter(["salmon"]),
+            ],
+            CombinedScoreCalculator(),
+            rerank=RerankBudget(candidates=1),
+        )
+        scorer = BatchScorer({"fish": pipeline}, max_batch=100, max_wait=0.05)
+        requests = [copy.deepcopy(PRODUCTS[:2]), copy.deepcopy(PRODUCTS[2:])]
+
+        futures = [scorer.submit("fish", products) for products in requests]
+        results = [future.result(timeout=5) for future in futures]
+        scorer.close()
+
+        assert scorer.stats["batches"] == 1
+        for result in results:
+            assert sum("semantic_score" in p["Scoring"] for p in result) == 1
+        assert "semantic_score" in results[1][0]["Scoring"]
+
+    def test_unknown_category_is_rejected(self, rule_pipeline):
+        """Test submitting to a category without a pipeline fails at once."""
+        scorer = BatchScorer({"fish": rule_pipeline()})
+
+        with pytest.raises(KeyError):
+            scorer.submit("nuts", [])
+        scorer.close()
+
+
+class TestScoringServer:
+    """Test suite for the scoring daemon's HTTP API."""
+
+    def test_health(self, server):
+        """Test the health endpoint reports the served categories."""
+        status, body = _request(server, "GET", "/health")
+
+        assert status == 200
+        health = json.loads(body)
+        assert health["status"] == "ok"
+        assert health["categories"] == ["fish"]
+
+    def test_score_ranks_like_the_pipeline(self, rule_pipeline, server):
+        """Test a JSON batch comes back ranked like a CLI run."""
+        status, body = _request(server, "POST", "/score/fish", json.dumps(PRODUCTS))
+
+        assert status == 200
+        assert json.loads(body) == rule_pipeline().process(copy.deepcopy(PRODUCTS))
+
+    def test_score_ndjson_with_top(self, server):
+        """Test NDJSON in and out, trimmed to the best product."""
+        ndjson = "\n".join(json.dumps(product) for product in PRODUCTS)
+
+        status, body = _request(
+            server,
+            "POST",
+            "/score/fish?top=1&format=ndjson",
+            ndjson,
+            {"Content-Type": "application/x-ndjson"},
+        )
+
+        assert status == 200
+        lines = body.decode().splitlines()
+        assert [json.loads(line)["Name"] for line in lines] == ["Wild Salmon"]
+
+    def test_explain_none(self, server):
+        """Test explain=none leaves the explanations out of the scores."""
+        status, body = _request(
+            server, "POST", "/score/fish?explain=none", json.dumps(PRODUCTS)
+        )
+
+        assert status == 200
+        assert list(json.loads(body)[0]["Scoring"]) == [
+            "rule_score",
+            "extracted_price",
+            "price_per_oz",
+            "final_score",
+        ]
+
+    def test_errors(self, server):
+        """Test bad requests are answered with an error instead of a crash."""
+        assert _request(server, "POST", "/score/nuts", "[]")[0] == 404
+        assert _request(server, "POST", "/score/fish", "{}")[0] == 400
+        assert _request(server, "POST", "/score/fish", "not json")[0] == 400
+        assert _request(server, "POST", "/score/fish?top=x", "[]")[0] == 400
+        assert _request(server, "POST", "/score/fish?explain=x", "[]")[0] == 400
+        assert _request(server, "GET", "/metrics")[0] == 404
@@ -0,0 +1,148 @@
+import json
+
+import numpy as np
+import pytest
+
+from stellarspider.core.embeddings import EmbeddingBackend
+from stellarspider.core.vector_index import VectorIndex, default_lists
+
+VOCABULARY = ["salmon", "fillet", "smoked", "peanuts", "raw", "roasted", "tuna"]
+
+PRODUCTS = [
+    {"Name": "Wild Salmon Fillet", "URL": "a", "CleanedText": "fresh", "Price": 1},
+    {"Name": "Smoked Salmon", "URL": "b", "CleanedText": "smoked fillet"},
+    {"Name": "Raw Peanuts", "URL": "c", "CleanedText": "raw peanuts"},
+    {"Name": "Roasted Peanuts", "URL": "d", "CleanedText": "roasted"},
+    {"Name": "Tuna Steak", "URL": "e", "CleanedText": "tuna"},
+]
+
+
+class BagOfWordsBackend(EmbeddingBackend):
+    """Tiny stand-in embedding model: normalized word counts over a vocabulary."""
+
+    def __init__(self, vocabulary=VOCABULARY):
+        self.vocabulary = vocabulary
+        self.calls = []
+
+    @property
+    def model_id(self):
+        return "bag-of-words"
+
+    def encode(self, texts, batch_size=32):
+        self.calls.append(len(texts))
+        vectors = np.array(
+            [
+                [text.lower().split().count(word) for word in self.vocabulary]
+                for text in texts
+            ],
+            dtype=np.float32,
+        ).reshape(len(texts), len(self.vocabulary))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+
+def _catalog(size, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            "Name": " ".join(rng.choice(VOCABULARY, 3)),
+            "URL": f"https://example.com/{i}",
+        }
+        for i in range(size)
+    ]
+
+
+class TestVectorIndex:
+    """Test suite for VectorIndex."""
+
+    def test_build_embeds_in_chunks_and_stores_fields(self, tmp_path):
+        """Test products are embedded per chunk and only index fields are kept."""
+        backend = BagOfWordsBackend()
+
+        with VectorIndex.build(
+            str(tmp_path / "idx"), backend, iter(PRODUCTS), chunk_size=2
+        ) as index:
+            assert backend.calls == [2, 2, 1]
+            assert index.count == 5
+            assert index.meta["lists"] == 0
+            assert index.product(0) == {"Name": "Wild Salmon Fillet", "URL": "a"}
+
+    def test_search_text_ranks_by_similarity(self, tmp_path):
+        """Test a text query returns the most similar products first."""
+        backend = BagOfWordsBackend()
+
+        with VectorIndex.build(str(tmp_path / "idx"), backend, PRODUCTS) as index:
+            results = index.search_text(backend, "raw peanuts", k=2)
+
+        assert [result.product["URL"] for result in results] == ["c", "d"]
+        assert results[0].similarity == pytest.approx(1.0)
+
+    def test_search_like_uses_stored_vector(self, tmp_path):
+        """Test a product query needs no model and leaves out the product."""
+        backend = BagOfWordsBackend()
+
+        with VectorIndex.build(str(tmp_path / "idx"), backend, PRODUCTS) as index:
+            backend.calls.clear()
+            results = index.search_like("b", k=2)
+
+            assert backend.calls == []
+            assert results[0].product["URL"] == "a"
+            assert "b" not in [result.product["URL"] for result in results]
+            with pytest.raises(KeyError):
+                index.search_like("missing")
+
+    def test_ivf_with_all_lists_matches_exhaustive_search(self, tmp_path):
+        """Test probing every inverted list finds the exhaustive results."""
+        products = _catalog(300)
+        backend = BagOfWordsBackend()
+        query = backend.encode(["smoked salmon fillet"])[0]
+
+        with (
+            VectorIndex.build(
+                str(tmp_path / "flat"), backend, products, lists=0
+            ) as flat,
+            VectorIndex.build(str(tmp_path / "ivf"), backend, products, lists=8) as ivf,
+        ):
+            expected = flat.search(query, k=10)
+            found = ivf.search(query, k=10, nprobe=8)
+
+            assert ivf.meta["lists"] == 8
+            assert ivf.list_offsets[-1] == 300
+            assert [r.similarity for r in found] == pytest.approx(
+                [r.similarity for r in expected]
+            )
+            assert len(ivf.search(query, k=10, nprobe=1)) <= 10
+
+    def test_reopened_index_finds_urls(self, tmp_path):
+        """Test an index reopened from disk looks products up by URL."""
+        path = str(tmp_path / "idx")
+        VectorIndex.build(path, BagOfWordsBackend(), _catalog(50)).close()
+
+        with VectorIndex(path) as index:
+            assert index.find_url("https://example.com/42") == 42
+            assert index.find_url("https://example.com/missing") is None
+
+    def test_rebuild_replaces_index_but_not_other_directories(self, tmp_path):
+        """Test building over an index replaces it, over other data fails."""
+        path = tmp_path / "idx"
+        VectorIndex.build(str(path), BagOfWordsBackend(), PRODUCTS).close()
+        VectorIndex.build(str(path), BagOfWordsBackend(), PRODUCTS[:2]).close()
+
+        assert json.loads((path / "meta.json").read_text())["count"] == 2
+
+        other = tmp_path / "data"
+        other.mkdir()
+        (other / "keep.txt").write_text("x")
+        with pytest.raises(ValueError):
+            VectorIndex.build(str(other), BagOfWordsBackend(), PRODUCTS)
+        assert (other / "keep.txt").exists()
+
+    def test_missing_index_raises_value_error(self, tmp_path):
+        """Test opening a directory without an index raises ValueError."""
+        with pytest.raises(ValueError):
+            VectorIndex(str(tmp_path))
+
+    def test_default_lists(self):
+        """Test small catalogs are searched exhaustively."""
+        assert default_lists(9_999) == 0
+        assert default_lists(1_000_000) == 4_000